@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公開用JSON（月別JSON・列指向版・files.json）の書き出しプロファイル
+
+- pretty（既定）: indent=2 の従来形式。.gz は作らない
+  （書き直して古くなった .gz は、古い内容を配信しないよう削除する）
+- compact: 空白なしの JSON ＋ 同じ場所に最大圧縮の .gz（gzip_static 等の静的配信用）
+    - .gz のヘッダには元ファイル名・時刻を入れない（同じ内容なら毎回同じバイト列）
+    - .gz の更新時刻は元の JSON と揃える（更新時刻の一致で最新かどうかを判定する）
+
+history-maker/build_unit_history.py は独立実行のため同じ処理を自前で持つ。
+標準ライブラリのみを使用。
+"""
+
+import os
+import gzip
+import json
+
+PROFILES = ('pretty', 'compact')
+
+
+def dumps(data, profile: str = 'pretty') -> str:
+    """プロファイルに応じた JSON テキスト"""
+    if profile == 'compact':
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def gzip_path(path: str) -> str:
+    return path + '.gz'
+
+
+def is_gzip_current(path: str) -> bool:
+    """.gz があり、更新時刻が元ファイルと一致するか"""
+    gz = gzip_path(path)
+    return (os.path.exists(gz)
+            and os.stat(gz).st_mtime_ns == os.stat(path).st_mtime_ns)
+
+
+def write_gzip(path: str):
+    """元ファイルから .gz を作り直す（最大圧縮・ヘッダ時刻 0・更新時刻は元ファイルと同じ）"""
+    with open(path, 'rb') as f:
+        payload = f.read()
+    gz = gzip_path(path)
+    with open(gz, 'wb') as raw:
+        with gzip.GzipFile(filename='', mode='wb', compresslevel=9, fileobj=raw, mtime=0) as f:
+            f.write(payload)
+    st = os.stat(path)
+    os.utime(gz, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def sync_gzip(path: str, profile: str) -> bool:
+    """
+    compact なら .gz を最新にする。それ以外は古くなった .gz だけ削除する。
+    .gz を書き直したら True
+    """
+    if is_gzip_current(path):
+        return False
+    if profile == 'compact':
+        write_gzip(path)
+        return True
+    if os.path.exists(gzip_path(path)):
+        os.remove(gzip_path(path))
+    return False
+
+
+def file_sizes(path: str) -> tuple:
+    """(JSON のサイズ, .gz のサイズ)。無いものは None"""
+    size = os.path.getsize(path) if os.path.exists(path) else None
+    gz = gzip_path(path)
+    gz_size = os.path.getsize(gz) if os.path.exists(gz) else None
+    return size, gz_size
+
+
+def pretty_size(data) -> int:
+    """indent=2（pretty）で書いた場合のバイト数（サイズ表示の比較元）"""
+    return len(dumps(data, 'pretty').encode('utf-8'))
+
+
+def print_size_report(sizes: dict, base_dir: str = None):
+    """
+    サイズ一覧を表示。
+    sizes: { パス: (indent=2 で書いた場合のサイズ, 書き出したサイズ, .gz のサイズ or None) }
+    """
+    if not sizes:
+        return
+
+    def kb(n):
+        return '-' if n is None else f"{n / 1024:,.1f} KB"
+
+    print("\n出力サイズ（indent=2 の場合 → 書き出し後 / gzip）:")
+    total_baseline = total_after = total_gz = 0
+    for path, (baseline, after, gz) in sorted(sizes.items()):
+        name = os.path.relpath(path, base_dir) if base_dir else os.path.basename(path)
+        print(f"  {name:28s} {kb(baseline):>12s} → {kb(after):>12s} / {kb(gz):>10s}")
+        total_baseline += baseline
+        total_after += after or 0
+        total_gz += gz or 0
+    print(f"  {'合計':26s} {kb(total_baseline):>12s} → {kb(total_after):>12s} / "
+          f"{kb(total_gz if total_gz else None):>10s}")
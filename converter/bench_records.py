@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dataframe_to_dict_list のベンチマーク兼・出力一致チェック
+
+使い方:
+    python bench_records.py [月JSONパス] [繰り返し回数]
+
+例:
+    python bench_records.py
+    → ../data/ の最新月（例: 2026_08.json）の各日を DataFrame に戻し、
+      旧実装（iterrows）と現行実装（列単位変換）の出力が完全一致することを
+      確認したうえで、1日あたりの変換時間を比較表示する
+
+DataFrame は pd.read_html と同じ型推論（TextParser）を通すため、
+各日のレコードを一度CSVテキストに戻して pd.read_csv で読み直している。
+欠損セルを含む float 列のケースも検証するよう、1日ごとに ART 列の
+先頭1セルを空にしたバリエーションも併せて比較する。
+"""
+
+import os
+import io
+import sys
+import csv
+import glob
+import time
+
+import pandas as pd
+
+from convert_csv_to_json import dataframe_to_dict_list, get_data_dir, load_existing_json
+
+
+def dataframe_to_dict_list_legacy(df: pd.DataFrame) -> list:
+    """旧実装（iterrows による1セルずつの変換）。出力一致チェックの基準"""
+    df = df.fillna('')
+
+    records = []
+    for _, row in df.iterrows():
+        record = {}
+        for col in df.columns:
+            value = row[col]
+            if isinstance(value, float) and value == int(value):
+                record[str(col)] = str(int(value))
+            else:
+                record[str(col)] = str(value) if value != '' else ''
+        records.append(record)
+
+    return records
+
+
+def records_to_typed_dataframe(records: list, blank_column: str = None) -> pd.DataFrame:
+    """レコードを read_html 相当の型推論を通した DataFrame に戻す"""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(records[0].keys()))
+    writer.writeheader()
+    for i, record in enumerate(records):
+        if blank_column and i == 0:
+            record = dict(record, **{blank_column: ''})
+        writer.writerow(record)
+    buf.seek(0)
+    return pd.read_csv(buf)
+
+
+def time_per_call(func, frames: list, repeat: int) -> float:
+    """1日（DataFrame 1個）あたりの平均変換時間（ミリ秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for df in frames:
+            func(df)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(frames))
+
+
+def main():
+    if len(sys.argv) > 1:
+        json_path = sys.argv[1]
+    else:
+        month_files = sorted(glob.glob(os.path.join(get_data_dir(), "????_??.json")))
+        if not month_files:
+            print("エラー: 月別JSONが見つかりません")
+            sys.exit(1)
+        json_path = month_files[-1]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    month_data = load_existing_json(json_path)
+
+    frames = []
+    for records in month_data.values():
+        if not records:
+            continue
+        frames.append(records_to_typed_dataframe(records))
+        frames.append(records_to_typed_dataframe(records, blank_column='ART'))
+
+    print(f"対象: {os.path.basename(json_path)} ({len(month_data)}日分, "
+          f"DataFrame {len(frames)}個, 平均 {sum(len(df) for df in frames) / len(frames):.0f}行)")
+
+    mismatches = 0
+    for df in frames:
+        if dataframe_to_dict_list_legacy(df) != dataframe_to_dict_list(df):
+            mismatches += 1
+    if mismatches:
+        print(f"✗ 出力不一致: {mismatches}/{len(frames)}件")
+        sys.exit(1)
+    print(f"✓ 出力一致: {len(frames)}/{len(frames)}件")
+
+    legacy_ms = time_per_call(dataframe_to_dict_list_legacy, frames, repeat)
+    current_ms = time_per_call(dataframe_to_dict_list, frames, repeat)
+    print(f"  旧実装（iterrows）: {legacy_ms:8.2f} ms/日")
+    print(f"  現行（列単位変換）: {current_ms:8.2f} ms/日")
+    print(f"  高速化: {legacy_ms / current_ms:.1f}倍")
+
+
+if __name__ == '__main__':
+    main()
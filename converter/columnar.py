@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+月別JSONの列指向版 data/YYYY_MM.columnar.json を生成するスクリプト
+
+使い方:
+    python columnar.py [--profile compact]
+    → data/ の全 YYYY_MM.json について列指向版を生成し、
+      元の月別JSONに完全に復元できることを検証してサイズを表示する
+      （compact なら .gz も併置）
+
+    convert_csv_to_json.py（HTML取り込み・--watch・--db --export-json）でも、
+    月別JSONを書き出すたびに同じ月の列指向版が同時に書き出される（オプション不要）。
+    files.json の更新時には、月別JSONより古い・無い列指向版を作り直す。
+
+形式（format: "columnar-v2"）:
+    {
+      "format": "columnar-v2",
+      "columns": ["機種名", "台番号", "G数", ...],      … 元レコードの列順
+      "machines": ["ネオアイムジャグラーEX", ...],       … 機種名の辞書
+      "derived": { "合成確率": ["G数", "BB", "RB", "ART"], ... },
+      "layouts": [                                      … 台配置のエポック（日付順）
+        { "from": "2026_08_01",                         … このエポックが始まる日
+          "機種名": [0, 0, 1, ...],                     … machines の添字
+          "台番号": [881, 882, ...] }
+      ],
+      "days": {
+        "2026_08_01": {
+          "layout": 0,                                  … layouts の添字（行の並びもエポック順）
+          "G数": [...], "差枚": [...], ...,             … 数値列は整数配列（空欄は null）
+          "raw": { "列名": { "行番号": "元の文字列" } }   … 上の規則で復元できないセルのみ
+        }
+      }
+    }
+
+- 台配置（機種名・台番号の並び）は入替・増減台・移動のあった日にしか変わらないため、
+  前日と同じ並びの日は同じエポックを指し、日ごとには数値列だけを持つ。
+  ある日の台配置は day_layout で O(1) に引ける。
+- 旧形式 columnar-v1（エポックなし。機種名・台番号も日ごとの配列）も読める。
+- 確率列（derived）は保存しない。本モジュールは "1/" + (G数 ÷ 回数の合計) を
+  小数1桁で復元する（回数 0 は "1/0.0"、丸めは Python の '%.1f' と同じ偶数丸め）。
+  復元結果が元と異なるセルはすべて raw に原文を持つため、どんな入力でも
+  v1 の月別JSONと往復で一致する。
+- ブラウザでは js/data.js の expandColumnarDay が、月別JSON（v2）を読んだときと
+  同じ dataCache の行に展開する（列順。回数列は整数で空欄は ''、確率列は "1/x" の
+  x の数値、機種名・台番号は文字列）。
+- 標準ライブラリのみを使用。
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import argparse
+
+import artifacts
+import month_schema
+
+FORMAT = 'columnar-v2'
+READABLE_FORMATS = ('columnar-v1', FORMAT)
+MACHINE_FIELD = '機種名'
+
+# エポックとして日から切り出す列（台配置）
+LAYOUT_FIELDS = ('機種名', '台番号')
+
+# 保存せずに復元する確率列 → 計算に使う列（先頭が G数、残りが回数）
+DERIVED_FIELDS = {
+    '合成確率': ['G数', 'BB', 'RB', 'ART'],
+    'BB確率': ['G数', 'BB'],
+    'RB確率': ['G数', 'RB'],
+    'ART確率': ['G数', 'ART'],
+}
+
+INT_RE = re.compile(r"^-?\d+$")
+
+
+def get_data_dir() -> str:
+    """dataディレクトリのパスを取得"""
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def columnar_path(json_path: str) -> str:
+    """data/YYYY_MM.json → data/YYYY_MM.columnar.json"""
+    return json_path[:-len('.json')] + '.columnar.json'
+
+
+def format_probability(games: int, count: int) -> str:
+    """確率列の文字列（"1/123.9"。回数 0 は "1/0.0"）"""
+    if count == 0:
+        return '1/0.0'
+    return f"1/{games / count:.1f}"
+
+
+def _to_int(text: str):
+    """整数として往復できる文字列だけ int にする（"007" や "" は None）"""
+    if INT_RE.match(text) and str(int(text)) == text:
+        return int(text)
+    return None
+
+
+def _column(doc: dict, day: dict, col: str) -> list:
+    """保存されている列の配列（台配置の列はその日のエポックから引く）"""
+    if 'layout' in day and col in LAYOUT_FIELDS:
+        return doc['layouts'][day['layout']][col]
+    return day[col]
+
+
+def _row_count(doc: dict, day: dict) -> int:
+    columns = [col for col in doc['columns'] if col not in doc['derived']]
+    return len(_column(doc, day, columns[0])) if columns else 0
+
+
+def _decode_cell(doc: dict, day: dict, col: str, i: int) -> str:
+    """1セルを復元（raw は見ない）"""
+    if col == MACHINE_FIELD:
+        return doc['machines'][_column(doc, day, col)[i]]
+    sources = doc['derived'].get(col)
+    if sources:
+        values = [_column(doc, day, src)[i] for src in sources]
+        if any(v is None for v in values):
+            return ''
+        return format_probability(values[0], sum(values[1:]))
+    value = _column(doc, day, col)[i]
+    return '' if value is None else str(value)
+
+
+def encode_month(month_data: dict) -> dict:
+    """
+    月別JSON（v1 の { 日付: [レコード, ...] }）を列指向形式に変換する。
+    列構成が日・行によって異なる場合は ValueError。
+    """
+    columns = []
+    for records in month_data.values():
+        if records:
+            columns = list(records[0].keys())
+            break
+
+    derived = {col: srcs for col, srcs in DERIVED_FIELDS.items()
+               if col in columns and all(src in columns and src not in DERIVED_FIELDS for src in srcs)}
+    layout_fields = [col for col in columns if col in LAYOUT_FIELDS]
+    doc = {
+        'format': FORMAT,
+        'columns': columns,
+        'machines': [],
+        'derived': derived,
+        'layouts': [],
+        'days': {},
+    }
+    machine_ids = {}
+
+    for date_key, records in month_data.items():
+        for record in records:
+            if list(record.keys()) != columns:
+                raise ValueError(f"{date_key}: 列構成が月内で揃っていません")
+
+        stored = {}
+        for col in columns:
+            if col == MACHINE_FIELD:
+                ids = []
+                for r in records:
+                    if r[col] not in machine_ids:
+                        machine_ids[r[col]] = len(doc['machines'])
+                        doc['machines'].append(r[col])
+                    ids.append(machine_ids[r[col]])
+                stored[col] = ids
+            elif col not in derived:
+                stored[col] = [_to_int(r[col]) for r in records]
+
+        # 台配置が直前のエポックと同じなら引き継ぎ、変わった日から新しいエポック
+        layout = {col: stored.pop(col) for col in layout_fields}
+        last = doc['layouts'][-1] if doc['layouts'] else None
+        if last is None or any(last[col] != layout[col] for col in layout_fields):
+            doc['layouts'].append(dict({'from': date_key}, **layout))
+        day = dict({'layout': len(doc['layouts']) - 1}, **stored)
+
+        raw = {}
+        for col in columns:
+            for i, record in enumerate(records):
+                if _decode_cell(doc, day, col, i) != record[col]:
+                    raw.setdefault(col, {})[str(i)] = record[col]
+        if raw:
+            day['raw'] = raw
+
+        doc['days'][date_key] = day
+
+    return doc
+
+
+def _check_format(doc: dict):
+    if doc.get('format') not in READABLE_FORMATS:
+        raise ValueError(f"未対応の形式です: {doc.get('format')}")
+
+
+def decode_day(doc: dict, date_key: str) -> list:
+    """1日分を月別JSONと同じレコード配列に戻す（js/data.js の expandColumnarDay と同じ規則）"""
+    _check_format(doc)
+    day = doc['days'][date_key]
+    raw = day.get('raw', {})
+    records = []
+    for i in range(_row_count(doc, day)):
+        record = {}
+        for col in doc['columns']:
+            override = raw.get(col, {}).get(str(i))
+            record[col] = override if override is not None else _decode_cell(doc, day, col, i)
+        records.append(record)
+    return records
+
+
+def decode_month(doc: dict) -> dict:
+    """列指向形式を月別JSONと同じ構造に戻す"""
+    _check_format(doc)
+    return {date_key: decode_day(doc, date_key) for date_key in doc['days']}
+
+
+def day_layout(doc: dict, date_key: str) -> list:
+    """
+    その日の台配置 [(機種名, 台番号), ...]（行順。O(1) でエポックを引く）。
+    機種名・台番号の列が無い形式では ValueError
+    """
+    _check_format(doc)
+    if not all(col in doc['columns'] for col in LAYOUT_FIELDS):
+        raise ValueError("台配置の列（機種名・台番号）がありません")
+    day = doc['days'][date_key]
+    raw = day.get('raw', {})
+    cells = {}
+    for col in LAYOUT_FIELDS:
+        overrides = raw.get(col, {})
+        cells[col] = [overrides.get(str(i), _decode_cell(doc, day, col, i))
+                      for i in range(_row_count(doc, day))]
+    return list(zip(*(cells[col] for col in LAYOUT_FIELDS)))
+
+
+def save_columnar_month(month_data: dict, json_path: str, profile: str = 'pretty',
+                        sizes: dict = None) -> bool:
+    """
+    月別JSONの内容から列指向版を書き出す（json_path は元の data/YYYY_MM.json）。
+    列指向版は常に空白なし。.gz は profile に合わせる（artifacts.py）
+    """
+    path = columnar_path(json_path)
+    try:
+        doc = encode_month(month_data)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, ensure_ascii=False, separators=(',', ':'))
+        artifacts.sync_gzip(path, profile)
+        if sizes is not None:
+            size, gz_size = artifacts.file_sizes(path)
+            sizes[path] = (size, size, gz_size)
+        return True
+    except Exception as e:
+        print(f"    エラー: 列指向JSON保存失敗 - {e}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列指向の月別JSONを全月分生成")
+    parser.add_argument('--profile', choices=artifacts.PROFILES, default='pretty',
+                        help="compact なら最大圧縮の .gz も併置する（既定: pretty）")
+    args = parser.parse_args()
+
+    data_dir = get_data_dir()
+    month_files = sorted(glob.glob(os.path.join(data_dir, "????_??.json")))
+    if not month_files:
+        print("data/ に YYYY_MM.json が見つかりません。")
+        sys.exit(1)
+
+    total_before = 0
+    total_after = 0
+    for json_path in month_files:
+        month_data = month_schema.read_month_file(json_path)
+
+        doc = encode_month(month_data)
+        if decode_month(doc) != month_data:
+            print(f"✗ {os.path.basename(json_path)}: 復元結果が一致しません（書き出しを中止）")
+            sys.exit(1)
+        if not save_columnar_month(month_data, json_path, args.profile):
+            sys.exit(1)
+
+        before = os.path.getsize(json_path)
+        after = os.path.getsize(columnar_path(json_path))
+        total_before += before
+        total_after += after
+        raw_cells = sum(len(cells) for day in doc['days'].values()
+                        for cells in day.get('raw', {}).values())
+        print(f"  {os.path.basename(json_path)}: {before / 1024:8.1f} KB → {after / 1024:7.1f} KB "
+              f"({before / after:.1f}倍, 機種{len(doc['machines'])}, "
+              f"台配置{len(doc['layouts'])}/{len(doc['days'])}日, 例外セル{raw_cells})")
+
+    print(f"\n合計: {total_before / 1024 / 1024:.1f} MB → {total_after / 1024 / 1024:.1f} MB "
+          f"({total_before / total_after:.1f}倍)")
+
+
+if __name__ == '__main__':
+    main()
@@ -14,24 +14,122 @@ HTMLファイルを月別JSONに統合するスクリプト（CSV同時出力対
     python convert_html_to_json.py
     → 対話形式でHTMLフォルダを指定
 
+    python convert_html_to_json.py C:/Downloads/html_data --workers 4
+    → テーブル抽出とレコード変換を4プロセスで並列実行
+      （--workers 0 でCPUコア数。出力JSONは直列実行と同一）
+
+    python convert_html_to_json.py C:/Downloads/html_data --no-csv
+    → CSVを出力しない（変換には pandas を使わない。files.json 更新時の集計は digit_stats.py・machine_ranks.py を参照）
+
+    python convert_html_to_json.py C:/Downloads/html_data --force
+    → 取り込みマニフェストを無視して全ファイルを再変換・全月を書き直す
+
+    python convert_html_to_json.py C:/Downloads/html_data --journal
+    → 変換した日を1日ずつジャーナル（converter/ingest_journal.jsonl）に
+      追記しながら処理する。途中で落ちても同じコマンドの再実行で
+      ジャーナル済みの日から再開できる（正常終了時にジャーナルは削除）
+
+    python convert_html_to_json.py C:/Downloads/html_data --legacy-strings
+    → 月別JSONを従来の全フィールド文字列形式（スキーマ v1）で書き出す。
+      既定は型付きのスキーマ v2（回数は整数、確率は 1/x の x を実数。month_schema.py）
+
+    python convert_html_to_json.py C:/Downloads/html_data --profile compact
+    → 月別JSON・列指向版・files.json を空白なしで書き出し、静的配信用に
+      最大圧縮の .gz を同じ場所に置く（書き出し前後のサイズを表示。artifacts.py）
+
+    python convert_html_to_json.py --watch C:/inbox
+    → 常駐モード。受信フォルダを監視し、置かれた YYYY_MM_DD *.html が
+      書き込み完了（--debounce 秒間サイズ・更新時刻が不変）したら変換し、
+      files.json を更新して元HTMLを受信フォルダ内の archive/ に移動する。
+      確認プロンプトは出さず、CSVも出力しない。Ctrl-C で終了
+
+    python convert_html_to_json.py --db --db-import-json
+    → 既存の data/*.json を SQLite ストア（converter/hall_data.sqlite3）に取り込む
+
+    python convert_html_to_json.py C:/Downloads/html_data --db --export-json
+    → HTMLを月別JSONではなく SQLite ストアに1日単位で取り込み（O(1日)）、
+      変更のあった月だけ data/YYYY_MM.json に書き出して files.json を更新する
+      （ストアの構造は sqlite_store.py を参照。確認プロンプト・CSV出力なし）
+
+抽出エンジン:
+    既定は lxml で解析済みのツリーから <tr>/<td> を1回だけ走査してレコードを
+    直接生成する（--engine lxml）。pandas.read_html 経由の旧方式は
+    --engine pandas で利用できる。出力JSONはどちらも同一。
+
 機能:
     - HTMLテーブルをCSVとJSONに同時変換
     - 既存のJSONファイルがある場合、新しいデータを追加更新
     - 同じ日付のデータがある場合はHTMLで上書き
+    - 取り込みマニフェスト（converter/ingest_manifest.json）で
+      前回から内容の変わっていないHTMLは解析せずにスキップし、
+      1日でもレコードが変わった月だけ data/YYYY_MM.json を書き直す
     - 変換後のHTMLファイル削除オプション
     - files.json の自動更新
+    - 月別JSONは型付きのスキーマ v2 で書き出す（--legacy-strings で従来の v1）。
+      既存の月別JSONは v1 / v2 どちらも読み込める
+    - 月別JSONと同時に列指向版 data/YYYY_MM.columnar.json を書き出す
+      （ブラウザの初回読み込み用の軽量版。形式は columnar.py を参照）
+    - files.json の更新時に、内容ハッシュ入りの名前で不変の日別シャード
+      data/days/YYYY_MM_DD.<ハッシュ>.json を揃え、月・日ごとのハッシュ・
+      サイズ・行数・日付範囲を files.json に載せる。シャードには機種内バッジ用の
+      その日の機種ごとの機種内順位と分位点も入れる（day_shards.py / machine_ranks.py を参照）
+    - files.json の更新時に、カレンダー用の日別統計 daily_stats.json
+      （日ごとの合計・平均・勝率・台数・最大／最小の機種）も作り直す（daily_stats.py を参照）
+    - files.json の更新時に、解析タブ用の台番号・機種ごとの累積和インデックス
+      prefix_sums.json に新しい日を追記する（prefix_sums.py を参照）
+    - files.json の更新時に、島図・位置フィルター用の島・列・位置ごとの日別集計
+      spatial_stats.json も作る。island-config.json / position.csv が変わったら
+      全月を作り直す（spatial_stats.py を参照）
+    - files.json の更新時に、解析タブ用の台番号末尾・ゾロ目ごとの日別集計 digit_stats.json
+      （events.json のイベント日は機種ごとの内訳つき）も作る（digit_stats.py を参照）
 """
 
 import os
+import re
 import sys
 import json
 import glob
+import time
+import shutil
+import hashlib
+import argparse
+import multiprocessing
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import StringIO
+from typing import TYPE_CHECKING
 
-import pandas as pd
 import lxml.html
 
+import artifacts
+import columnar
+import daily_stats
+import day_shards
+import digit_stats
+import month_schema
+import prefix_sums
+import spatial_stats
+import sqlite_store
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 抽出エンジン（lxml: ネイティブ走査 / pandas: 旧方式 read_html）
+ENGINES = ('lxml', 'pandas')
+
+# pandas.read_html が欠損値とみなす文字列（pandas の既定 na_values と同じ）
+NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null',
+])
+# セル内の余分な空白（pandas.io.html と同じ正規化）
+WHITESPACE_RE = re.compile(r"[\r\n]+|\s{2,}")
+INT_RE = re.compile(r"^[+-]?\d+$")
+FLOAT_RE = re.compile(r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$")
+
 
 def get_script_dir() -> str:
     """スクリプト（またはexe）のディレクトリを取得"""
@@ -61,6 +159,21 @@ def get_files_json_path() -> str:
     return os.path.join(parent_dir, 'files.json')
 
 
+def get_manifest_path() -> str:
+    """取り込みマニフェストのパスを取得（スクリプトと同じ場所）"""
+    return os.path.join(get_script_dir(), 'ingest_manifest.json')
+
+
+def get_journal_path() -> str:
+    """変換ジャーナルのパスを取得（スクリプトと同じ場所）"""
+    return os.path.join(get_script_dir(), 'ingest_journal.jsonl')
+
+
+def get_default_db_path() -> str:
+    """SQLite ストアの既定パスを取得（スクリプトと同じ場所）"""
+    return os.path.join(get_script_dir(), 'hall_data.sqlite3')
+
+
 def get_html_files(input_folder: str) -> list:
     """指定フォルダ内のHTMLファイル一覧を取得"""
     if not os.path.exists(input_folder):
@@ -106,7 +219,13 @@ def group_html_files_by_month(html_files: list) -> dict:
     return dict(sorted(groups.items()))
 
 
-def extract_table_from_html(filepath: str) -> pd.DataFrame:
+def load_pandas():
+    """pandas を遅延インポート（CSV出力・pandasエンジン使用時のみ読み込む）"""
+    import pandas as pd
+    return pd
+
+
+def extract_table_from_html(filepath: str) -> 'pd.DataFrame':
     """
     HTMLファイルからID付きテーブルを抽出してDataFrameで返す
     
@@ -123,7 +242,8 @@ def extract_table_from_html(filepath: str) -> pd.DataFrame:
         first_table_node = tables_with_id[0]
         target_table_html = lxml.html.tostring(first_table_node, encoding='unicode')
         
-        dfs = pd.read_html(target_table_html)
+        pd = load_pandas()
+        dfs = pd.read_html(StringIO(target_table_html))
         if dfs:
             return dfs[0]
         
@@ -134,39 +254,427 @@ def extract_table_from_html(filepath: str) -> pd.DataFrame:
         return None
 
 
-def dataframe_to_dict_list(df: pd.DataFrame) -> list:
-    """DataFrameを辞書のリストに変換（JSON用）"""
-    df = df.fillna('')
+def _cell_text(cell) -> str:
+    """セルのテキストを pandas.read_html と同じ規則で正規化"""
+    return WHITESPACE_RE.sub(' ', cell.text_content().strip())
+
+
+def _take_carry(carry: dict, pos: int) -> str:
+    """rowspan で持ち越したセルを1行分取り出す"""
+    remain, text = carry[pos]
+    if remain > 1:
+        carry[pos] = (remain - 1, text)
+    else:
+        del carry[pos]
+    return text
+
+
+def _expand_rows(rows: list) -> list:
+    """<tr> のリストをテキスト行に展開（colspan/rowspan は同じテキストで埋める）"""
+    result = []
+    carry = {}  # 列位置 -> (残り行数, テキスト)
+    for tr in rows:
+        texts = []
+        for cell in tr.xpath('./td|./th'):
+            while len(texts) in carry:
+                texts.append(_take_carry(carry, len(texts)))
+            text = _cell_text(cell)
+            rowspan = int(cell.get('rowspan') or 1)
+            for _ in range(int(cell.get('colspan') or 1)):
+                if rowspan > 1:
+                    carry[len(texts)] = (rowspan - 1, text)
+                texts.append(text)
+        while len(texts) in carry:
+            texts.append(_take_carry(carry, len(texts)))
+        result.append(texts)
+    return result
+
+
+def _header_names(header_rows: list, n_cols: int) -> list:
+    """ヘッダ行から列名を決定（重複名は pandas と同じく .1, .2 … を付与）"""
+    if header_rows:
+        names = list(header_rows[-1][:n_cols])
+    else:
+        names = []
+    names += [str(i) for i in range(len(names), n_cols)]
+
+    seen = {}
+    for i, name in enumerate(names):
+        if name in seen:
+            seen[name] += 1
+            names[i] = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+    return names
+
+
+def _format_column(values: list) -> list:
+    """
+    1列分のテキストを JSON 用の文字列に整形する。
+    列内の非欠損値がすべて数値なら数値列とみなし、整数値は整数表記
+    （例: "1267.0" → "1267"）に揃える。数値以外が混ざる列は原文のまま
+    （数値形式のセルの桁区切りカンマだけは pandas と同様に除去する）。
+    """
+    texts = []
+    numeric = True
+    for v in values:
+        if v in NA_STRINGS:
+            texts.append(None)
+            continue
+        text = v.replace(',', '')
+        if INT_RE.match(text) or FLOAT_RE.match(text):
+            texts.append(text)
+        else:
+            texts.append(v)
+            numeric = False
+
+    formatted = []
+    for text in texts:
+        if text is None:
+            formatted.append('')
+        elif not numeric:
+            formatted.append(text)
+        elif INT_RE.match(text):
+            formatted.append(str(int(text)))
+        else:
+            f = float(text)
+            formatted.append(str(int(f)) if f == int(f) else str(f))
+    return formatted
+
+
+def extract_records_from_html(filepath: str) -> list:
+    """
+    HTMLファイルからID付きテーブルを抽出し、レコード（辞書）のリストを直接返す。
+    解析済みツリーの <tr>/<td> を1回だけ走査する（pandas 不使用）。
+    ヘッダ判定・空白正規化・欠損値・数値整形は pandas.read_html →
+    dataframe_to_dict_list と同じ結果になるようにしている。
+
+    Returns:
+        list or None
+    """
+    try:
+        tree = lxml.html.parse(filepath)
+        tables_with_id = tree.xpath('//table[@id]')
+
+        if not tables_with_id:
+            return None
+
+        table = tables_with_id[0]
+        header_trs = table.xpath('.//thead//tr')
+        body_trs = table.xpath('.//tbody//tr') + table.xpath('./tr')
+        foot_trs = table.xpath('.//tfoot//tr')
+
+        if not header_trs:
+            # <thead> が無い場合は先頭の「全セルが <th>」の行をヘッダとする
+            while body_trs and all(c.tag == 'th' for c in body_trs[0].xpath('./td|./th')):
+                header_trs.append(body_trs.pop(0))
+
+        header_rows = _expand_rows(header_trs)
+        body_rows = _expand_rows(body_trs + foot_trs)
+        if not body_rows:
+            return None
+
+        n_cols = max(len(row) for row in header_rows + body_rows)
+        names = _header_names(header_rows, n_cols)
+        columns = []
+        for i in range(n_cols):
+            columns.append(_format_column([row[i] if i < len(row) else '' for row in body_rows]))
+
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    except Exception as e:
+        print(f"    エラー: テーブル抽出失敗 - {e}")
+        return None
+
+
+def records_to_dataframe(records: list) -> 'pd.DataFrame':
+    """レコードのリストを DataFrame に変換（CSV出力用）"""
+    pd = load_pandas()
+    return pd.DataFrame(records, columns=list(records[0].keys()))
+
+
+def _format_cell(value) -> str:
+    """1セルを JSON 用の文字列に整形（整数値の float は整数表記）"""
+    if isinstance(value, float) and value == int(value):
+        return str(int(value))
+    return str(value) if value != '' else ''
+
+
+def _series_to_strings(series: 'pd.Series') -> list:
+    """
+    1列分を JSON 用の文字列リストに変換する。dtype ごとに1回だけ分岐し、
+    数値列は numpy でまとめて整形する（欠損値は ''、整数値の float は整数表記）。
+    """
+    import numpy as np
+    pd = load_pandas()
+
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return series.astype(str).tolist()
+
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=np.float64)
+        result = np.full(len(values), '', dtype=object)
+        # int64 へ安全に変換できる範囲の整数値だけを一括変換
+        integral = (np.abs(values) < 2 ** 53) & (values == np.trunc(values))
+        result[integral] = values[integral].astype(np.int64).astype(str)
+        rest = ~integral & ~np.isnan(values)
+        if rest.any():
+            result[rest] = [_format_cell(v) for v in values[rest].tolist()]
+        return result.tolist()
+
+    values = series.fillna('')
+    if pd.api.types.infer_dtype(values, skipna=False) == 'string':
+        return values.tolist()
+    return [_format_cell(v) for v in values.tolist()]
+
+
+def dataframe_to_dict_list(df: 'pd.DataFrame',
+                           schema: int = month_schema.LEGACY_SCHEMA_VERSION) -> list:
+    """
+    DataFrameを辞書のリストに変換（JSON用）。列単位で整形してから1回で組み立てる。
+    schema=2 なら回数列を整数・確率列を実数にした型付きレコードを返す（month_schema.py）
+    """
+    keys = [str(col) for col in df.columns]
+    columns = [_series_to_strings(df.iloc[:, i]) for i in range(len(keys))]
+    records = [dict(zip(keys, values)) for values in zip(*columns)]
+    if schema == month_schema.SCHEMA_VERSION:
+        return month_schema.to_typed_records(records)
+    return records
+
+
+def convert_html_file(filepath: str, engine: str = 'lxml') -> tuple:
+    """
+    HTMLファイル1件を (DataFrame, レコード配列) に変換する。
+    並列モードではワーカープロセス側で実行されるため、トップレベル関数にしている。
+
+    Returns:
+        (df, records) - lxml エンジンでは df は常に None（CSV出力時に records から作る）
+        テーブルが無い/空の場合は (None, None)
+    """
+    if engine == 'pandas':
+        df = extract_table_from_html(filepath)
+        if df is None or df.empty:
+            return None, None
+        return df, dataframe_to_dict_list(df)
+
+    records = extract_records_from_html(filepath)
+    if not records:
+        return None, None
+    return None, records
+
+
+def resolve_worker_count(workers: int) -> int:
+    """ワーカー数を決定（0以下はCPUコア数）"""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def iter_converted_files(file_infos: list, workers: int = 1, engine: str = 'lxml'):
+    """
+    file_infos を順に変換し (file_info, df, records) を入力順で返すジェネレータ。
+
+    workers > 1 の場合はプロセスプールで先行変換するが、結果は必ず入力順
+    （年月→日付順）で返すため、月別JSONへのマージ結果は直列実行と一致する。
+    """
+    if workers <= 1 or len(file_infos) <= 1:
+        for file_info in file_infos:
+            df, records = convert_html_file(file_info['filepath'], engine)
+            yield file_info, df, records
+        return
+
+    filepaths = [info['filepath'] for info in file_infos]
+    chunksize = max(1, len(filepaths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(partial(convert_html_file, engine=engine),
+                               filepaths, chunksize=chunksize)
+        for file_info, (df, records) in zip(file_infos, results):
+            yield file_info, df, records
+
+
+def load_journal(journal_path: str) -> dict:
+    """
+    変換ジャーナルからコミット済みの日を読み込む。
+    書き込み途中で落ちた末尾行は捨て、ファイルをコミット済みの位置まで切り詰める。
+
+    Returns:
+        {(HTMLファイル名, sha256): エントリ}
+    """
+    committed = {}
+    if not os.path.exists(journal_path):
+        return committed
     
-    records = []
-    for _, row in df.iterrows():
-        record = {}
-        for col in df.columns:
-            value = row[col]
-            if isinstance(value, float) and value == int(value):
-                record[str(col)] = str(int(value))
-            else:
-                record[str(col)] = str(value) if value != '' else ''
-        records.append(record)
+    good_size = 0
+    with open(journal_path, 'rb') as f:
+        for line in f:
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError('incomplete line')
+                entry = json.loads(line)
+                key = (entry['source'], entry['sha256'])
+            except (ValueError, KeyError):
+                break
+            committed[key] = entry
+            good_size += len(line)
     
-    return records
+    if good_size != os.path.getsize(journal_path):
+        print("  警告: ジャーナル末尾の書き込み途中の行を破棄しました")
+        with open(journal_path, 'r+b') as f:
+            f.truncate(good_size)
+    
+    return committed
+
+
+def append_journal(journal, file_info: dict, records: list):
+    """変換した1日分をジャーナルに追記し、ディスクまで確実に書き出す"""
+    entry = {
+        'source': os.path.basename(file_info['filepath']),
+        'sha256': file_info['sha256'],
+        'date_key': file_info['date_key'],
+        'records': records,
+    }
+    journal.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def iter_journaled_files(file_infos: list, journal_path: str,
+                         workers: int = 1, engine: str = 'lxml'):
+    """
+    iter_converted_files のジャーナル版。入力順に (file_info, df, records) を返す。
+    ジャーナルにコミット済みの日（ファイル名と内容ハッシュが一致）は解析せずに
+    ジャーナルの records を返し、それ以外は変換してすぐジャーナルへ追記する。
+    """
+    committed = load_journal(journal_path)
+    
+    resumed = []
+    for file_info in file_infos:
+        if 'sha256' not in file_info:
+            file_info['sha256'] = file_sha256(file_info['filepath'])
+        entry = committed.get((os.path.basename(file_info['filepath']), file_info['sha256']))
+        if entry is not None and entry.get('date_key') != file_info['date_key']:
+            entry = None
+        resumed.append(entry)
+    
+    if committed:
+        print(f"ジャーナルから再開: {sum(1 for e in resumed if e is not None)}日分は解析済み")
+    
+    todo = [info for info, entry in zip(file_infos, resumed) if entry is None]
+    converted = iter_converted_files(todo, workers, engine)
+    
+    with open(journal_path, 'a', encoding='utf-8', newline='\n') as journal:
+        for file_info, entry in zip(file_infos, resumed):
+            if entry is not None:
+                yield file_info, None, entry['records']
+                continue
+            converted_info, df, records = next(converted)
+            if records:
+                append_journal(journal, converted_info, records)
+            yield converted_info, df, records
 
 
 def load_existing_json(json_path: str) -> dict:
-    """既存のJSONファイルを読み込む"""
+    """既存の月別JSONを読み込む（v1 / v2 どちらも v1 の文字列レコードで返す）"""
     if not os.path.exists(json_path):
         return {}
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data
+        return month_schema.read_month_file(json_path)
     except Exception as e:
         print(f"    警告: 既存JSONの読み込みに失敗 - {e}")
         return {}
 
 
-def save_csv(df: pd.DataFrame, csv_path: str) -> bool:
+def new_manifest() -> dict:
+    """空の取り込みマニフェスト"""
+    return {
+        'version': 1,
+        'sources': {},   # HTMLファイル名 -> {date_key, sha256, stat}
+        'days': {},      # 日付キー -> その日のレコードのハッシュ
+        'months': {},    # 年月 -> 最後に書き出した月JSONの stat（外部編集の検知用）
+    }
+
+
+def load_manifest() -> dict:
+    """取り込みマニフェストを読み込む（無い・壊れている場合は空）"""
+    manifest_path = get_manifest_path()
+    if not os.path.exists(manifest_path):
+        return new_manifest()
+    
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != 1:
+            return new_manifest()
+        return manifest
+    except Exception as e:
+        print(f"    警告: 取り込みマニフェストの読み込みに失敗 - {e}")
+        return new_manifest()
+
+
+def file_signature(filepath: str) -> list:
+    """ファイルの [サイズ, 更新時刻(ns)]。存在しなければ None"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def file_sha256(filepath: str) -> str:
+    """ファイル内容の SHA-256"""
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def records_hash(records: list) -> str:
+    """1日分のレコードの SHA-256（キー順・値をそのまま正規化してハッシュ）"""
+    payload = json.dumps(records, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_month_current(manifest: dict, year_month: str, json_path: str) -> bool:
+    """月JSONが前回この変換で書き出したままか（外部で編集・削除されていないか）"""
+    signature = file_signature(json_path)
+    return signature is not None and manifest['months'].get(year_month) == signature
+
+
+def is_source_unchanged(manifest: dict, file_info: dict) -> bool:
+    """
+    HTMLファイルが取り込み済みの内容から変わっていないか。
+    stat が一致すれば読まずに判定し、違う場合だけ内容ハッシュを比較する。
+    計算したハッシュは file_info['sha256'] に残す。
+    """
+    filepath = file_info['filepath']
+    entry = manifest['sources'].get(os.path.basename(filepath))
+    if not entry or entry.get('date_key') != file_info['date_key']:
+        return False
+    
+    signature = file_signature(filepath)
+    if entry.get('stat') == signature:
+        return True
+    
+    file_info['sha256'] = file_sha256(filepath)
+    if entry.get('sha256') == file_info['sha256']:
+        entry['stat'] = signature
+        return True
+    return False
+
+
+def record_source(manifest: dict, file_info: dict):
+    """取り込みに成功したHTMLファイルをマニフェストに記録"""
+    filepath = file_info['filepath']
+    manifest['sources'][os.path.basename(filepath)] = {
+        'date_key': file_info['date_key'],
+        'sha256': file_info.get('sha256') or file_sha256(filepath),
+        'stat': file_signature(filepath),
+    }
+
+
+def save_csv(df: 'pd.DataFrame', csv_path: str) -> bool:
     """DataFrameをCSVとして保存"""
     try:
         df.to_csv(csv_path, index=False, encoding='utf-8-sig')
@@ -176,21 +684,98 @@ def save_csv(df: pd.DataFrame, csv_path: str) -> bool:
         return False
 
 
-def save_json(data: dict, json_path: str) -> bool:
-    """辞書をJSONとして保存"""
+def save_json(data: dict, json_path: str, profile: str = 'pretty') -> bool:
+    """辞書をJSONとして保存（profile は artifacts.py を参照）"""
     try:
         with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write(artifacts.dumps(data, profile))
         return True
     except Exception as e:
         print(f"    エラー: JSON保存失敗 - {e}")
         return False
 
 
-def convert_html_to_json(input_folder: str) -> dict:
+def save_public_json(data: dict, json_path: str, profile: str = 'pretty',
+                     sizes: dict = None) -> bool:
+    """
+    ブラウザに配信するJSONを保存し、.gz をプロファイルに合わせる。
+    sizes を渡すと { パス: (indent=2 の場合, 書き出し後, .gz) } のサイズを記録する
+    """
+    if not save_json(data, json_path, profile):
+        return False
+    artifacts.sync_gzip(json_path, profile)
+    if sizes is not None:
+        size, gz_size = artifacts.file_sizes(json_path)
+        baseline = artifacts.pretty_size(data) if profile == 'compact' else size
+        sizes[json_path] = (baseline, size, gz_size)
+    return True
+
+
+def write_artifact(parent_dir: str, name: str, doc: dict, profile: str = 'pretty',
+                   sizes: dict = None) -> dict:
+    """
+    files.json から参照する集計ファイル（プロジェクトルート parent_dir からの相対パス name）を
+    常に空白なしで書き出し、.gz をプロファイルに合わせる。
+    sizes を渡すとサイズを記録する。files.json に載せるエントリ { path, sha256 } を返す
+    """
+    path = os.path.join(parent_dir, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(',', ':'))
+    artifacts.sync_gzip(path, profile)
+    if sizes is not None:
+        size, gz_size = artifacts.file_sizes(path)
+        sizes[path] = (size, size, gz_size)
+    return {"path": name, "sha256": file_sha256(path)}
+
+
+def save_month_json(month_data: dict, json_path: str,
+                    schema: int = month_schema.SCHEMA_VERSION,
+                    profile: str = 'pretty', sizes: dict = None) -> bool:
+    """月データ（v1 のレコード）を指定スキーマ・プロファイルの月別JSONとして保存"""
+    return save_public_json(month_schema.dump_month(month_data, schema), json_path,
+                            profile, sizes)
+
+
+def convert_html_to_json(input_folder: str, workers: int = 1,
+                         engine: str = 'lxml', write_csv: bool = True,
+                         force: bool = False, journal: bool = False,
+                         schema: int = month_schema.SCHEMA_VERSION,
+                         profile: str = 'pretty') -> dict:
+    """
+    フォルダ内のHTMLファイルをCSV/JSONに変換（引数は convert_html_files と同じ）
+    
+    Returns:
+        変換結果の統計情報
+    """
+    html_files = get_html_files(input_folder)
+    
+    if not html_files:
+        print("エラー: HTMLファイルが見つかりませんでした")
+        return {'success': False}
+    
+    return convert_html_files(html_files, workers=workers, engine=engine,
+                              write_csv=write_csv, force=force, journal=journal,
+                              schema=schema, profile=profile)
+
+
+def convert_html_files(html_files: list, workers: int = 1,
+                       engine: str = 'lxml', write_csv: bool = True,
+                       force: bool = False, journal: bool = False,
+                       schema: int = month_schema.SCHEMA_VERSION,
+                       profile: str = 'pretty') -> dict:
     """
     HTMLファイルをCSV/JSONに変換
     
+    Args:
+        html_files: HTMLファイルのパス一覧
+        workers: 並列変換のワーカー数（1=直列、0以下=CPUコア数）
+        engine: テーブル抽出エンジン（'lxml' または 'pandas'）
+        write_csv: False なら CSV を出力しない
+        force: True なら取り込みマニフェストによるスキップを行わない
+        journal: True ならジャーナルに1日ずつ記録しながら変換する（中断後の再開用）
+        schema: 書き出す月別JSONのスキーマ（2=型付き、1=全フィールド文字列）
+        profile: 月別JSON・列指向版の書き出しプロファイル（'pretty' / 'compact'）
+    
     Returns:
         変換結果の統計情報
     """
@@ -201,12 +786,6 @@ def convert_html_to_json(input_folder: str) -> dict:
         print(f"エラー: dataディレクトリが見つかりません: {data_dir}")
         return {'success': False}
     
-    html_files = get_html_files(input_folder)
-    
-    if not html_files:
-        print("エラー: HTMLファイルが見つかりませんでした")
-        return {'success': False}
-    
     grouped = group_html_files_by_month(html_files)
     
     if not grouped:
@@ -217,6 +796,10 @@ def convert_html_to_json(input_folder: str) -> dict:
     print(f"\n検出されたHTMLファイル: {len(html_files)}件")
     print(f"対象年月: {', '.join(grouped.keys())}")
     
+    workers = resolve_worker_count(workers)
+    if workers > 1:
+        print(f"並列変換: {workers}ワーカー")
+    
     stats = {
         'success': True,
         'total_files': len(html_files),
@@ -225,15 +808,46 @@ def convert_html_to_json(input_folder: str) -> dict:
         'csv_files': [],
         'json_updated': 0,
         'errors': 0,
-        'converted_html_files': []
+        'skipped_files': 0,
+        'converted_html_files': [],
+        'output_sizes': {}
     }
     
+    # 前回から変わっていないHTMLは解析対象から外す
+    # （月JSONが外部で編集されていた場合は、その月のファイルをすべて再処理する）
+    manifest = load_manifest()
+    pending = {}
     for year_month, file_infos in grouped.items():
+        json_path = os.path.join(data_dir, f"{year_month}.json")
+        month_current = not force and is_month_current(manifest, year_month, json_path)
+        pending[year_month] = []
+        for file_info in file_infos:
+            if month_current and is_source_unchanged(manifest, file_info):
+                stats['skipped_files'] += 1
+                stats['converted_html_files'].append(file_info['filepath'])
+            else:
+                pending[year_month].append(file_info)
+    
+    if stats['skipped_files']:
+        print(f"取り込み済み（変更なし）: {stats['skipped_files']}件はスキップします")
+    
+    # 全月分をまとめて投入し、月→日付の順で結果を受け取る
+    all_file_infos = [info for infos in pending.values() for info in infos]
+    if journal:
+        converted = iter_journaled_files(all_file_infos, get_journal_path(), workers, engine)
+    else:
+        converted = iter_converted_files(all_file_infos, workers, engine)
+    
+    for year_month, file_infos in pending.items():
+        if not file_infos:
+            continue
+        
         print(f"\n{'='*50}")
         print(f"{year_month} の処理を開始 ({len(file_infos)}ファイル)")
         print('='*50)
         
         json_path = os.path.join(data_dir, f"{year_month}.json")
+        month_current = is_month_current(manifest, year_month, json_path)
         
         existing_data = load_existing_json(json_path)
         if existing_data:
@@ -244,44 +858,75 @@ def convert_html_to_json(input_folder: str) -> dict:
         
         new_count = 0
         update_count = 0
+        unchanged_count = 0
+        ingested = []
         
-        for file_info in file_infos:
+        for _ in file_infos:
+            file_info, df, records = next(converted)
             filepath = file_info['filepath']
             date_key = file_info['date_key']
             filename = os.path.basename(filepath)
             
             print(f"\n  処理中: {filename}")
             
-            df = extract_table_from_html(filepath)
-            
-            if df is None or df.empty:
+            if not records:
                 print(f"    ✗ データなし（スキップ）")
                 stats['errors'] += 1
                 continue
             
             # CSV保存（スクリプトと同じディレクトリ）
-            csv_path = os.path.join(csv_dir, f"{date_key}.csv")
-            if save_csv(df, csv_path):
-                print(f"    ✓ CSV保存: {date_key}.csv ({len(df)}件)")
-                stats['csv_created'] += 1
-                stats['csv_files'].append(csv_path)
-            
-            records = dataframe_to_dict_list(df)
+            if write_csv:
+                if df is None:
+                    df = records_to_dataframe(records)
+                csv_path = os.path.join(csv_dir, f"{date_key}.csv")
+                if save_csv(df, csv_path):
+                    print(f"    ✓ CSV保存: {date_key}.csv ({len(df)}件)")
+                    stats['csv_created'] += 1
+                    stats['csv_files'].append(csv_path)
             
             if date_key in existing_dates:
-                update_count += 1
-                print(f"    ↻ JSON更新: {date_key} ({len(records)}件)")
+                # 既存日の比較はマニフェストのハッシュを正とする（月JSONが外部編集されていれば実データ）
+                if month_current and date_key in manifest['days']:
+                    known_hash = manifest['days'][date_key]
+                else:
+                    known_hash = records_hash(existing_data[date_key])
+                if records_hash(records) == known_hash:
+                    unchanged_count += 1
+                    print(f"    ＝ 内容変更なし: {date_key} ({len(records)}件)")
+                else:
+                    update_count += 1
+                    print(f"    ↻ JSON更新: {date_key} ({len(records)}件)")
             else:
                 new_count += 1
                 print(f"    ✓ JSON追加: {date_key} ({len(records)}件)")
             
             monthly_data[date_key] = records
+            ingested.append(file_info)
             stats['converted_html_files'].append(filepath)
         
+        if new_count == 0 and update_count == 0 and not force:
+            # 1日もレコードが変わっていなければ月JSONは書き直さない
+            print(f"\n  {year_month}.json は変更なし（書き込みをスキップ）")
+            for file_info in ingested:
+                record_source(manifest, file_info)
+            if existing_data and not month_current:
+                for date_key, records in existing_data.items():
+                    manifest['days'][date_key] = records_hash(records)
+                manifest['months'][year_month] = file_signature(json_path)
+            continue
+        
         sorted_data = dict(sorted(monthly_data.items()))
         
-        if save_json(sorted_data, json_path):
+        if save_month_json(sorted_data, json_path, schema, profile, stats['output_sizes']):
             stats['json_updated'] += 1
+            columnar.save_columnar_month(sorted_data, json_path, profile, stats['output_sizes'])
+            
+            for date_key, records in sorted_data.items():
+                manifest['days'][date_key] = records_hash(records)
+            manifest['months'][year_month] = file_signature(json_path)
+            for file_info in ingested:
+                record_source(manifest, file_info)
+            save_json(manifest, get_manifest_path())
             
             file_size = os.path.getsize(json_path) / 1024
             print(f"\n  {year_month}.json 保存完了")
@@ -298,9 +943,181 @@ def convert_html_to_json(input_folder: str) -> dict:
                 'updated': update_count
             })
     
+    save_json(manifest, get_manifest_path())
+    
+    if profile == 'compact':
+        artifacts.print_size_report(stats['output_sizes'], os.path.dirname(data_dir))
+    
+    # 全月の書き出しまで完了したのでジャーナルは不要
+    if journal and os.path.exists(get_journal_path()):
+        os.remove(get_journal_path())
+    
+    return stats
+
+
+def ingest_html_files_to_db(html_files: list, db_path: str, workers: int = 1,
+                            engine: str = 'lxml', force: bool = False) -> dict:
+    """
+    HTMLファイルを SQLite ストアに1日単位で取り込む（月別JSONは書かない）。
+    内容が前回と同じHTMLは解析せず、レコードが変わらない日は書き込まない。
+    
+    Returns:
+        変換結果の統計情報
+    """
+    grouped = group_html_files_by_month(html_files)
+    if not grouped:
+        print("エラー: 有効な日付形式のHTMLファイルが見つかりませんでした")
+        print("  期待する形式: YYYY_MM_DD *.html")
+        return {'success': False}
+    
+    stats = {
+        'success': True,
+        'total_files': len(html_files),
+        'skipped_files': 0,
+        'new': 0,
+        'updated': 0,
+        'unchanged': 0,
+        'errors': 0,
+        'converted_html_files': []
+    }
+    
+    conn = sqlite_store.open_store(db_path)
+    try:
+        pending = []
+        for file_info in (info for infos in grouped.values() for info in infos):
+            file_info['sha256'] = file_sha256(file_info['filepath'])
+            name = os.path.basename(file_info['filepath'])
+            if not force and sqlite_store.get_source_hash(conn, name, file_info['date_key']) == file_info['sha256']:
+                stats['skipped_files'] += 1
+                stats['converted_html_files'].append(file_info['filepath'])
+            else:
+                pending.append(file_info)
+        
+        print(f"\n検出されたHTMLファイル: {len(html_files)}件"
+              f"（取り込み済み・変更なし {stats['skipped_files']}件）")
+        
+        for file_info, _, records in iter_converted_files(pending, resolve_worker_count(workers), engine):
+            date_key = file_info['date_key']
+            print(f"  処理中: {os.path.basename(file_info['filepath'])}")
+            if not records:
+                print(f"    ✗ データなし（スキップ）")
+                stats['errors'] += 1
+                continue
+            
+            day_hash = records_hash(records)
+            known_hash = sqlite_store.get_day_hash(conn, date_key)
+            if known_hash == day_hash and not force:
+                stats['unchanged'] += 1
+                print(f"    ＝ 内容変更なし: {date_key} ({len(records)}件)")
+            else:
+                try:
+                    sqlite_store.upsert_day(conn, date_key, records, day_hash)
+                except ValueError as e:
+                    print(f"    ✗ DB取り込み失敗 - {e}")
+                    stats['errors'] += 1
+                    continue
+                if known_hash is None:
+                    stats['new'] += 1
+                    print(f"    ✓ DB追加: {date_key} ({len(records)}件)")
+                else:
+                    stats['updated'] += 1
+                    print(f"    ↻ DB更新: {date_key} ({len(records)}件)")
+            
+            sqlite_store.record_source(conn, os.path.basename(file_info['filepath']),
+                                       file_info['sha256'], date_key)
+            stats['converted_html_files'].append(file_info['filepath'])
+    finally:
+        conn.close()
+    
+    print(f"\nDB取り込み完了: 新規{stats['new']}日 / 更新{stats['updated']}日 / "
+          f"変更なし{stats['unchanged']}日 / エラー{stats['errors']}件")
     return stats
 
 
+def import_month_json_to_db(db_path: str) -> int:
+    """既存の data/YYYY_MM.json を SQLite ストアに取り込む（初期移行用）。取り込んだ日数を返す"""
+    data_dir = get_data_dir()
+    conn = sqlite_store.open_store(db_path)
+    imported = 0
+    try:
+        for json_path in sorted(glob.glob(os.path.join(data_dir, "????_??.json"))):
+            month_data = load_existing_json(json_path)
+            for date_key, records in sorted(month_data.items()):
+                day_hash = records_hash(records)
+                if sqlite_store.get_day_hash(conn, date_key) != day_hash:
+                    sqlite_store.upsert_day(conn, date_key, records, day_hash)
+                    imported += 1
+            # 取り込んだ月は data/ の内容そのものなので書き出し不要
+            sqlite_store.mark_exported(conn, os.path.basename(json_path)[:-len('.json')])
+            print(f"  {os.path.basename(json_path)}: {len(month_data)}日分")
+    finally:
+        conn.close()
+    
+    print(f"\nDBへの取り込み完了: {imported}日分を追加・更新")
+    return imported
+
+
+def export_db_to_json(db_path: str, export_all: bool = False,
+                      schema: int = month_schema.SCHEMA_VERSION,
+                      profile: str = 'pretty') -> int:
+    """
+    SQLite ストアから月別JSONを書き出す（既定は前回の書き出し以降に変わった月のみ）。
+    書き出した月数を返す。
+    """
+    data_dir = get_data_dir()
+    conn = sqlite_store.open_store(db_path)
+    exported = 0
+    sizes = {}
+    try:
+        for year_month in sqlite_store.list_months(conn, dirty_only=not export_all):
+            json_path = os.path.join(data_dir, f"{year_month}.json")
+            month_data = sqlite_store.load_month(conn, year_month)
+            if save_month_json(month_data, json_path, schema, profile, sizes):
+                columnar.save_columnar_month(month_data, json_path, profile, sizes)
+                sqlite_store.mark_exported(conn, year_month)
+                exported += 1
+                file_size = os.path.getsize(json_path) / 1024
+                print(f"  {year_month}.json 書き出し: {len(month_data)}日分 ({file_size:.1f} KB)")
+    finally:
+        conn.close()
+    
+    print(f"\nJSON書き出し完了: {exported}ファイル")
+    if profile == 'compact':
+        artifacts.print_size_report(sizes, os.path.dirname(data_dir))
+    return exported
+
+
+def run_db_mode(args: argparse.Namespace):
+    """--db 指定時の処理（取り込み・書き出しとも確認なし）"""
+    db_path = args.db
+    print(f"SQLiteストア: {db_path}")
+    
+    if args.db_import_json:
+        print("\n既存の月別JSONをDBに取り込みます")
+        import_month_json_to_db(db_path)
+    
+    if args.input_folder:
+        if not os.path.isdir(args.input_folder):
+            print(f"\nエラー: 指定されたパスはディレクトリではありません")
+            sys.exit(1)
+        html_files = get_html_files(args.input_folder)
+        if html_files:
+            stats = ingest_html_files_to_db(html_files, db_path, workers=args.workers,
+                                            engine=args.engine, force=args.force)
+            if not stats.get('success'):
+                sys.exit(1)
+        else:
+            print("HTMLファイルが見つかりませんでした")
+    
+    if args.export_json:
+        print("\nDBから月別JSONを書き出します")
+        if export_db_to_json(db_path, export_all=args.force, schema=args.schema,
+                             profile=args.profile):
+            update_files_json(args.profile)
+    
+    print("\n処理が完了しました")
+
+
 def delete_converted_html_files(html_files: list):
     """変換済みのHTMLファイルを削除"""
     if not html_files:
@@ -358,8 +1175,107 @@ def delete_csv_files(csv_files: list):
         print("CSVファイルを保持しました")
 
 
-def update_files_json():
-    """files.jsonを更新"""
+def refresh_columnar_files(monthly_files: list, profile: str = 'pretty',
+                           sizes: dict = None) -> bool:
+    """
+    列指向版が無い・月別JSONより古い月だけ作り直す（.gz はプロファイルに合わせる）。
+    すべての月で最新の列指向版が揃っていれば True
+    """
+    parent_dir = os.path.dirname(get_data_dir())
+    all_current = True
+    for relative_path in monthly_files:
+        json_path = os.path.join(parent_dir, relative_path)
+        columnar_path = columnar.columnar_path(json_path)
+        if (os.path.exists(columnar_path)
+                and os.path.getmtime(columnar_path) >= os.path.getmtime(json_path)):
+            if artifacts.sync_gzip(columnar_path, profile) and sizes is not None:
+                sizes[columnar_path] = (os.path.getsize(columnar_path),) + artifacts.file_sizes(columnar_path)
+            continue
+        month_data = load_existing_json(json_path)
+        if month_data and columnar.save_columnar_month(month_data, json_path, profile, sizes):
+            print(f"  列指向JSONを再生成: {os.path.basename(columnar_path)}")
+        else:
+            all_current = False
+    return all_current
+
+
+def _build_daily_stats(parent_dir: str, months: dict) -> tuple:
+    path = daily_stats.stats_path(parent_dir)
+    stats = daily_stats.build_stats(parent_dir, months, daily_stats.load_previous(path))
+    days = sum(len(month['days']) for month in stats['months'].values())
+    return daily_stats.STATS_FILENAME, stats, f"{days}日分"
+
+
+def _build_prefix_sums(parent_dir: str, months: dict) -> tuple:
+    path = prefix_sums.index_path(parent_dir)
+    doc, reread = prefix_sums.build_index(parent_dir, months, prefix_sums.load_previous(path))
+    return prefix_sums.INDEX_FILENAME, doc, f"{len(doc['dates'])}日分（読み直し {reread}日）"
+
+
+def _build_spatial_stats(parent_dir: str, months: dict) -> tuple:
+    path = spatial_stats.stats_path(parent_dir)
+    stats, reread = spatial_stats.build_stats(parent_dir, months, spatial_stats.load_previous(path))
+    if stats is None:
+        return spatial_stats.STATS_FILENAME, None, None
+    return (spatial_stats.STATS_FILENAME, stats,
+            f"{len(stats['groups'])}グループ（読み直し {reread}か月）")
+
+
+def _build_digit_stats(parent_dir: str, months: dict) -> tuple:
+    path = digit_stats.stats_path(parent_dir)
+    stats, reread = digit_stats.build_stats(parent_dir, months, digit_stats.load_previous(path))
+    event_days = sum(len(month['events']) for month in stats['months'].values())
+    return (digit_stats.STATS_FILENAME, stats,
+            f"イベント日 {event_days}日（読み直し {reread}か月）")
+
+
+# files.json から参照する集計ファイル（常に空白なし。write_artifact で書き出す）
+#   (files.json のキー, 表示名, 作る関数 (parent_dir, months) → (ファイル名, 内容, 結果の表示),
+#    作れなかったときのブラウザ側の扱い)
+# 作る関数は、元にするデータが無いときは内容を None で返す（files.json には null を載せる）
+PUBLIC_ARTIFACTS = (
+    ('daily_stats', '日別統計', _build_daily_stats,
+     'カレンダーは読み込み済みの日から集計します'),
+    ('prefix_sums', '累積和インデックス', _build_prefix_sums,
+     '解析タブは行から集計します'),
+    ('spatial_stats', '島・位置別集計', _build_spatial_stats,
+     '島図は読み込んだ日の行から集計します'),
+    ('digit_stats', '末尾別集計', _build_digit_stats,
+     '解析タブは読み込み済みの日から集計します'),
+)
+
+
+def update_artifact(parent_dir: str, months: dict, artifact: tuple, profile: str = 'pretty',
+                    sizes: dict = None) -> dict:
+    """
+    PUBLIC_ARTIFACTS の1つを作り直し、files.json に載せるエントリ { path, sha256 } を返す
+    （作るデータが無い・失敗時は None）
+    """
+    _, label, build, _ = artifact
+    try:
+        name, doc, summary = build(parent_dir, months)
+        if doc is None:
+            return None
+        entry = write_artifact(parent_dir, name, doc, profile, sizes)
+    except Exception as e:
+        print(f"    エラー: {label}保存失敗 - {e}")
+        return None
+    print(f"  {label}: {summary}")
+    return entry
+
+
+def update_files_json(profile: str = 'pretty'):
+    """
+    files.jsonを更新（compact プロファイルでは全公開JSONの .gz も揃える）。
+    files.json は起動時に必ず読む上に日ごとの表が大きいため、集計ファイルと同じく
+    プロファイルによらず空白なしで書く（write_artifact）。
+    日別シャード data/days/ を揃え、月・日ごとのハッシュ・サイズ・行数・日付範囲を
+    載せた version 2 のマニフェストにする（day_shards.py。シャードには機種内順位も入れる）。
+    カレンダー用の日別統計 daily_stats.json も同時に作り直し（daily_stats.py）、
+    解析タブ用の累積和インデックス prefix_sums.json に新しい日を追記する（prefix_sums.py）。
+    島図・位置フィルター用の島・列・位置ごとの日別集計 spatial_stats.json、
+    末尾・ゾロ目ごとの日別集計 digit_stats.json も揃える（spatial_stats.py / digit_stats.py）
+    """
     data_dir = get_data_dir()
     files_json_path = get_files_json_path()
     
@@ -377,19 +1293,129 @@ def update_files_json():
     
     monthly_files.sort(reverse=True)
     
+    sizes = {}
+    parent_dir = os.path.dirname(data_dir)
+    shards = day_shards.build_manifest(parent_dir, monthly_files,
+                                       day_shards.load_previous(files_json_path), profile)
     files_data = {
-        "monthly": monthly_files
+        "version": day_shards.MANIFEST_VERSION,
+        "monthly": monthly_files,
+        # 全月の列指向版が最新のときだけブラウザに使わせる
+        "columnar": refresh_columnar_files(monthly_files, profile, sizes),
+        "min_date": shards['min_date'],
+        "max_date": shards['max_date'],
+        "months": shards['months'],
+        "days": shards['days'],
     }
+    for artifact in PUBLIC_ARTIFACTS:
+        files_data[artifact[0]] = update_artifact(parent_dir, shards['months'], artifact,
+                                                  profile, sizes)
+    
+    # 今回書き直していない月別JSONも .gz をプロファイルに合わせる
+    for filepath in json_files:
+        if f"data/{os.path.basename(filepath)}" in monthly_files and artifacts.sync_gzip(filepath, profile):
+            sizes[filepath] = (os.path.getsize(filepath),) + artifacts.file_sizes(filepath)
     
     try:
-        with open(files_json_path, 'w', encoding='utf-8') as f:
-            json.dump(files_data, f, ensure_ascii=False, indent=2)
-        
+        write_artifact(parent_dir, os.path.basename(files_json_path), files_data, profile, sizes)
+        saved = True
+    except Exception as e:
+        print(f"    エラー: JSON保存失敗 - {e}")
+        saved = False
+    
+    if saved:
         print(f"\nfiles.json を更新しました")
         print(f"  月別JSON: {len(monthly_files)}ファイル")
-        
-    except Exception as e:
-        print(f"\nエラー: files.json の更新に失敗 - {e}")
+        removed = day_shards.prune_shards(parent_dir, files_data["days"])
+        print(f"  日別シャード: {len(files_data['days'])}日分（新規 {shards['written']}、削除 {removed}）")
+        for key, label, _, fallback in PUBLIC_ARTIFACTS:
+            if files_data[key] is None:
+                print(f"  {label}: 作成できなかったため{fallback}")
+        if not files_data["columnar"]:
+            print("  列指向JSON: 一部の月で作成できなかったため通常の月別JSONを使用します")
+        if profile == 'compact':
+            artifacts.print_size_report(sizes, os.path.dirname(files_json_path))
+    else:
+        print(f"\nエラー: files.json の更新に失敗")
+
+
+def archive_html_file(filepath: str, archive_dir: str):
+    """処理済みHTMLをアーカイブフォルダへ移動（同名があれば上書き）"""
+    os.makedirs(archive_dir, exist_ok=True)
+    dest = os.path.join(archive_dir, os.path.basename(filepath))
+    if os.path.exists(dest):
+        os.remove(dest)
+    shutil.move(filepath, dest)
+
+
+def watch_inbox(inbox: str, archive_dir: str, interval: float = 2.0,
+                debounce: float = 5.0, workers: int = 1, engine: str = 'lxml',
+                journal: bool = False, schema: int = month_schema.SCHEMA_VERSION,
+                profile: str = 'pretty'):
+    """
+    受信フォルダを監視し、届いたHTMLを変換 → files.json 更新 → アーカイブ移動
+    まで確認なしで行う常駐ループ（Ctrl-C で終了）。
+
+    書き込み途中のファイルを拾わないよう、サイズと更新時刻が debounce 秒間
+    変わらなかったファイルだけを1バッチとして変換する。
+    変換に失敗したファイルは受信フォルダに残し、内容が変わるまで再試行しない。
+    """
+    print(f"\n受信フォルダを監視中: {inbox}")
+    print(f"  アーカイブ先: {archive_dir}")
+    print(f"  ポーリング間隔: {interval}秒 / 書き込み完了の判定: {debounce}秒")
+    print("  終了するには Ctrl-C")
+    
+    seen = {}     # パス -> (stat, その stat を最初に見た時刻)
+    failed = {}   # パス -> 失敗時の stat
+    
+    try:
+        while True:
+            now = time.monotonic()
+            ready = []
+            current = set()
+            for filepath in get_html_files(inbox):
+                date_key, _ = parse_date_from_filename(filepath)
+                signature = file_signature(filepath)
+                if not date_key or signature is None:
+                    continue
+                current.add(filepath)
+                if failed.get(filepath) == signature:
+                    continue
+                prev = seen.get(filepath)
+                if prev is None or prev[0] != signature:
+                    seen[filepath] = (signature, now)
+                elif now - prev[1] >= debounce:
+                    ready.append(filepath)
+            
+            for filepath in list(seen):
+                if filepath not in current:
+                    del seen[filepath]
+            
+            if ready:
+                print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] 新着HTML: {len(ready)}件")
+                stats = convert_html_files(ready, workers=workers, engine=engine,
+                                           write_csv=False, journal=journal, schema=schema,
+                                           profile=profile)
+                if stats.get('success'):
+                    show_summary(stats)
+                    if stats['json_updated']:
+                        update_files_json(profile)
+                    converted = set(stats['converted_html_files'])
+                    for filepath in ready:
+                        if filepath in converted:
+                            archive_html_file(filepath, archive_dir)
+                        else:
+                            print(f"  ✗ 変換できなかったため受信フォルダに残します: "
+                                  f"{os.path.basename(filepath)}")
+                            failed[filepath] = seen[filepath][0]
+                        seen.pop(filepath, None)
+                else:
+                    for filepath in ready:
+                        failed[filepath] = seen.pop(filepath)[0]
+            
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
 
 
 def show_summary(stats: dict):
@@ -400,6 +1426,8 @@ def show_summary(stats: dict):
     print(f"処理HTMLファイル: {stats['total_files']}件")
     print(f"作成CSV: {stats['csv_created']}件")
     print(f"更新JSON: {stats['json_updated']}件")
+    if stats.get('skipped_files'):
+        print(f"スキップ（取り込み済み・変更なし）: {stats['skipped_files']}件")
     if stats['errors'] > 0:
         print(f"エラー: {stats['errors']}件")
     
@@ -410,6 +1438,46 @@ def show_summary(stats: dict):
                   f"(新規{m['new']}, 更新{m['updated']})")
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description="HTML → JSON 統合変換スクリプト")
+    parser.add_argument('input_folder', nargs='?',
+                        help="YYYY_MM_DD *.html を含むフォルダ（省略時は対話入力）")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="並列変換のワーカー数（1=直列、0=CPUコア数。既定: 1）")
+    parser.add_argument('--engine', choices=ENGINES, default='lxml',
+                        help="テーブル抽出エンジン（既定: lxml）")
+    parser.add_argument('--no-csv', dest='write_csv', action='store_false',
+                        help="CSVを出力しない")
+    parser.add_argument('--force', action='store_true',
+                        help="取り込みマニフェストを無視して全ファイルを再変換・全月を書き直す")
+    parser.add_argument('--journal', action='store_true',
+                        help="1日ずつジャーナルに記録しながら変換する（中断しても再実行で再開）")
+    parser.add_argument('--legacy-strings', dest='schema', action='store_const',
+                        const=month_schema.LEGACY_SCHEMA_VERSION, default=month_schema.SCHEMA_VERSION,
+                        help="月別JSONを従来の全フィールド文字列形式（スキーマ v1）で書き出す")
+    parser.add_argument('--profile', choices=artifacts.PROFILES, default='pretty',
+                        help="公開用JSONの書き出しプロファイル（compact: 空白なし＋最大圧縮の .gz を併置し、"
+                             "サイズを表示。既定: pretty）")
+    parser.add_argument('--watch', metavar='INBOX',
+                        help="常駐モード: 受信フォルダを監視して確認なしで取り込む")
+    parser.add_argument('--archive', metavar='DIR',
+                        help="常駐モードで処理済みHTMLの移動先（既定: INBOX/archive）")
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help="常駐モードのポーリング間隔（秒。既定: 2）")
+    parser.add_argument('--debounce', type=float, default=5.0,
+                        help="常駐モードで書き込み完了とみなす無変化時間（秒。既定: 5）")
+    parser.add_argument('--db', nargs='?', const=get_default_db_path(), metavar='PATH',
+                        help="月別JSONの代わりに SQLite ストアへ取り込む"
+                             "（PATH 省略時: converter/hall_data.sqlite3）")
+    parser.add_argument('--db-import-json', action='store_true',
+                        help="--db と併用: 既存の data/*.json を DB に取り込む")
+    parser.add_argument('--export-json', action='store_true',
+                        help="--db と併用: 変更のあった月を data/YYYY_MM.json に書き出し files.json を更新"
+                             "（--force で全月）")
+    return parser.parse_args(argv)
+
+
 def main():
     print("="*60)
     print("HTML → JSON 統合変換スクリプト")
@@ -426,8 +1494,26 @@ def main():
     print(f"\nJSON出力先: {data_dir}")
     print(f"CSV出力先: {csv_dir}")
     
-    if len(sys.argv) > 1:
-        input_folder = sys.argv[1]
+    args = parse_args()
+    
+    if args.db:
+        run_db_mode(args)
+        return
+    
+    if args.watch:
+        if not os.path.isdir(args.watch):
+            print(f"\nエラー: 受信フォルダが存在しません")
+            print(f"  入力: {args.watch}")
+            sys.exit(1)
+        archive_dir = args.archive or os.path.join(args.watch, 'archive')
+        watch_inbox(args.watch, archive_dir, interval=args.interval,
+                    debounce=args.debounce, workers=args.workers,
+                    engine=args.engine, journal=args.journal, schema=args.schema,
+                    profile=args.profile)
+        return
+    
+    if args.input_folder:
+        input_folder = args.input_folder
     else:
         print("\nHTMLファイルが格納されているフォルダのパスを入力してください")
         print("例: C:/Downloads/html_data")
@@ -445,7 +1531,10 @@ def main():
     
     print(f"HTML入力元: {input_folder}")
     
-    stats = convert_html_to_json(input_folder)
+    stats = convert_html_to_json(input_folder, workers=args.workers,
+                                 engine=args.engine, write_csv=args.write_csv,
+                                 force=args.force, journal=args.journal,
+                                 schema=args.schema, profile=args.profile)
     
     if not stats.get('success'):
         sys.exit(1)
@@ -462,10 +1551,12 @@ def main():
     response = input("更新する場合は 'yes' と入力: ").strip().lower()
     
     if response == 'yes':
-        update_files_json()
+        update_files_json(args.profile)
     
     print("\n処理が完了しました")
 
 
 if __name__ == '__main__':
+    # PyInstallerでexe化した場合もワーカープロセスを起動できるようにする
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日別のホール統計 daily_stats.json を作る（convert_csv_to_json.py の update_files_json から使う）
+
+カレンダー（js/calendar.js）の日ごとのヒストグラム・リスト・月間サマリー・累積差枚グラフは
+その日の全台の合計だけを使うため、files.json の更新時に日ごとの集計を前もって作っておけば、
+月別JSONを読み込んでいない月も即座に描ける。
+
+形式（format: "daily-stats-v1"）:
+    {
+      "format": "daily-stats-v1",
+      "months": {
+        "2026_08": {
+          "sha256": "...",                          … 集計元の月別JSONの内容ハッシュ
+          "days": {
+            "2026_08_01": {
+              "count": 400,                         … 台数（行数）
+              "games": 1234567, "sa": -45678,       … G数・差枚の合計
+              "plus": 165,                          … 差枚がプラスの台数
+              "avg_games": 3086, "avg_sa": -114,    … 1台平均（四捨五入。JS の Math.round と同じ）
+              "plus_rate": 0.4125,                  … plus / count（小数4桁）
+              "top":    { "machine": "機種名", "sa": 23456, "count": 12 },   … 差枚合計が最大の機種
+              "bottom": { "machine": "機種名", "sa": -34567, "count": 20 }   … 差枚合計が最小の機種
+            }
+          }
+        }
+      }
+    }
+
+- G数・差枚は calendar.js と同じく、カンマを除いた先頭の整数部分を使う
+  （parseInt と同じ。読めない値は 0）。
+- 月別JSONの内容ハッシュが前回の daily_stats.json と同じ月は読み直さない。
+- 台数 0 の日は平均 0、top / bottom は null。
+
+標準ライブラリのみを使用。
+"""
+
+import os
+import re
+import json
+import math
+
+import month_schema
+
+FORMAT = 'daily-stats-v1'
+STATS_FILENAME = 'daily_stats.json'
+FIELDS = ('機種名', 'G数', '差枚')
+
+# JS の parseInt（先頭の空白を飛ばし、符号付きの数字の並びまで）
+LEADING_INT_RE = re.compile(r"^\s*([+-]?\d+)")
+
+
+def parse_count(value) -> int:
+    """calendar.js の parseInt(String(v).replace(/,/g, '')) || 0 と同じ値"""
+    m = LEADING_INT_RE.match(str(value).replace(',', ''))
+    return int(m.group(1)) if m else 0
+
+
+def js_round(value: float) -> int:
+    """JS の Math.round（.5 は大きい側へ）"""
+    return math.floor(value + 0.5)
+
+
+def day_stats(records: list) -> dict:
+    """1日分（v1 のレコード）の統計"""
+    count = len(records)
+    games = 0
+    sa = 0
+    plus = 0
+    machines = {}
+    for record in records:
+        record_sa = parse_count(record.get('差枚', ''))
+        games += parse_count(record.get('G数', ''))
+        sa += record_sa
+        plus += record_sa > 0
+        total = machines.setdefault(record.get('機種名', ''), [0, 0])
+        total[0] += record_sa
+        total[1] += 1
+
+    # 同じ差枚合計なら先に出てきた機種
+    top = bottom = None
+    for machine, (machine_sa, machine_count) in machines.items():
+        entry = {'machine': machine, 'sa': machine_sa, 'count': machine_count}
+        if top is None or machine_sa > top['sa']:
+            top = entry
+        if bottom is None or machine_sa < bottom['sa']:
+            bottom = entry
+
+    return {
+        'count': count,
+        'games': games,
+        'sa': sa,
+        'plus': plus,
+        'avg_games': js_round(games / count) if count else 0,
+        'avg_sa': js_round(sa / count) if count else 0,
+        'plus_rate': round(plus / count, 4) if count else 0,
+        'top': top,
+        'bottom': bottom,
+    }
+
+
+def stats_path(parent_dir: str) -> str:
+    return os.path.join(parent_dir, STATS_FILENAME)
+
+
+def load_previous(path: str) -> dict:
+    """前回の daily_stats.json の months（読めない・形式が違えば空）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('format') != FORMAT:
+        return {}
+    return data.get('months') or {}
+
+
+def build_stats(parent_dir: str, months: dict, previous: dict) -> dict:
+    """
+    files.json の months（day_shards.build_manifest の結果）の全月について日別統計を作る。
+    previous は load_previous の結果
+    """
+    result = {}
+    for year_month in sorted(months):
+        entry = months[year_month]
+        old = previous.get(year_month)
+        if old and old.get('sha256') == entry['sha256']:
+            result[year_month] = old
+            continue
+        json_path = os.path.join(parent_dir, entry['path'])
+        try:
+            days = {date_key: day_stats(records)
+                    for date_key, records in month_schema.iter_month_file(json_path, FIELDS)}
+        except Exception as e:
+            print(f"    警告: {entry['path']} の日別統計を作れません - {e}")
+            continue
+        result[year_month] = {
+            'sha256': entry['sha256'],
+            'days': {date_key: days[date_key] for date_key in sorted(days)},
+        }
+    return {'format': FORMAT, 'months': result}
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日別シャード data/days/YYYY_MM_DD.<ハッシュ>.json と files.json（version 2）の
+マニフェストを作る（convert_csv_to_json.py の update_files_json から使う）
+
+- シャードは1日分だけを持つ列指向形式（columnar.py の encode_month と同じ形式。
+  days のキーが1つだけ）。常に空白なしで書き出し、.gz はプロファイルに合わせる。
+- シャードには、その日の機種内順位と分位点 "ranks" も入れる（machine_ranks.py。
+  作れなかった日は入れない）。入れた日の days エントリには "ranks" に形式名を載せる。
+- ファイル名に内容の SHA-256 の先頭16桁を入れるため、同じ名前の中身は変わらない
+  （長期キャッシュしてよい）。データが変われば別名のシャードになり、
+  どこからも参照されなくなった古いシャードは削除する。
+- 月別JSONの内容ハッシュが前回の files.json と同じで、シャードが揃っている
+  （順位も今の形式で入っている）月は読み直さずに前回のエントリを使う。
+
+files.json（version 2）:
+    {
+      "version": 2,
+      "monthly": ["data/2026_08.json", ...],      … 従来どおり（新しい順）
+      "columnar": true,
+      "min_date": "2025_01_01", "max_date": "2026_08_31",
+      "months": {
+        "2026_08": { "path": "data/2026_08.json", "sha256": "...", "bytes": 123456,
+                     "rows": 12345, "days": 31,
+                     "min_date": "2026_08_01", "max_date": "2026_08_31" }
+      },
+      "days": {
+        "2026_08_31": { "path": "data/days/2026_08_31.0123456789abcdef.json",
+                        "sha256": "...", "bytes": 4567, "rows": 400,
+                        "ranks": "machine-ranks-v2" }
+      },
+      "daily_stats": { "path": "daily_stats.json", "sha256": "..." },  … daily_stats.py
+      "prefix_sums": { "path": "prefix_sums.json", "sha256": "..." },  … prefix_sums.py
+      "spatial_stats": { "path": "spatial_stats.json", "sha256": "..." }, … spatial_stats.py
+      "digit_stats": { "path": "digit_stats.json", "sha256": "..." }     … digit_stats.py
+    }
+
+順位（machine_ranks.py）を作るときに pandas を読み込む。それ以外は標準ライブラリのみ。
+"""
+
+import os
+import re
+import json
+import hashlib
+
+import artifacts
+import columnar
+import machine_ranks
+import month_schema
+
+MANIFEST_VERSION = 2
+SHARD_DIR = 'days'
+HASH_LENGTH = 16
+
+SHARD_RE = re.compile(r"^\d{4}_\d{2}_\d{2}\.[0-9a-f]{%d}\.json$" % HASH_LENGTH)
+
+
+def sha256_bytes(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def shard_name(date_key: str, sha256: str) -> str:
+    """'2026_08_31', ハッシュ → '2026_08_31.0123456789abcdef.json'"""
+    return f"{date_key}.{sha256[:HASH_LENGTH]}.json"
+
+
+def encode_day(date_key: str, records: list, ranks: dict = None) -> bytes:
+    """1日分（v1 のレコード）と機種内順位 ranks（無ければ None）をシャードの内容（空白なしの列指向JSON）にする"""
+    doc = columnar.encode_month({date_key: records})
+    if ranks is not None:
+        doc['ranks'] = ranks
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_shard(parent_dir: str, date_key: str, records: list, profile: str = 'pretty',
+                ranks: dict = None) -> tuple:
+    """
+    1日分のシャードを書き出す（同じ内容のシャードが既にあれば書かない）。
+    ranks は machine_ranks.shard_ranks の結果（無ければ None）。
+    戻り値: (days のエントリ, 新しく書いたら True)
+    """
+    payload = encode_day(date_key, records, ranks)
+    sha256 = sha256_bytes(payload)
+    relative_path = f"data/{SHARD_DIR}/{shard_name(date_key, sha256)}"
+    path = os.path.join(parent_dir, relative_path)
+
+    written = not os.path.exists(path)
+    if written:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    artifacts.sync_gzip(path, profile)
+
+    entry = {
+        'path': relative_path,
+        'sha256': sha256,
+        'bytes': len(payload),
+        'rows': len(records),
+    }
+    if ranks is not None:
+        entry['ranks'] = ranks['format']
+    return entry, written
+
+
+def load_previous(files_json_path: str) -> dict:
+    """前回の files.json（version 2 でなければ空のマニフェスト）"""
+    try:
+        with open(files_json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {'months': {}, 'days': {}}
+    if data.get('version') != MANIFEST_VERSION:
+        return {'months': {}, 'days': {}}
+    return {'months': data.get('months') or {}, 'days': data.get('days') or {}}
+
+
+def _reusable_days(previous: dict, year_month: str, entry: dict, parent_dir: str) -> dict:
+    """前回のエントリをそのまま使える月なら、その月の days エントリ（使えなければ None）"""
+    days = {date_key: day for date_key, day in previous['days'].items()
+            if date_key.startswith(year_month + '_')}
+    if len(days) != entry.get('days'):
+        return None
+    if not all(day.get('ranks') == machine_ranks.FORMAT for day in days.values()):
+        return None
+    if not all(os.path.exists(os.path.join(parent_dir, day['path'])) for day in days.values()):
+        return None
+    return days
+
+
+def build_manifest(parent_dir: str, monthly_files: list, previous: dict,
+                   profile: str = 'pretty') -> dict:
+    """
+    全月の日別シャードを揃え、files.json に載せる months / days を作る。
+    monthly_files は 'data/YYYY_MM.json' の一覧。
+    戻り値: { 'months', 'days', 'min_date', 'max_date', 'written' }
+    """
+    months = {}
+    days = {}
+    written = 0
+
+    for relative_path in sorted(monthly_files):
+        json_path = os.path.join(parent_dir, relative_path)
+        year_month = os.path.basename(relative_path)[:-len('.json')]
+        with open(json_path, 'rb') as f:
+            content = f.read()
+        sha256 = sha256_bytes(content)
+
+        old_entry = previous['months'].get(year_month)
+        if old_entry and old_entry.get('sha256') == sha256:
+            month_days = _reusable_days(previous, year_month, old_entry, parent_dir)
+            if month_days is not None:
+                for day in month_days.values():
+                    artifacts.sync_gzip(os.path.join(parent_dir, day['path']), profile)
+                months[year_month] = old_entry
+                days.update(month_days)
+                continue
+
+        try:
+            month_data = month_schema.parse_month(json.loads(content.decode('utf-8')))
+        except Exception as e:
+            print(f"    警告: {relative_path} の日別シャードを作れません - {e}")
+            continue
+        date_keys = sorted(month_data)
+        try:
+            ranks = machine_ranks.month_ranks((date_key, month_data[date_key]) for date_key in date_keys)
+        except Exception as e:
+            print(f"    警告: {relative_path} の機種内順位を作れません - {e}")
+            ranks = {}
+        for date_key in date_keys:
+            day_ranks = ranks.get(date_key)
+            days[date_key], is_new = write_shard(
+                parent_dir, date_key, month_data[date_key], profile,
+                machine_ranks.shard_ranks(day_ranks) if day_ranks is not None else None)
+            written += is_new
+
+        months[year_month] = {
+            'path': relative_path,
+            'sha256': sha256,
+            'bytes': len(content),
+            'rows': sum(len(records) for records in month_data.values()),
+            'days': len(date_keys),
+            'min_date': date_keys[0] if date_keys else None,
+            'max_date': date_keys[-1] if date_keys else None,
+        }
+
+    date_keys = sorted(days)
+    return {
+        'months': months,
+        'days': {date_key: days[date_key] for date_key in date_keys},
+        'min_date': date_keys[0] if date_keys else None,
+        'max_date': date_keys[-1] if date_keys else None,
+        'written': written,
+    }
+
+
+def prune_shards(parent_dir: str, days: dict) -> int:
+    """days から参照されていないシャード（と .gz）を削除し、削除したシャード数を返す"""
+    shard_dir = os.path.join(parent_dir, 'data', SHARD_DIR)
+    if not os.path.isdir(shard_dir):
+        return 0
+
+    referenced = {os.path.basename(day['path']) for day in days.values()}
+    removed = 0
+    for name in os.listdir(shard_dir):
+        if not SHARD_RE.match(name) or name in referenced:
+            continue
+        path = os.path.join(shard_dir, name)
+        os.remove(path)
+        if os.path.exists(artifacts.gzip_path(path)):
+            os.remove(artifacts.gzip_path(path))
+        removed += 1
+    # 元のシャードが消えた .gz も残さない
+    for name in os.listdir(shard_dir):
+        if name.endswith('.gz') and not os.path.exists(os.path.join(shard_dir, name[:-len('.gz')])):
+            os.remove(os.path.join(shard_dir, name))
+    return removed
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+台番号末尾・ゾロ目ごとの日別集計 digit_stats.json を作る
+（convert_csv_to_json.py の update_files_json から使う）
+
+末尾（台番号の最後の数字 0〜9）やゾロ目（777 のように全桁が同じ数字の台番号）ごとの成績は、
+これまでブラウザで全月を読み込んでから行を集計するしかなかった。日ごとの合計を前もって
+作っておけば、解析タブの末尾集計（js/analysis.js）は期間内の日を足すだけで求まる。
+events.json に載っている日（イベント日）は、末尾・ゾロ目の中の機種ごとの内訳も持つ。
+
+形式（format: "digit-stats-v1"。常に空白なし）:
+    {
+      "format": "digit-stats-v1",
+      "classes": ["0", "1", ..., "9", "zorome"],
+      "columns": ["台数", "差枚", "G数", "BB", "RB", "勝ち"],
+      "events_sha256": "...",                     … 集計に使った events.json の内容ハッシュ（無ければ null）
+      "months": {
+        "2026_08": {
+          "sha256": "...",                        … 集計元の月別JSONの内容ハッシュ
+          "days": { "2026_08_01": [台数, 差枚, G数, BB, RB, 勝ち, 台数, ...] },   … classes の順に columns 個ずつ
+          "events": {                             … イベント日だけ
+            "2026_08_08": { "7": { "機種名": [台数, 差枚, G数, BB, RB, 勝ち] }, "zorome": {...} }
+          }
+        }
+      }
+    }
+
+- 台番号は数字以外を除き、最後の数字を末尾とする（daily.js の末尾別統計と同じ。同じ台番号の
+  行が複数あればすべて数える）。ゾロ目は2桁以上で全桁が同じもの。数字の無い台番号は数えない。
+- 「勝ち」は差枚がプラスの台数。平均・勝率・機械割・BB / RB 確率（G数 / 回数）は
+  読み込み側で合計から求める。値は calendar.js と同じくカンマを除いた先頭の整数部分。
+- 月別JSONの内容ハッシュが前回と同じ月は読み直さない。ただし events.json の内容が
+  変わったら全月を作り直す（イベント日の内訳を揃えるため）。
+- 集計は1か月分の行を pandas の DataFrame にまとめ（record_frame.py）、日付・クラス（イベント日は機種も）で
+  groupby して足す。pandas は month_totals の中で読み込む（読み直す月が無ければ読み込まない）。
+"""
+
+import os
+import json
+import hashlib
+
+import month_schema
+import record_frame
+
+FORMAT = 'digit-stats-v1'
+STATS_FILENAME = 'digit_stats.json'
+EVENTS_FILENAME = 'events.json'
+ZOROME = 'zorome'
+CLASSES = tuple(str(d) for d in range(10)) + (ZOROME,)
+COLUMNS = ('台数', '差枚', 'G数', 'BB', 'RB', '勝ち')
+FIELDS = ('機種名', '台番号', '差枚', 'G数', 'BB', 'RB')
+
+ZOROME_RE = r"(\d)\1+"
+CLASS_INDEX = {name: i for i, name in enumerate(CLASSES)}
+
+
+def month_totals(json_path: str, event_dates: set) -> tuple:
+    """
+    1か月分の月別JSONのクラスごとの日別合計。
+    戻り値: ({日付キー: 合計（classes の順に COLUMNS 個ずつ）},
+             {イベント日: {クラス名: {機種名: 値}}})
+    """
+    import pandas as pd
+
+    date_keys, frame = record_frame.month_frame(
+        month_schema.iter_month_file(json_path, FIELDS), FIELDS)
+    digits = frame['台番号'].fillna('').astype(str).str.replace(r'\D', '', regex=True)
+    sa = record_frame.parse_counts(frame['差枚'])
+    values = pd.DataFrame({
+        '日付': frame[record_frame.DATE_COLUMN],
+        '機種名': frame['機種名'].fillna('').astype(str),
+        'クラス': digits.str[-1:].map(CLASS_INDEX),
+        '台数': 1,
+        '差枚': sa,
+        'G数': record_frame.parse_counts(frame['G数']),
+        'BB': record_frame.parse_counts(frame['BB']),
+        'RB': record_frame.parse_counts(frame['RB']),
+        '勝ち': (sa > 0).astype('int64'),
+    })
+    # 1行が末尾とゾロ目の両方に入るので、ゾロ目の行はクラスを付け替えて足す
+    zorome = values[digits.str.fullmatch(ZOROME_RE)].assign(クラス=CLASS_INDEX[ZOROME])
+    values = pd.concat([values[digits != ''], zorome], ignore_index=True)
+    values['クラス'] = values['クラス'].astype('int64')
+
+    width = len(COLUMNS)
+    index = pd.MultiIndex.from_product([date_keys, range(len(CLASSES))])
+    sums = (values.groupby(['日付', 'クラス'])[list(COLUMNS)].sum()
+            .reindex(index, fill_value=0).to_numpy(dtype='int64')
+            .reshape(len(date_keys), len(CLASSES) * width).tolist())
+    days = dict(zip(date_keys, sums))
+
+    # 機種の並びは日ごと・クラスごとに最初に出てきた順（sort=False）
+    events = {date_key: {} for date_key in date_keys if date_key in event_dates}
+    on_events = values[values['日付'].isin(events)]
+    by_machine = on_events.groupby(['日付', 'クラス', '機種名'], sort=False)[list(COLUMNS)].sum()
+    classes = {}
+    for (date_key, index, name), total in zip(by_machine.index, by_machine.to_numpy(dtype='int64').tolist()):
+        classes.setdefault(date_key, {}).setdefault(index, {})[name] = total
+    for date_key, by_class in classes.items():
+        events[date_key] = {CLASSES[i]: by_class[i] for i in range(len(CLASSES)) if i in by_class}
+    return days, events
+
+
+def stats_path(parent_dir: str) -> str:
+    return os.path.join(parent_dir, STATS_FILENAME)
+
+
+def load_event_dates(parent_dir: str) -> tuple:
+    """events.json → (内容ハッシュ, イベント日の集合)。無い・読めなければ (None, 空集合)"""
+    path = os.path.join(parent_dir, EVENTS_FILENAME)
+    try:
+        with open(path, 'rb') as f:
+            payload = f.read()
+        events = json.loads(payload.decode('utf-8')).get('events') or []
+    except (OSError, ValueError):
+        return None, set()
+    return hashlib.sha256(payload).hexdigest(), {e['date'] for e in events if e.get('date')}
+
+
+def load_previous(path: str) -> dict:
+    """前回の digit_stats.json（読めない・形式やクラス・列が違えば None）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (doc.get('format') != FORMAT or doc.get('classes') != list(CLASSES)
+            or doc.get('columns') != list(COLUMNS)):
+        return None
+    return doc
+
+
+def build_stats(parent_dir: str, months: dict, previous: dict = None) -> tuple:
+    """
+    files.json の months（day_shards.build_manifest の結果）の全月について末尾・ゾロ目ごとの
+    日別集計を作る。previous は load_previous の結果。
+    戻り値: (集計, 読み直した月数)
+    """
+    events_sha256, event_dates = load_event_dates(parent_dir)
+
+    # events.json が変わったらイベント日の内訳を作り直すため前回の集計は使わない
+    old_months = {}
+    if previous is not None and previous.get('events_sha256') == events_sha256:
+        old_months = previous.get('months') or {}
+
+    result = {}
+    reread = 0
+    for year_month in sorted(months):
+        entry = months[year_month]
+        old = old_months.get(year_month)
+        if old and old.get('sha256') == entry['sha256']:
+            result[year_month] = old
+            continue
+        json_path = os.path.join(parent_dir, entry['path'])
+        try:
+            days, events = month_totals(json_path, event_dates)
+        except Exception as e:
+            print(f"    警告: {entry['path']} の末尾別集計を作れません - {e}")
+            continue
+        result[year_month] = {
+            'sha256': entry['sha256'],
+            'days': {date_key: days[date_key] for date_key in sorted(days)},
+            'events': {date_key: events[date_key] for date_key in sorted(events)},
+        }
+        reread += 1
+
+    return {
+        'format': FORMAT,
+        'classes': list(CLASSES),
+        'columns': list(COLUMNS),
+        'events_sha256': events_sha256,
+        'months': result,
+    }, reread
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日ごと・機種ごとの機種内順位と分位点を作る（day_shards.py が日別シャードに入れる）
+
+機種内バッジ（js/machinebadge.js の assignBadges / assignBadgesForTrend）は、表示のたびに
+機種ごとに台を並べ替えて順位を付けている。日ごとの順位を前もって作っておけば、
+1日分の窓で付けるバッジは表引きになり、日別タブ・解析タブの両方が同じ順位を使う。
+順位はその日の日別シャード data/days/YYYY_MM_DD.<ハッシュ>.json に入れるので、
+読み込み側は表示している日の分だけを読めばよい（js/data.js の loadMachineRanks）。
+
+日別シャードの "ranks"（format: "machine-ranks-v2"）:
+    {
+      "format": "machine-ranks-v2",
+      "metrics": ["差枚", "G数", "合成確率"],
+      "quantiles": [0.1, 0.5, 0.9],
+      "machines": {
+        "機種名": {
+          "ranks": [[2, 1, ...], ...],        … metrics ごとの機種内順位（シャードのその機種の行の順）
+          "q": [[p10, p50, p90], ...]         … metrics ごとの分位点
+        }
+      }
+    }
+
+- 台番号の並びは持たない。シャードの行のうちその機種の行の台番号を順に並べたものになる。
+- 順位は良い方から数えた順位（差枚・G数は大きい順、合成確率は分母の小さい順）。
+  同じ値は同じ順位で、次の順位は飛ばす（1, 2, 2, 4。machinebadge.js の calcRanksFromItems と同じ）。
+  逆順位（💀死に台の順位）は、同じ順位の台数を t として 台数 - 順位 - t + 2。
+- 差枚・G数は calendar.js と同じくカンマを除いた先頭の整数部分（読めない値は 0）。
+  合成確率は analysis.js の parseProbability と同じく "1/x" の x（読めない・0 以下なら
+  順位・分位点から除き、順位は null）。
+- 分位点は線形補間（位置 (件数 - 1) × q）。小数1桁に丸める。値が無ければ null。
+- 同じ日に同じ機種・同じ台番号の行が複数ある機種は載せない（読み込み側は従来どおり行から計算する）。
+- 1か月分の行を pandas の DataFrame にまとめ（record_frame.py）、(日付, 機種名) で groupby して
+  rank(method='min') と quantile（線形補間）で求める。pandas は month_ranks の中で読み込む。
+"""
+
+import re
+
+import record_frame
+
+FORMAT = 'machine-ranks-v2'
+METRICS = ('差枚', 'G数', '合成確率')
+QUANTILES = (0.1, 0.5, 0.9)
+FIELDS = ('機種名', '台番号') + METRICS
+
+PROBABILITY_RE = re.compile(r"1/([\d.]+)")
+LEADING_FLOAT_RE = re.compile(r"^(\d+(?:\.\d*)?|\.\d+)")
+
+
+def parse_probabilities(series):
+    """analysis.js の parseProbability と同じ値（"1/x" の x。読めなければ NaN）を Series の全要素に"""
+    body = series.fillna('').astype(str).str.extract(PROBABILITY_RE.pattern, expand=False)
+    # parseFloat と同じく先頭の数値部分だけを読む
+    x = body.str.extract(LEADING_FLOAT_RE.pattern, expand=False).astype(float)
+    return x.where((x > 0) & (x < float('inf')))
+
+
+def month_ranks(days) -> dict:
+    """
+    1か月分（(日付キー, v1 のレコード) の並び）の日ごと・機種ごとの順位と分位点。
+    戻り値: {日付キー: {機種名: {'ranks': [...], 'q': [...]}}}（順位はその日のその機種の行の順）
+    """
+    import pandas as pd
+
+    date_keys, frame = record_frame.month_frame(days, FIELDS)
+    values = pd.DataFrame({
+        '日付': frame[record_frame.DATE_COLUMN],
+        '機種名': frame['機種名'].fillna('').astype(str),
+        '台番号': frame['台番号'].fillna('').astype(str),
+        '差枚': record_frame.parse_counts(frame['差枚']),
+        'G数': record_frame.parse_counts(frame['G数']),
+        '合成確率': parse_probabilities(frame['合成確率']),
+    })
+    keys = ['日付', '機種名']
+    duplicated = values.duplicated(keys + ['台番号'], keep=False)
+    values = values[~duplicated.groupby([values[k] for k in keys]).transform('any')]
+    values = values.reset_index(drop=True)
+    if values.empty:
+        return {date_key: {} for date_key in date_keys}
+
+    groups = values.groupby(keys, sort=False)
+    ranks = pd.DataFrame({
+        metric: groups[metric].rank(method='min', ascending=(metric == '合成確率'))
+        for metric in METRICS
+    }).to_numpy().T.tolist()
+    # 分位点は (日付, 機種名) ごとに METRICS × QUANTILES の順に並べる
+    quantiles = groups[list(METRICS)].quantile(list(QUANTILES)).unstack()
+    quantiles = dict(zip(quantiles.index, quantiles[list(METRICS)].to_numpy().tolist()))
+
+    width = len(QUANTILES)
+    result = {}
+    for (date_key, machine), positions in groups.indices.items():
+        qs = quantiles[(date_key, machine)]
+        result.setdefault(date_key, {})[(machine, positions[0])] = {
+            'ranks': [[None if rank[i] != rank[i] else int(rank[i]) for i in positions]
+                      for rank in ranks],
+            'q': [None if qs[k] != qs[k] else [round(v, 1) for v in qs[k:k + width]]
+                  for k in range(0, len(qs), width)],
+        }
+    # 機種はその日に最初に出てきた順
+    return {date_key: {machine: by_machine[(machine, first)]
+                       for machine, first in sorted(by_machine, key=lambda key: key[1])}
+            for date_key, by_machine in ((date_key, result.get(date_key, {}))
+                                         for date_key in date_keys)}
+
+
+def shard_ranks(machines: dict) -> dict:
+    """month_ranks の1日分 → 日別シャードに入れる ranks"""
+    return {
+        'format': FORMAT,
+        'metrics': list(METRICS),
+        'quantiles': list(QUANTILES),
+        'machines': machines,
+    }
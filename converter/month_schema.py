@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+月別JSON（data/YYYY_MM.json）のスキーマ定義と読み書き
+
+- v1（従来・--legacy-strings）:
+    { "YYYY_MM_DD": [ {台レコード}, ... ], ... }   … 全フィールドが文字列
+- v2（型付き・既定）:
+    { "schema": 2, "days": { "YYYY_MM_DD": [ {台レコード}, ... ], ... } }
+    - 回数列（G数 / 差枚 / BB / RB / ART）は整数。空欄は null
+    - 確率列（合成確率 / BB確率 / RB確率 / ART確率）は "1/x" の x を実数で持つ。
+      "1/0.0"（回数 0）は null
+    - 機種名・台番号は文字列のまま（台番号は識別子として扱うため）
+    - 上の形で表せない値（"1,234" や "-" など）は元の文字列のまま残す
+
+v1 ⇔ v2 は可逆。convert_csv_to_json.py の内部（マニフェストのハッシュ・
+SQLite ストア・列指向版）は v1 のレコードで扱い、ファイルの書き出し・
+読み込み時にだけ変換する。標準ライブラリのみを使用。
+
+読み込みは iter_month_file で1日ずつ行う（ファイル全体を一度に展開しない）。
+fields で必要な列だけを残せる（history-maker/build_unit_history.py は
+機種名・台番号だけを読む）。
+"""
+
+import re
+import json
+
+SCHEMA_VERSION = 2
+LEGACY_SCHEMA_VERSION = 1
+
+COUNT_FIELDS = ('G数', '差枚', 'BB', 'RB', 'ART')
+PROBABILITY_FIELDS = ('合成確率', 'BB確率', 'RB確率', 'ART確率')
+
+INT_RE = re.compile(r"^-?\d+$")
+PROBABILITY_RE = re.compile(r"^1/(\d+\.\d)$")
+ZERO_PROBABILITY = '1/0.0'
+
+
+def typed_value(field: str, text: str):
+    """v1 の文字列を v2 の値に変換（可逆にならない値は文字列のまま）"""
+    if field in COUNT_FIELDS:
+        if text == '':
+            return None
+        if INT_RE.match(text) and str(int(text)) == text:
+            return int(text)
+    elif field in PROBABILITY_FIELDS:
+        if text == ZERO_PROBABILITY:
+            return None
+        m = PROBABILITY_RE.match(text)
+        if m and f"{float(m.group(1)):.1f}" == m.group(1):
+            return float(m.group(1))
+    return text
+
+
+def legacy_value(field: str, value) -> str:
+    """v2 の値を v1 の文字列に戻す"""
+    if isinstance(value, str):
+        return value
+    if field in PROBABILITY_FIELDS:
+        return ZERO_PROBABILITY if value is None else f"1/{value:.1f}"
+    return '' if value is None else str(value)
+
+
+def to_typed_records(records: list) -> list:
+    """v1 のレコード配列 → v2"""
+    return [{field: typed_value(field, text) for field, text in record.items()}
+            for record in records]
+
+
+def to_legacy_records(records: list) -> list:
+    """v2 のレコード配列 → v1"""
+    return [{field: legacy_value(field, value) for field, value in record.items()}
+            for record in records]
+
+
+def dump_month(month_data: dict, schema: int = SCHEMA_VERSION) -> dict:
+    """v1 の月データ（{ 日付: [レコード, ...] }）を、指定スキーマのファイル内容にする"""
+    if schema == LEGACY_SCHEMA_VERSION:
+        return month_data
+    if schema != SCHEMA_VERSION:
+        raise ValueError(f"未対応のスキーマです: {schema}")
+    return {
+        'schema': SCHEMA_VERSION,
+        'days': {date_key: to_typed_records(records) for date_key, records in month_data.items()},
+    }
+
+
+def parse_month(content: dict) -> dict:
+    """月別JSONの内容（v1 / v2）を v1 の月データにする"""
+    schema = content.get('schema')
+    if not isinstance(schema, int):
+        # v1 はトップレベルが日付キーのみ
+        return content
+    if schema != SCHEMA_VERSION:
+        raise ValueError(f"未対応のスキーマです: {schema}")
+    return {date_key: to_legacy_records(records) for date_key, records in content['days'].items()}
+
+
+class _StreamReader:
+    """JSON テキストを少しずつ読みながら値を1つずつ取り出す（iter_month_file 用）"""
+
+    WHITESPACE = ' \t\n\r'
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self, size: int = None) -> bool:
+        """バッファを読み足す（読み終えた部分は捨てる）。ファイル末尾なら False"""
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """空白を飛ばした次の1文字（ファイル末尾なら ''）"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"JSON の形式が想定と異なります（'{char}' がありません）")
+        self.pos += 1
+
+    def value(self):
+        """
+        次の値を1つ取り出す。途中で切れていれば読み足して再試行する
+        （読み足す量は毎回倍にし、大きな値でも解析のやり直しを O(値の大きさ) に抑える）
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill(size):
+                    size *= 2
+                    continue
+                raise
+            # 数値はバッファの末尾で切れていても読めてしまうため、続きを確かめる
+            if end == len(self.buf) and self.fill(size):
+                size *= 2
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """オブジェクトの { キー: 値 } を1組ずつ、値を読む直前で返す（呼び出し側が値を読む）"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError("JSON の形式が想定と異なります（',' か '}' がありません）")
+
+
+def _project(records, fields):
+    if fields is None or not isinstance(records, list):
+        return records
+    return [{field: record[field] for field in fields if field in record} for record in records]
+
+
+def iter_month_file(json_path: str, fields=None, chunk_size: int = 1 << 20):
+    """
+    data/YYYY_MM.json（v1 / v2）を1日ずつ読み、(日付キー, v1 のレコード配列) を
+    ファイル内の順に返す。fields を指定するとその列だけを残す。
+    メモリに載るのは1日分と読み込みバッファ（chunk_size 文字）程度。
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f, chunk_size)
+        schema = None
+        for key in reader.members():
+            if key == 'schema':
+                schema = reader.value()
+                if not isinstance(schema, int) or schema != SCHEMA_VERSION:
+                    raise ValueError(f"未対応のスキーマです: {schema}")
+            elif key == 'days' and reader.peek() == '{':
+                # v2。"schema" は先頭に書かれるが、後ろにあっても同じに読めるよう
+                # 常に v1 に戻す（v1 の文字列はそのまま通る）
+                for date_key in reader.members():
+                    records = _project(reader.value(), fields)
+                    yield date_key, to_legacy_records(records)
+            else:
+                # v1 はトップレベルが日付キー
+                yield key, _project(reader.value(), fields)
+        if reader.peek() != '':
+            raise ValueError("JSON の末尾に余分なデータがあります")
+
+
+def read_month_file(json_path: str) -> dict:
+    """data/YYYY_MM.json を読み込み、v1 の月データで返す（iter_month_file で1日ずつ読む）"""
+    return dict(iter_month_file(json_path))
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+台番号・機種ごとの累積和インデックス prefix_sums.json を作る
+（convert_csv_to_json.py の update_files_json から使う）
+
+解析タブ（js/analysis.js）は選択した日ごとに全台の 差枚 / G数 / BB / RB / ART を
+行から読み直して合計する。データのある日を古い順に並べた日番号（0, 1, 2, ...）で
+台番号・機種ごとの累積和を持っておけば、日番号 lo〜hi の合計は
+cum[hi + 1] - cum[lo] の2回の参照で、1日分の値は隣り合う2つの差で求まる。
+
+形式（format: "prefix-sums-v1"。常に空白なし）:
+    {
+      "format": "prefix-sums-v1",
+      "columns": ["差枚", "G数", "BB", "RB", "ART"],
+      "dates": ["2025_01_01", ...],             … 日番号 → 日付（古い順）
+      "months": { "2025_01": "<sha256>", ... }, … 集計元の月別JSONの内容ハッシュ
+      "machines": ["機種名", ...],              … by_unit の machine の辞書（名前順）
+      "by_unit": {
+        "881": {
+          "days": [差, 個数, ...],              … データのある日番号の区間（直前の区間の終わりからの差, 個数）
+          "machine": [日番号, 機種ID, ...],     … その日番号以降の機種（変わった日だけ。同じ日に
+                                                  同じ台番号が複数行あれば -1）
+          "values": [[差枚...], [G数...], ...]  … days の日ごとの値（columns の順）
+        }
+      },
+      "by_machine": {
+        "機種名": { "days": [...], "units": [台数...], "values": [[...], ...] }   … その日の全台の合計
+      }
+    }
+
+- 累積和そのものではなく日ごとの値（累積和の差分）を持ち、読み込み側（js/data.js の
+  registerPrefixSums）が累積配列に戻す。値は calendar.js / analysis.js と同じく
+  カンマを除いた先頭の整数部分（daily_stats.parse_count）。
+- 同じ日に同じ台番号が複数行ある場合、by_unit の値は最後の行（analysis.js の台別集計と
+  同じ）、by_machine は全行の合計。
+- 追記のみで更新する: 前回のインデックスと内容ハッシュが同じ月が先頭から続く間は
+  その日番号までをそのまま使い、最初に変わった（増えた・消えた）月から後ろだけを
+  読み直して付け足す。毎日の取り込みでは最新月だけを読む。結果は全件作り直しと同一。
+
+標準ライブラリのみを使用。
+"""
+
+import os
+import json
+
+import daily_stats
+import month_schema
+
+FORMAT = 'prefix-sums-v1'
+INDEX_FILENAME = 'prefix_sums.json'
+COLUMNS = ('差枚', 'G数', 'BB', 'RB', 'ART')
+FIELDS = ('機種名', '台番号') + COLUMNS
+AMBIGUOUS_MACHINE = -1
+
+
+def _to_runs(ordinals):
+    """昇順の日番号 → 区間 [直前の区間の終わりからの差, 個数, ...]"""
+    runs = []
+    end = 0
+    i = 0
+    while i < len(ordinals):
+        j = i
+        while j + 1 < len(ordinals) and ordinals[j + 1] == ordinals[j] + 1:
+            j += 1
+        runs += [ordinals[i] - end, j - i + 1]
+        end = ordinals[j] + 1
+        i = j + 1
+    return runs
+
+
+def _from_runs(runs):
+    """区間 → 日番号のリスト（昇順）"""
+    ordinals = []
+    end = 0
+    for i in range(0, len(runs), 2):
+        start = end + runs[i]
+        end = start + runs[i + 1]
+        ordinals.extend(range(start, end))
+    return ordinals
+
+
+def index_path(parent_dir: str) -> str:
+    return os.path.join(parent_dir, INDEX_FILENAME)
+
+
+def load_previous(path: str) -> dict:
+    """前回の prefix_sums.json（読めない・形式や列が違えば None）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if doc.get('format') != FORMAT or doc.get('columns') != list(COLUMNS):
+        return None
+    return doc
+
+
+class _Series:
+    """1つの台番号・機種の日ごとの値（日番号の昇順）"""
+
+    def __init__(self):
+        self.days = []
+        self.tags = []      # 台番号: その日の機種名（複数行なら None）／機種: その日の台数
+        self.values = [[] for _ in COLUMNS]
+
+    def append(self, ordinal, tag, values):
+        self.days.append(ordinal)
+        self.tags.append(tag)
+        for column, value in zip(self.values, values):
+            column.append(value)
+
+    def truncate(self, cutoff):
+        """日番号 cutoff 以降を捨てる"""
+        n = len(self.days)
+        while n > 0 and self.days[n - 1] >= cutoff:
+            n -= 1
+        del self.days[n:]
+        del self.tags[n:]
+        for column in self.values:
+            del column[n:]
+
+
+def _decode(doc: dict) -> tuple:
+    """前回のインデックス → ({台番号: _Series}, {機種名: _Series})"""
+    machines = doc['machines']
+    by_unit = {}
+    for unit, entry in doc['by_unit'].items():
+        series = by_unit[unit] = _Series()
+        series.days = _from_runs(entry['days'])
+        changes = entry['machine']
+        tags = []
+        k = 0
+        current = None
+        for ordinal in series.days:
+            while k < len(changes) and changes[k] <= ordinal:
+                mid = changes[k + 1]
+                current = None if mid == AMBIGUOUS_MACHINE else machines[mid]
+                k += 2
+            tags.append(current)
+        series.tags = tags
+        series.values = [list(column) for column in entry['values']]
+    by_machine = {}
+    for machine, entry in doc['by_machine'].items():
+        series = by_machine[machine] = _Series()
+        series.days = _from_runs(entry['days'])
+        series.tags = list(entry['units'])
+        series.values = [list(column) for column in entry['values']]
+    return by_unit, by_machine
+
+
+def _add_day(ordinal: int, records: list, by_unit: dict, by_machine: dict):
+    """1日分のレコードを各系列の末尾に足す"""
+    units = {}
+    machines = {}
+    for record in records:
+        unit = record.get('台番号', '')
+        machine = record.get('機種名', '')
+        values = [daily_stats.parse_count(record.get(col, '')) for col in COLUMNS]
+        if unit in units:
+            units[unit] = (None, values)
+        else:
+            units[unit] = (machine, values)
+        total = machines.get(machine)
+        if total is None:
+            machines[machine] = [1, values]
+        else:
+            total[0] += 1
+            total[1] = [a + b for a, b in zip(total[1], values)]
+    for unit, (machine, values) in units.items():
+        by_unit.setdefault(unit, _Series()).append(ordinal, machine, values)
+    for machine, (count, values) in machines.items():
+        by_machine.setdefault(machine, _Series()).append(ordinal, count, values)
+
+
+def _encode(dates: list, months: dict, by_unit: dict, by_machine: dict) -> dict:
+    names = sorted({tag for series in by_unit.values() for tag in series.tags if tag is not None})
+    machine_ids = {name: i for i, name in enumerate(names)}
+
+    units_out = {}
+    for unit in sorted(by_unit):
+        series = by_unit[unit]
+        if not series.days:
+            continue
+        changes = []
+        last = object()
+        for ordinal, tag in zip(series.days, series.tags):
+            if tag != last:
+                changes += [ordinal, AMBIGUOUS_MACHINE if tag is None else machine_ids[tag]]
+                last = tag
+        units_out[unit] = {
+            'days': _to_runs(series.days),
+            'machine': changes,
+            'values': series.values,
+        }
+
+    machines_out = {}
+    for machine in sorted(by_machine):
+        series = by_machine[machine]
+        if not series.days:
+            continue
+        machines_out[machine] = {
+            'days': _to_runs(series.days),
+            'units': series.tags,
+            'values': series.values,
+        }
+
+    return {
+        'format': FORMAT,
+        'columns': list(COLUMNS),
+        'dates': dates,
+        'months': months,
+        'machines': names,
+        'by_unit': units_out,
+        'by_machine': machines_out,
+    }
+
+
+def build_index(parent_dir: str, months: dict, previous: dict = None) -> tuple:
+    """
+    files.json の months（day_shards.build_manifest の結果）から累積和インデックスを作る。
+    previous は load_previous の結果（None なら全件作り直し）。
+    戻り値: (インデックス, 読み直した日数)
+    """
+    year_months = sorted(months)
+
+    # 前回と内容ハッシュが同じ月が先頭から続く範囲はそのまま使う
+    kept = 0
+    if previous is not None:
+        old_months = sorted(previous['months'])
+        while (kept < len(year_months) and kept < len(old_months)
+               and year_months[kept] == old_months[kept]
+               and months[year_months[kept]]['sha256'] == previous['months'][old_months[kept]]):
+            kept += 1
+
+    if kept > 0:
+        by_unit, by_machine = _decode(previous)
+        cutoff = year_months[kept - 1] + '_32'
+        dates = [date_key for date_key in previous['dates'] if date_key < cutoff]
+        for series in list(by_unit.values()) + list(by_machine.values()):
+            series.truncate(len(dates))
+    else:
+        by_unit, by_machine = {}, {}
+        dates = []
+
+    reread = 0
+    for year_month in year_months[kept:]:
+        json_path = os.path.join(parent_dir, months[year_month]['path'])
+        month = dict(month_schema.iter_month_file(json_path, FIELDS))
+        for date_key in sorted(month):
+            _add_day(len(dates), month[date_key], by_unit, by_machine)
+            dates.append(date_key)
+            reread += 1
+
+    shas = {year_month: months[year_month]['sha256'] for year_month in year_months}
+    return _encode(dates, shas, by_unit, by_machine), reread
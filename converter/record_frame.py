@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+月別JSONのレコードを pandas の DataFrame で集計するための共通部品
+（digit_stats.py / machine_ranks.py から使う）
+
+- month_frame … 1か月分の (日付キー, v1 のレコード) を、日付の列つきの1つの DataFrame にする
+- parse_counts … daily_stats.parse_count（カンマを除いた先頭の整数部分。読めなければ 0）を
+  Series の全要素に当てはめる
+
+pandas は month_frame を呼んだときに読み込む（convert_csv_to_json.py の load_pandas と同じく遅延 import）。
+"""
+
+import daily_stats
+
+DATE_COLUMN = '日付'
+
+
+def month_frame(days, fields) -> tuple:
+    """
+    (日付キー, v1 のレコード) の並び → (日付キーの並び, DataFrame)。
+    DataFrame は fields の列（無い値は NaN）と DATE_COLUMN の列を行の順に持つ
+    """
+    import pandas as pd
+
+    date_keys = []
+    day_column = []
+    rows = []
+    for date_key, records in days:
+        date_keys.append(date_key)
+        day_column.extend([date_key] * len(records))
+        rows.extend(records)
+
+    frame = pd.DataFrame.from_records(rows, columns=list(fields))
+    frame[DATE_COLUMN] = day_column
+    return date_keys, frame
+
+
+def parse_counts(series):
+    """daily_stats.parse_count と同じ値を series の全要素について（int64 の Series）"""
+    digits = (series.fillna('').astype(str).str.replace(',', '', regex=False)
+              .str.extract(daily_stats.LEADING_INT_RE.pattern, expand=False))
+    return digits.fillna('0').astype('int64')
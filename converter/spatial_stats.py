@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+島・列・位置ごとの日別集計 spatial_stats.json を作る
+（convert_csv_to_json.py の update_files_json から使う）
+
+島図タブ（js/island.js）や位置フィルター（角 / 角2 / 角3 / 円卓）での集計は、
+その日の行を読み込んでから data/island-config.json・data/position.csv と突き合わせている。
+日ごと・グループごとの合計を前もって作っておけば、島や角の成績は数KBで求まる。
+
+形式（format: "spatial-stats-v1"。常に空白なし）:
+    {
+      "format": "spatial-stats-v1",
+      "layout": { "island-config.json": "<sha256>", "position.csv": "<sha256>" },
+                                                  … 集計に使ったレイアウトの内容ハッシュ（無ければ null）
+      "columns": ["台数", "差枚", "G数", "BB", "RB"],
+      "groups": [
+        { "kind": "area",     "id": "counter",     "name": "カウンター側", "units": 120 },
+        { "kind": "island",   "id": "counter-1",   "area": "counter",     "units": 20 },
+        { "kind": "row",      "id": "counter-2/1", "island": "counter-2", "units": 20 },
+        { "kind": "position", "id": "角",                                  "units": 40 }
+      ],
+      "months": {
+        "2026_08": {
+          "sha256": "...",                          … 集計元の月別JSONの内容ハッシュ
+          "days": { "2026_08_01": [台数, 差枚, G数, BB, RB, 台数, ...] }   … groups の順に columns 個ずつ
+        }
+      }
+    }
+
+- groups の units はレイアウト上の台数（スペーサーの null / 0 は除く）、各日の「台数」は
+  その日にデータのあった台数。平均や BB / RB 確率（G数 / 回数）は読み込み側で合計から求める。
+- 台番号は数字以外を除いて突き合わせ、同じ日に同じ台番号が複数行あれば最後の行
+  （island.js の島図と同じ）。値は calendar.js と同じくカンマを除いた先頭の整数部分。
+- 位置は position.csv の見出しの列ごと（値が 1 の台）。1台が複数の位置に入ることもある。
+- 月別JSONの内容ハッシュが前回と同じ月は読み直さない。ただし island-config.json か
+  position.csv の内容が変わったら全月を作り直す。
+
+標準ライブラリのみを使用。
+"""
+
+import os
+import re
+import csv
+import json
+import hashlib
+
+import daily_stats
+import month_schema
+
+FORMAT = 'spatial-stats-v1'
+STATS_FILENAME = 'spatial_stats.json'
+ISLAND_CONFIG = 'island-config.json'
+POSITION_CSV = 'position.csv'
+COLUMNS = ('台数', '差枚', 'G数', 'BB', 'RB')
+FIELDS = ('台番号', '差枚', 'G数', 'BB', 'RB')
+
+NON_DIGIT_RE = re.compile(r"\D")
+
+
+def unit_key(value) -> str:
+    """island.js と同じく台番号から数字以外を除く"""
+    return NON_DIGIT_RE.sub('', str(value))
+
+
+def stats_path(parent_dir: str) -> str:
+    return os.path.join(parent_dir, STATS_FILENAME)
+
+
+def _layout_sha256(path: str) -> str:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def layout_hashes(data_dir: str) -> dict:
+    """レイアウトファイルの内容ハッシュ（無ければ null）"""
+    return {name: _layout_sha256(os.path.join(data_dir, name))
+            for name in (ISLAND_CONFIG, POSITION_CSV)}
+
+
+def _load_island_config(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:
+        return {}
+
+
+def _load_positions(path: str) -> tuple:
+    """position.csv → (見出しの位置名のリスト, {台番号: 値が 1 の位置の集合})"""
+    try:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+    except OSError:
+        return [], {}
+    if len(rows) < 2:
+        return [], {}
+    names = [h.strip() for h in rows[0][1:]]
+    positions = {}
+    for row in rows[1:]:
+        if not row or not unit_key(row[0]):
+            continue
+        flags = {name for name, value in zip(names, row[1:])
+                 if daily_stats.parse_count(value) == 1}
+        positions[unit_key(row[0])] = flags
+    return names, positions
+
+
+def build_groups(data_dir: str) -> tuple:
+    """
+    レイアウトから集計グループを作る。
+    戻り値: (groups, {台番号: その台が入るグループの添字のリスト})
+    """
+    config = _load_island_config(os.path.join(data_dir, ISLAND_CONFIG))
+    groups = []
+    members = {}
+
+    def add_group(group, units):
+        index = len(groups)
+        group['units'] = len(units)
+        groups.append(group)
+        for unit in units:
+            members.setdefault(unit, []).append(index)
+
+    islands = config.get('islands') or []
+
+    def island_units(island):
+        return [unit_key(u) for row in island.get('rows') or [] for u in row.get('units') or [] if u]
+
+    for area in config.get('areas') or []:
+        units = [u for island in islands if island.get('area') == area['id']
+                 for u in island_units(island)]
+        add_group({'kind': 'area', 'id': area['id'], 'name': area.get('name', area['id'])}, units)
+    for island in islands:
+        add_group({'kind': 'island', 'id': island['id'], 'area': island.get('area')},
+                  island_units(island))
+    for island in islands:
+        for i, row in enumerate(island.get('rows') or []):
+            add_group({'kind': 'row', 'id': f"{island['id']}/{i}", 'island': island['id']},
+                      [unit_key(u) for u in row.get('units') or [] if u])
+
+    names, positions = _load_positions(os.path.join(data_dir, POSITION_CSV))
+    for name in names:
+        add_group({'kind': 'position', 'id': name},
+                  sorted((unit for unit, flags in positions.items() if name in flags), key=int))
+    return groups, members
+
+
+def day_totals(records: list, group_count: int, members: dict) -> list:
+    """1日分（v1 のレコード）のグループごとの合計（groups の順に COLUMNS 個ずつ）"""
+    units = {}
+    for record in records:
+        unit = unit_key(record.get('台番号', ''))
+        if unit in members:
+            units[unit] = record
+
+    width = len(COLUMNS)
+    totals = [0] * (group_count * width)
+    for unit, record in units.items():
+        values = [1] + [daily_stats.parse_count(record.get(col, '')) for col in COLUMNS[1:]]
+        for index in members[unit]:
+            base = index * width
+            for k, value in enumerate(values):
+                totals[base + k] += value
+    return totals
+
+
+def load_previous(path: str) -> dict:
+    """前回の spatial_stats.json（読めない・形式や列が違えば None）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if doc.get('format') != FORMAT or doc.get('columns') != list(COLUMNS):
+        return None
+    return doc
+
+
+def build_stats(parent_dir: str, months: dict, previous: dict = None) -> tuple:
+    """
+    files.json の months（day_shards.build_manifest の結果）の全月について島・列・位置ごとの
+    日別集計を作る。previous は load_previous の結果。
+    戻り値: (集計, 読み直した月数)。レイアウトが無ければ (None, 0)
+    """
+    data_dir = os.path.join(parent_dir, 'data')
+    layout = layout_hashes(data_dir)
+    if not any(layout.values()):
+        return None, 0
+    groups, members = build_groups(data_dir)
+
+    # レイアウトが変わったら前回の集計は使わない
+    old_months = {}
+    if previous is not None and previous.get('layout') == layout and previous.get('groups') == groups:
+        old_months = previous.get('months') or {}
+
+    result = {}
+    reread = 0
+    for year_month in sorted(months):
+        entry = months[year_month]
+        old = old_months.get(year_month)
+        if old and old.get('sha256') == entry['sha256']:
+            result[year_month] = old
+            continue
+        json_path = os.path.join(parent_dir, entry['path'])
+        try:
+            days = {date_key: day_totals(records, len(groups), members)
+                    for date_key, records in month_schema.iter_month_file(json_path, FIELDS)}
+        except Exception as e:
+            print(f"    警告: {entry['path']} の島・位置別集計を作れません - {e}")
+            continue
+        result[year_month] = {
+            'sha256': entry['sha256'],
+            'days': {date_key: days[date_key] for date_key in sorted(days)},
+        }
+        reread += 1
+
+    return {
+        'format': FORMAT,
+        'layout': layout,
+        'columns': list(COLUMNS),
+        'groups': groups,
+        'months': result,
+    }, reread
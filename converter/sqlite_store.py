@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+台データの SQLite ストア（convert_csv_to_json.py の --db モードから使う）
+
+- records: 1行 = 1日 × 1台。主キーは (date, 台番号)。
+  値は月別JSONと同じ文字列のまま保存する（書き出し時にバイト一致させるため）。
+  pos はその日の行順で、JSON 書き出し時の並びを再現する。
+- days:    日ごとの行数とレコードのハッシュ（変更検知用）
+- months:  月ごとの dirty フラグ（最後の JSON 書き出し以降に変わった月）
+- sources: 取り込んだHTMLファイル名と内容ハッシュ（未変更ファイルのスキップ用）
+
+取り込みは1日単位の置き換え（DELETE + INSERT）を1トランザクションで行う。
+標準ライブラリ（sqlite3）のみを使用。
+
+アドホック集計の例:
+    SELECT "機種名", SUM(CAST("差枚" AS INTEGER)) FROM records
+    WHERE date BETWEEN '2026_08_01' AND '2026_08_31' GROUP BY "機種名";
+"""
+
+import sqlite3
+
+# 月別JSONのレコードの列（この順で JSON に書き出す）
+FIELDS = ('機種名', '台番号', 'G数', '差枚', 'BB', 'RB', 'ART',
+          '合成確率', 'BB確率', 'RB確率', 'ART確率')
+
+_COLUMNS_SQL = ', '.join(f'"{f}"' for f in FIELDS)
+_PLACEHOLDERS = ', '.join('?' for _ in FIELDS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS records (
+    date TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    {', '.join(f'"{f}" TEXT NOT NULL' for f in FIELDS)},
+    PRIMARY KEY (date, "台番号")
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_records_date ON records (date, pos);
+CREATE INDEX IF NOT EXISTS idx_records_machine ON records ("機種名");
+CREATE INDEX IF NOT EXISTS idx_records_unit ON records ("台番号");
+
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    year_month TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS months (
+    year_month TEXT PRIMARY KEY,
+    dirty INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+"""
+
+
+def open_store(db_path: str) -> sqlite3.Connection:
+    """ストアを開く（無ければスキーマごと作成）"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def year_month_of(date_key: str) -> str:
+    """'YYYY_MM_DD' → 'YYYY_MM'"""
+    return date_key[:7]
+
+
+def get_source_hash(conn: sqlite3.Connection, name: str, date_key: str) -> str:
+    """取り込み済みHTMLの内容ハッシュ（未登録・日付違いなら None）"""
+    row = conn.execute('SELECT sha256 FROM sources WHERE name = ? AND date = ?',
+                       (name, date_key)).fetchone()
+    return row[0] if row else None
+
+
+def get_day_hash(conn: sqlite3.Connection, date_key: str) -> str:
+    """格納済みの日のレコードハッシュ（無ければ None）"""
+    row = conn.execute('SELECT sha256 FROM days WHERE date = ?', (date_key,)).fetchone()
+    return row[0] if row else None
+
+
+def record_source(conn: sqlite3.Connection, name: str, sha256: str, date_key: str):
+    """取り込んだHTMLを記録"""
+    with conn:
+        conn.execute('INSERT INTO sources (name, sha256, date) VALUES (?, ?, ?) '
+                     'ON CONFLICT(name) DO UPDATE SET sha256 = excluded.sha256, date = excluded.date',
+                     (name, sha256, date_key))
+
+
+def upsert_day(conn: sqlite3.Connection, date_key: str, records: list, sha256: str):
+    """
+    1日分のレコードを1トランザクションで置き換える（O(その日の台数)）。
+    列構成が FIELDS と異なる場合・台番号が重複する場合は ValueError（DBは変更しない）。
+    """
+    rows = []
+    units = set()
+    for pos, record in enumerate(records):
+        if tuple(record.keys()) != FIELDS:
+            raise ValueError(f"{date_key}: 列構成が想定と異なります: {list(record.keys())}")
+        if record['台番号'] in units:
+            raise ValueError(f"{date_key}: 台番号が重複しています: {record['台番号']}")
+        units.add(record['台番号'])
+        rows.append((date_key, pos) + tuple(record.values()))
+
+    year_month = year_month_of(date_key)
+    with conn:
+        conn.execute('DELETE FROM records WHERE date = ?', (date_key,))
+        conn.executemany(f'INSERT INTO records (date, pos, {_COLUMNS_SQL}) '
+                         f'VALUES (?, ?, {_PLACEHOLDERS})', rows)
+        conn.execute('INSERT INTO days (date, year_month, rows, sha256) VALUES (?, ?, ?, ?) '
+                     'ON CONFLICT(date) DO UPDATE SET rows = excluded.rows, sha256 = excluded.sha256',
+                     (date_key, year_month, len(rows), sha256))
+        conn.execute('INSERT INTO months (year_month, dirty) VALUES (?, 1) '
+                     'ON CONFLICT(year_month) DO UPDATE SET dirty = 1', (year_month,))
+
+
+def list_months(conn: sqlite3.Connection, dirty_only: bool = False) -> list:
+    """格納されている年月の一覧（古い順）"""
+    sql = 'SELECT year_month FROM months'
+    if dirty_only:
+        sql += ' WHERE dirty = 1'
+    return [row[0] for row in conn.execute(sql + ' ORDER BY year_month')]
+
+
+def load_month(conn: sqlite3.Connection, year_month: str) -> dict:
+    """1か月分を月別JSONと同じ { 日付: [レコード, ...] } 形式で返す（日付順・行順）"""
+    month_data = {}
+    cursor = conn.execute(f'SELECT date, {_COLUMNS_SQL} FROM records '
+                          'WHERE date >= ? AND date < ? ORDER BY date, pos',
+                          (year_month + '_', year_month + '_~'))
+    for row in cursor:
+        month_data.setdefault(row[0], []).append(dict(zip(FIELDS, row[1:])))
+    return month_data
+
+
+def mark_exported(conn: sqlite3.Connection, year_month: str):
+    """月を JSON 書き出し済み（dirty でない）にする"""
+    with conn:
+        conn.execute('UPDATE months SET dirty = 0 WHERE year_month = ?', (year_month,))
@@ -4,20 +4,62 @@
 build_unit_history.py
 
 data/*.json を全スキャンし、台の状態変化履歴 unit_history.json を生成する
-完全に独立した単体スクリプト。
+単体スクリプト。
 
     python build_unit_history.py
+    python build_unit_history.py --profile compact   … 空白なし＋最大圧縮の .gz を併置
+    python build_unit_history.py --incremental       … チェックポイント以降の日だけ処理
+    python build_unit_history.py --workers 4         … 月の読み込みを4プロセスで先読み
+    python build_unit_history.py --sharded           … unit_history/ にシャード＋index.json も出力
+    python build_unit_history.py --encoded           … 符号化版 unit_history.enc.json も出力
+    python build_unit_history.py --intervals         … 区間インデックス unit_history.intervals.json も出力
 
 - converter.py からは呼び出さない（独立実行専用）。
-- 標準ライブラリのみを使用（外部依存なし）。
-- メモリ効率: 同時に載せるのは「処理中の1か月分データ」＋「直前1日分の
-  スナップショット」＋「蓄積中の出力データ」のみ。全月を一度に展開しない。
-- 全再生成方式（増分ビルドはしない）。
+- 標準ライブラリのみを使用（外部依存なし）。月別JSONの読み込みだけは
+  converter/month_schema.py の iter_month_file（1日ずつ・必要な列だけ読む）を使う。
+- メモリ効率: 同時に載せるのは「処理中の1日分のレコード（機種名・台番号のみ）」＋
+  「処理中の1か月分の台配置」＋「直前1日分のスナップショット」＋
+  「蓄積中の出力データ」のみ。全月を一度に展開しない。
+- --workers N（0 で CPU コア数）では、月別JSONの読み込みと台配置への変換を
+  ワーカープロセスで先読みし、比較は日付順に1プロセスで行う（月境界の接続は同じ）。
+  先読みする月数は --read-ahead（既定はワーカー数の2倍）までに抑える。
+  出力は直列実行（既定の --workers 1）とバイト単位で同一。
+- 既定は全再生成。--incremental では history-maker/unit_history.checkpoint.json
+  （git管理外）に「最後に処理した日・その日のスナップショット・蓄積中の出力」を
+  保存し、次回はそれより後の日だけを処理する。
+    - 前回から stat（サイズ・更新時刻）が変わっていない月は読まない。
+      変わった月だけ読み、処理済みの日の台配置（機種名・台番号）のハッシュを比較する
+      （履歴は台配置だけで決まるため、差枚などの修正では作り直さない）。
+    - 処理済みの日の台配置が変わった・処理済みの月が消えた・処理済みの日より前に
+      月が増えた場合は全再生成に切り替える。
+    - 日々の追加では最新月だけを読むため、所要時間は蓄積月数によらずほぼ一定。
+    - 結果は全再生成と同じ（キーの並び順を除く）。
+- --sharded では unit_history.json に加え、unit_history/ に台番号の範囲ごと・
+  機種のバケットごとのシャードと小さな index.json を書き出す（形式は
+  write_sharded_output の上のコメント）。画面側は index.json だけを起動時に読み、
+  表示する台のシャードだけを後から読むため、履歴が何年分たまっても起動時の
+  読み込み量は変わらない。
+- unit_history.json と同時に、全機種のイベントを日付順に並べた変化フィード
+  unit_history.feed.json（unit_feed.py）も書き出す。画面の「日付 D 以前の直近 N 件」
+  （撤去台一覧など）は、全機種のイベント列を走査せずに切り出すだけで求まる。
+- --encoded では unit_history.enc.json（日付を日数、機種名・台番号を辞書の添字、
+  イベントを台番号の増減だけで持つ符号化版。unit_history_codec.py）も書き出す。
+  unit_history.json と完全に同じ内容に戻ることを確かめてから書く。
+- --intervals では unit_history.intervals.json（台番号ごとに「この日からこの状態」の
+  区間を開始日順に並べた表。unit_intervals.py）も書き出す。画面のヘルパーは
+  (台番号, 日付) を二分探索1回で引ける。
 """
 
 import os
 import re
+import gzip
 import json
+import hashlib
+import argparse
+import sys
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # --- パス設定 -------------------------------------------------------------
 # このスクリプトは converter/ 配下に置かれる想定。
@@ -27,6 +69,25 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 # 出力先はプロジェクトルート直下（既存の data/*.json や files.json と同階層）。
 OUTPUT_PATH = os.path.join(PROJECT_ROOT, "unit_history.json")
+# 変化フィードの出力先（毎回書き出す）
+FEED_PATH = os.path.join(PROJECT_ROOT, "unit_history.feed.json")
+# --encoded の出力先
+ENCODED_PATH = os.path.join(PROJECT_ROOT, "unit_history.enc.json")
+# --intervals の出力先
+INTERVALS_PATH = os.path.join(PROJECT_ROOT, "unit_history.intervals.json")
+# --incremental のチェックポイント（git管理外）
+CHECKPOINT_PATH = os.path.join(SCRIPT_DIR, "unit_history.checkpoint.json")
+CHECKPOINT_VERSION = 2
+
+# 月別JSONの読み込みは converter/month_schema.py を共用する
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "converter"))
+import month_schema  # noqa: E402
+import unit_history_codec  # noqa: E402
+import unit_intervals  # noqa: E402
+import unit_feed  # noqa: E402
+
+# 履歴に使う列（これ以外は読み込み時に捨てる）
+LAYOUT_FIELDS = ("機種名", "台番号")
 
 # YYYY_MM.json 形式のファイル名にマッチする正規表現
 MONTH_FILE_RE = re.compile(r"^(\d{4})_(\d{2})\.json$")
@@ -56,7 +117,7 @@ def list_month_files(data_dir):
 
 def sorted_date_keys(month_data):
     """
-    月次データ（{ "YYYY_MM_DD": [...] }）の日付キーを古い順にソートして返す。
+    日付キーの辞書（{ "YYYY_MM_DD": ... }）のキーを古い順にソートして返す。
     日付形式でないキーは無視する。
     """
     keys = []
@@ -70,40 +131,74 @@ def sorted_date_keys(month_data):
     return keys
 
 
-def build_snapshot(day_records):
+class Interner:
     """
-    ある1日分のレコード配列から「機種名 -> 台番号のSet」マップを構築する。
-    day_records: [ { "機種名": "...", "台番号": "...", ... }, ... ]
-    戻り値: { 機種名: set([台番号, ...]) }
+    文字列（機種名・台番号）⇔ 出現順の連番ID。
+    スナップショットは ID で持ち、出力するときだけ names で文字列に戻す。
     """
-    snapshot = {}
+
+    def __init__(self):
+        self.ids = {}     # 文字列 -> ID
+        self.names = []   # ID -> 文字列
+
+    def intern(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = len(self.names)
+            self.ids[name] = i
+            self.names.append(name)
+        return i
+
+
+def iter_bits(mask):
+    """ビットマスクの立っているビット位置（＝台番号ID）を小さい順に返す"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def popcount(mask):
+    """ビットマスクの立っているビット数（＝台数）"""
+    return bin(mask).count("1")
+
+
+def day_layout(day_records):
+    """
+    ある1日分のレコード配列から台配置 [(機種名, 台番号), ...]（行順）を取り出す。
+    機種名・台番号の無いレコードは無視し、どちらも文字列として扱う。
+    前日と同じ並びならその日の処理を丸ごと省く（process_day）。
+    """
+    layout = []
     for rec in day_records:
         machine = rec.get("機種名")
         unit = rec.get("台番号")
         if machine is None or unit is None:
             continue
-        # 台番号は文字列として扱う
-        unit = str(unit)
-        machine = str(machine)
-        if machine not in snapshot:
-            snapshot[machine] = set()
-        snapshot[machine].add(unit)
-    return snapshot
+        layout.append((str(machine), str(unit)))
+    return layout
 
 
-def snapshot_all_units(snapshot):
+def build_snapshot(layout, machines, units):
     """
-    スナップショット全体の「台番号 -> 機種名」対応を返す（台番号軸の記録に使用）。
-    戻り値: { 台番号: 機種名 }
+    台配置から「機種ID -> 台番号IDのビットマスク」マップを構築する。
+    machines / units: 機種名・台番号の Interner
+    戻り値: { 機種ID: ビットマスク }（キーはその日の行に初めて出た順）
     """
-    unit_to_machine = {}
-    for machine, units in snapshot.items():
-        for u in units:
-            unit_to_machine[u] = machine
-    return unit_to_machine
+    snapshot = {}
+    for machine, unit in layout:
+        mid = machines.intern(machine)
+        snapshot[mid] = snapshot.get(mid, 0) | (1 << units.intern(unit))
+    return snapshot
+
 
+def unit_names(mask, units):
+    """ビットマスク → 台番号（文字列）のソート済みリスト"""
+    return sorted(units.names[u] for u in iter_bits(mask))
 
-def diff_and_emit_events(prev_snapshot, cur_snapshot, date_key, machine_history):
+
+def diff_and_emit_events(prev_snapshot, cur_snapshot, date_key, machine_history,
+                         machines, units):
     """
     前日スナップショットと当日スナップショットを比較し、
     machine_history にイベントを push する。
@@ -117,167 +212,605 @@ def diff_and_emit_events(prev_snapshot, cur_snapshot, date_key, machine_history)
 
     複数属性の同時発生（例: 台数増＋入れ替わり）は、それぞれ別イベントとして
     複数 push する。各イベントの type は必ず単一の文字列。
+    台番号Setはビットマスクなので、変化の有無は整数の比較、
+    部分集合の判定は AND NOT で行う。
     """
 
-    def push_event(machine, ev_type, cur_units, prev_units):
+    def push_event(mid, ev_type, cur_mask, prev_mask):
+        machine = machines.names[mid]
         if machine not in machine_history:
             machine_history[machine] = {"events": []}
         machine_history[machine]["events"].append({
             "date": date_key,
             "type": ev_type,
             # units は今日時点の全体、prev_units は前日時点の全体
-            "units": sorted(cur_units),
-            "prev_units": sorted(prev_units),
+            "units": unit_names(cur_mask, units),
+            "prev_units": unit_names(prev_mask, units),
         })
 
-    prev_machines = set(prev_snapshot.keys())
-    cur_machines = set(cur_snapshot.keys())
-
     # --- 当日に存在する機種を評価 ---
-    for machine in cur_machines:
-        cur_units = cur_snapshot[machine]
-        if machine not in prev_snapshot:
+    for mid, cur_mask in cur_snapshot.items():
+        prev_mask = prev_snapshot.get(mid)
+        if prev_mask is None:
             # 前日に無い機種名 → 新台
-            push_event(machine, "new", cur_units, set())
+            push_event(mid, "new", cur_mask, 0)
+            continue
+        if cur_mask == prev_mask:
             continue
 
-        prev_units = prev_snapshot[machine]
-        cur_n = len(cur_units)
-        prev_n = len(prev_units)
+        cur_n = popcount(cur_mask)
+        prev_n = popcount(prev_mask)
 
         # 台数差による判定（new/add/remove）
         if cur_n > prev_n:
-            push_event(machine, "add", cur_units, prev_units)
+            push_event(mid, "add", cur_mask, prev_mask)
         elif cur_n < prev_n:
-            push_event(machine, "remove", cur_units, prev_units)
+            push_event(mid, "remove", cur_mask, prev_mask)
 
         # 台番号Setの入れ替わりによる move 判定。
         # 台数が同じ場合の純粋な入れ替えはもちろん、
         # 台数変化と同時に入れ替わりがある場合も別途 move を立てる。
-        if cur_units != prev_units:
-            if cur_n == prev_n:
-                # 台数同じ・中身違う → move
-                push_event(machine, "move", cur_units, prev_units)
-            else:
-                # 台数変化あり。単なる増減（片方が他方の部分集合）なら move にしない。
-                # 増台なら prev が cur の部分集合、減台なら cur が prev の部分集合の
-                # ときは「純粋な増減」なので move を立てない。
-                # それ以外（入れ替わりを伴う増減）は add/remove に加えて move も立てる。
-                if cur_n > prev_n:
-                    pure_add = prev_units.issubset(cur_units)
-                    if not pure_add:
-                        push_event(machine, "move", cur_units, prev_units)
-                else:
-                    pure_remove = cur_units.issubset(prev_units)
-                    if not pure_remove:
-                        push_event(machine, "move", cur_units, prev_units)
+        if cur_n == prev_n:
+            # 台数同じ・中身違う → move
+            push_event(mid, "move", cur_mask, prev_mask)
+        elif cur_n > prev_n:
+            # 増台で prev が cur の部分集合なら「純粋な増台」なので move にしない
+            if prev_mask & ~cur_mask:
+                push_event(mid, "move", cur_mask, prev_mask)
+        else:
+            # 減台で cur が prev の部分集合なら「純粋な減台」なので move にしない
+            if cur_mask & ~prev_mask:
+                push_event(mid, "move", cur_mask, prev_mask)
 
     # --- 前日に存在したが当日消えた機種を評価（withdraw） ---
-    for machine in prev_machines - cur_machines:
-        prev_units = prev_snapshot[machine]
-        push_event(machine, "withdraw", set(), prev_units)
+    for mid, prev_mask in prev_snapshot.items():
+        if mid not in cur_snapshot:
+            push_event(mid, "withdraw", 0, prev_mask)
 
 
-def record_unit_axis(prev_unit_to_machine, cur_unit_to_machine,
-                     date_key, unit_history, is_first_day):
+def record_unit_axis(prev_snapshot, cur_snapshot, date_key, unit_history,
+                     machines, units, is_first_day):
     """
     台番号軸（unit_history）の記録。
     機種が変化した節目の日だけ記録する（毎日は記録しない）。
 
     - 最初のデータ日: 全台番号の初回エントリを記録（初期状態）。
-    - 以降: ある台番号について、前回記録時の機種（＝prev の機種）と
-      当日の機種が異なる場合に { date, machine } を追記する。
+    - 以降: ある台番号について、前回記録時の機種と当日の機種が異なる場合に
+      { date, machine } を追記する。前日と同じ機種に付いている台番号は
+      前回記録時の機種とも同じなので、前日から増えたビットだけを調べる。
 
-    prev_unit_to_machine: 前日時点の { 台番号: 機種名 }
-    cur_unit_to_machine:  当日時点の { 台番号: 機種名 }
-    unit_history:         蓄積中の { 台番号: [ {date, machine}, ... ] }
+    prev_snapshot: 前日時点の { 機種ID: ビットマスク }（最初の日は None）
+    cur_snapshot:  当日時点の { 機種ID: ビットマスク }
+    unit_history:  蓄積中の { 台番号: [ {date, machine}, ... ] }
     """
-    if is_first_day:
-        # 初期状態として全台番号の初回エントリを記録
-        for unit, machine in cur_unit_to_machine.items():
+    for mid, mask in cur_snapshot.items():
+        if not is_first_day:
+            mask &= ~prev_snapshot.get(mid, 0)
+        machine = machines.names[mid]
+        for u in iter_bits(mask):
+            unit = units.names[u]
+            # 「前回記録時の機種」は unit_history の末尾エントリを正とする。
+            # （台が一時的に消えて別機種で復活した場合も末尾比較で節目を拾える）
+            history = unit_history.get(unit)
+            if history and (history[-1]["machine"] == machine
+                            or history[-1]["date"] == date_key):
+                # 機種が変わっていない（同じ日に同じ台番号が重複していれば最初の1件のみ）
+                continue
+            # 初出、または機種が変わった節目 → 追記
             unit_history.setdefault(unit, []).append({
                 "date": date_key,
                 "machine": machine,
             })
+
+
+def sync_gzip(path, profile):
+    """
+    compact なら path の .gz を書き直し、pretty なら古い .gz を削除する
+    （converter/artifacts.py の sync_gzip と同じ規則。更新時刻が一致すれば何もしない）
+    """
+    gz_path = path + ".gz"
+    if (os.path.exists(gz_path)
+            and os.stat(gz_path).st_mtime_ns == os.stat(path).st_mtime_ns):
         return
+    if profile == "compact":
+        with open(path, "rb") as f:
+            payload = f.read()
+        with open(gz_path, "wb") as raw:
+            with gzip.GzipFile(filename="", mode="wb", compresslevel=9,
+                               fileobj=raw, mtime=0) as f:
+                f.write(payload)
+        st = os.stat(path)
+        os.utime(gz_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    elif os.path.exists(gz_path):
+        os.remove(gz_path)
+
+
+def write_output(output, profile):
+    """
+    unit_history.json を書き出す。
+    - pretty（既定）: indent=2。古くなった unit_history.json.gz は削除する
+    - compact: 空白なし＋最大圧縮の .gz（ヘッダ時刻 0、更新時刻は JSON と同じ）
+    converter/artifacts.py と同じ規則（こちらは独立実行のため自前で持つ）。
+    """
+    gz_path = OUTPUT_PATH + ".gz"
+    pretty = json.dumps(output, ensure_ascii=False, indent=2)
+    if profile == "compact":
+        text = json.dumps(output, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = pretty
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        f.write(text)
+
+    sync_gzip(OUTPUT_PATH, profile)
+    if profile == "compact":
+        print("出力サイズ（indent=2 の場合 → 書き出し後 / gzip）: {} → {} / {}".format(
+            "{:,.1f} KB".format(len(pretty.encode("utf-8")) / 1024),
+            "{:,.1f} KB".format(os.path.getsize(OUTPUT_PATH) / 1024),
+            "{:,.1f} KB".format(os.path.getsize(gz_path) / 1024)))
+
+
+# --- シャード出力（--sharded） ----------------------------------------------
+# unit_history/index.json と、台番号の範囲ごと・機種のバケットごとのシャード。
+# js/data.js の ensureUnitHistoryFor は index.json だけを起動時に読み、
+# 表示する台番号のシャードとその台の機種のシャードを必要になった時点で読む。
+#
+# index.json:
+#     {
+#       "version": 2,
+#       "latest_date": "2026_08_31",          … 全イベント・全エントリの最新日
+#       "unit_range": 100,                    … 台番号シャードの幅（881 → "8"）
+#       "machine_buckets": 16,                … 機種シャードの数（機種名の FNV-1a で振り分け）
+#       "units": { "8": "unit_history/units_8.<ハッシュ>.json", "x": ... },
+#       "machines": { "3": "unit_history/machines_3.<ハッシュ>.json", ... },
+#       "feed": "unit_history/feed.<ハッシュ>.json"
+#     }
+# - 台番号シャード: { "unit_history": { 台番号: [...] } }（数字でない台番号は "x"）
+#   --intervals なら "intervals" にそのシャードの台番号の区間インデックスも持つ
+# - 機種シャード: { "machine_history": { 機種名: { "events": [...] } } }
+# - 変化フィード: unit_history.feed.json と同じ内容（unit_feed.py）
+#   （撤去台一覧は全機種の withdraw を見るため、機種シャードを全部読まずに済むよう別に持つ）
+# 台番号・機種シャードの中身は unit_history.json の該当部分と同じ。ファイル名に内容の
+# SHA-256 の先頭16桁を入れるため長期キャッシュでき、参照されなくなったものは削除する。
+# 機種の振り分けは機種名だけで決まるため、機種が増えても index.json は大きくならない。
+SHARD_DIR = os.path.join(PROJECT_ROOT, "unit_history")
+SHARD_INDEX_VERSION = 2
+UNIT_RANGE = 100
+MACHINE_BUCKETS = 16
+SHARD_HASH_LENGTH = 16
+# withdrawals は version 1 の撤去シャード（削除対象として認識するためだけに残す）
+SHARD_RE = re.compile(r"^(units_\w+|machines_\d+|feed|withdrawals)\.[0-9a-f]{%d}\.json$"
+                      % SHARD_HASH_LENGTH)
+
+
+def unit_shard_key(unit):
+    """台番号 → 台番号シャードのキー（'881' → '8'。数字でなければ 'x'）"""
+    return str(int(unit) // UNIT_RANGE) if unit.isdigit() else "x"
+
+
+def machine_bucket(machine):
+    """
+    機種名 → 機種シャードの番号。UTF-16 のコード単位に対する 32bit FNV-1a を
+    MACHINE_BUCKETS で割った余り（js/data.js の unitHistoryMachineBucket と同じ値）
+    """
+    data = machine.encode("utf-16-le")
+    h = 0x811C9DC5
+    for i in range(0, len(data), 2):
+        h ^= data[i] | (data[i + 1] << 8)
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    return h % MACHINE_BUCKETS
+
+
+def write_shard(name, content, profile):
+    """シャードを unit_history/<name>.<ハッシュ>.json に書き出し、プロジェクトルートからの相対パスを返す"""
+    payload = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(payload).hexdigest()[:SHARD_HASH_LENGTH]
+    filename = "{}.{}.json".format(name, digest)
+    path = os.path.join(SHARD_DIR, filename)
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    sync_gzip(path, profile)
+    return "unit_history/" + filename
+
+
+def write_sharded_output(output, profile, intervals=False):
+    """
+    unit_history/ にシャードと index.json を書き出し、古いシャードを削除する。
+    intervals なら台番号シャードにその台番号の区間インデックス（"intervals"）も入れる
+    """
+    os.makedirs(SHARD_DIR, exist_ok=True)
+
+    unit_groups = {}
+    for unit, entries in output["unit_history"].items():
+        unit_groups.setdefault(unit_shard_key(unit), {})[unit] = entries
+    machine_groups = {}
+    for machine, history in output["machine_history"].items():
+        machine_groups.setdefault(machine_bucket(machine), {})[machine] = history
+    index = {
+        "version": SHARD_INDEX_VERSION,
+        "latest_date": unit_intervals.latest_date(output),
+        "unit_range": UNIT_RANGE,
+        "machine_buckets": MACHINE_BUCKETS,
+        "units": {},
+        "machines": {str(bucket): write_shard("machines_{}".format(bucket),
+                                              {"machine_history": group}, profile)
+                     for bucket, group in sorted(machine_groups.items())},
+        "feed": write_shard("feed", unit_feed.build_feed(output), profile),
+    }
 
-    for unit, machine in cur_unit_to_machine.items():
-        # 「前回記録時の機種」は unit_history の末尾エントリを正とする。
-        # （台が一時的に消えて別機種で復活した場合も末尾比較で節目を拾える）
-        history = unit_history.get(unit)
-        if not history:
-            # これまで一度も記録が無い台番号 → 初出。記録する。
-            unit_history.setdefault(unit, []).append({
-                "date": date_key,
-                "machine": machine,
-            })
+    for key, group in sorted(unit_groups.items()):
+        content = {"unit_history": group}
+        if intervals:
+            content["intervals"] = unit_intervals.build_intervals(output, list(group))
+        index["units"][key] = write_shard("units_" + key, content, profile)
+
+    index_path = os.path.join(SHARD_DIR, "index.json")
+    with open(index_path, "w", encoding="utf-8") as f:
+        if profile == "compact":
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+    sync_gzip(index_path, profile)
+
+    referenced = {os.path.basename(path) for path in index["units"].values()}
+    referenced |= {os.path.basename(path) for path in index["machines"].values()}
+    referenced.add(os.path.basename(index["feed"]))
+    removed = 0
+    for name in os.listdir(SHARD_DIR):
+        if SHARD_RE.match(name) and name not in referenced:
+            os.remove(os.path.join(SHARD_DIR, name))
+            removed += 1
+    for name in os.listdir(SHARD_DIR):
+        if name.endswith(".gz") and not os.path.exists(os.path.join(SHARD_DIR, name[:-len(".gz")])):
+            os.remove(os.path.join(SHARD_DIR, name))
+
+    print("シャード出力: {}（台番号 {}件・機種 {}件、古いシャード {}件を削除）".format(
+        index_path, len(index["units"]), len(index["machines"]), removed))
+
+
+def write_feed_output(output, profile):
+    """変化フィード unit_history.feed.json を書き出す（常に空白なし。.gz は profile に従う）"""
+    doc = unit_feed.build_feed(output)
+    with open(FEED_PATH, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+    sync_gzip(FEED_PATH, profile)
+    print("変化フィード: {}（{:,.1f} KB、{}件）".format(
+        FEED_PATH, os.path.getsize(FEED_PATH) / 1024, len(doc["events"])))
+
+
+def write_encoded_output(output, profile):
+    """
+    符号化版 unit_history.enc.json を書き出す（常に空白なし。.gz は profile に従う）。
+    unit_history.json に戻らない内容なら ValueError（unit_history_codec.encode_history）
+    """
+    doc = unit_history_codec.encode_history(output)
+    with open(ENCODED_PATH, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+    sync_gzip(ENCODED_PATH, profile)
+    print("符号化版: {}（{:,.1f} KB。unit_history.json は {:,.1f} KB）".format(
+        ENCODED_PATH, os.path.getsize(ENCODED_PATH) / 1024, os.path.getsize(OUTPUT_PATH) / 1024))
+
+
+def write_intervals_output(output, profile):
+    """区間インデックス unit_history.intervals.json を書き出す（常に空白なし。.gz は profile に従う）"""
+    doc = unit_intervals.build_intervals(output)
+    with open(INTERVALS_PATH, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+    sync_gzip(INTERVALS_PATH, profile)
+    print("区間インデックス: {}（{:,.1f} KB、{}区間）".format(
+        INTERVALS_PATH, os.path.getsize(INTERVALS_PATH) / 1024,
+        sum(len(flat) for flat in doc["units"].values()) // len(unit_intervals.FIELDS)))
+
+
+def new_state():
+    """蓄積中の出力と直前1日分のスナップショット（チェックポイントに保存する内容）"""
+    return {
+        "machine_history": {},        # 蓄積中の出力（機種軸）
+        "unit_history": {},           # 蓄積中の出力（台番号軸）
+        "machines": Interner(),       # 機種名 ⇔ 機種ID
+        "units": Interner(),          # 台番号 ⇔ 台番号ID（ビット位置）
+        # 直前1日分のスナップショットのみ保持（メモリ効率のため）
+        "prev_layout": None,          # [(機種名, 台番号), ...]
+        "prev_snapshot": None,        # { 機種ID: 台番号IDのビットマスク }
+        "last_date": None,            # 最後に処理した日付キー
+    }
+
+
+def process_day(state, date_key, layout):
+    """1日分（day_layout の台配置）を処理して state を進める"""
+    if state["last_date"] is not None and layout == state["prev_layout"]:
+        # 前日と台配置がまったく同じ日は何も起きない
+        state["last_date"] = date_key
+        return
+
+    machines = state["machines"]
+    units = state["units"]
+    cur_snapshot = build_snapshot(layout, machines, units)
+
+    if state["last_date"] is None:
+        # 最初のデータ日: new を立てず、台番号軸に初期状態のみ記録
+        record_unit_axis(None, cur_snapshot, date_key,
+                         state["unit_history"], machines, units, is_first_day=True)
+    elif cur_snapshot != state["prev_snapshot"]:
+        # 前日（＝直前スナップショット。月境界も同じ変数で接続される）と比較
+        diff_and_emit_events(state["prev_snapshot"], cur_snapshot, date_key,
+                             state["machine_history"], machines, units)
+        record_unit_axis(state["prev_snapshot"], cur_snapshot, date_key,
+                         state["unit_history"], machines, units, is_first_day=False)
+
+    # 当日を「次の前日」として保持（月境界の接続もここで担保される）
+    state["prev_layout"] = layout
+    state["prev_snapshot"] = cur_snapshot
+    state["last_date"] = date_key
+
+
+def file_stat(filepath):
+    """[サイズ, 更新時刻(ns)]"""
+    st = os.stat(filepath)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def read_month_layouts(filepath):
+    """
+    月別JSONを読み、日付順に [(日付キー, 台配置, 台配置のハッシュ), ...] を返す
+    （--workers ではワーカープロセスで実行される）。
+    同じ月の前日と同じ台配置は None にして、プロセス間の受け渡しを軽くする。
+    """
+    # 1日ずつ機種名・台番号だけを読み、その場で台配置にする
+    layouts = {date_key: day_layout(records) for date_key, records
+               in month_schema.iter_month_file(filepath, fields=LAYOUT_FIELDS)}
+    days = []
+    prev_layout = None
+    for date_key in sorted_date_keys(layouts):
+        layout = layouts[date_key]
+        payload = json.dumps([date_key, layout], ensure_ascii=False).encode("utf-8")
+        days.append((date_key, None if layout == prev_layout else layout,
+                     hashlib.sha256(payload).hexdigest()))
+        prev_layout = layout
+    return days
+
+
+def _expand_layouts(days):
+    """read_month_layouts の None（前日と同じ）を前日の台配置に戻す"""
+    expanded = []
+    prev_layout = None
+    for date_key, layout, digest in days:
+        if layout is None:
+            layout = prev_layout
+        expanded.append((date_key, layout, digest))
+        prev_layout = layout
+    return expanded
+
+
+def iter_month_days(month_files, workers=1, read_ahead=None):
+    """
+    月ごとに (year, month, filepath, stat, days) を年月の古い順に返す。
+    days は [(日付キー, 台配置, 台配置のハッシュ), ...]。stat は読む直前の file_stat。
+    workers > 1 ならワーカーで先読みし、未消費の月は read_ahead 件までに抑える。
+    """
+    if workers <= 1:
+        for (year, month, filepath) in month_files:
+            # 処理中の1か月分だけをメモリに載せる
+            stat = file_stat(filepath)
+            yield year, month, filepath, stat, _expand_layouts(read_month_layouts(filepath))
+        return
+
+    read_ahead = max(1, read_ahead or workers * 2)
+    remaining = iter(month_files)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(item):
+            stat = file_stat(item[2])
+            pending.append((item, stat, executor.submit(read_month_layouts, item[2])))
+
+        try:
+            for item in itertools.islice(remaining, read_ahead):
+                submit(item)
+            while pending:
+                (year, month, filepath), stat, future = pending.popleft()
+                days = future.result()
+                item = next(remaining, None)
+                if item is not None:
+                    submit(item)
+                yield year, month, filepath, stat, _expand_layouts(days)
+        finally:
+            # 途中で打ち切られた場合（全再生成への切り替えなど）は先読みを捨てる
+            for _, _, future in pending:
+                future.cancel()
+
+
+def layout_hash(days, last_date):
+    """last_date 以前の日の台配置のハッシュ（日ごとのハッシュから作る）。履歴はこれだけで決まる"""
+    h = hashlib.sha256()
+    for date_key, _, digest in days:
+        if date_key <= last_date:
+            h.update(digest.encode("ascii"))
+    return h.hexdigest()
+
+
+def month_key(year, month):
+    return "{:04d}_{:02d}".format(year, month)
+
+
+def record_month(months, year, month, stat, days, last_date):
+    """処理済みの月をチェックポイント用に記録（last_date 以前の日の台配置ハッシュ）"""
+    months[month_key(year, month)] = {
+        "stat": stat,
+        "layout_sha256": layout_hash(days, last_date),
+    }
+
+
+def load_checkpoint():
+    """チェックポイントを読み込む（無い・壊れている・版が違う場合は None）"""
+    if not os.path.exists(CHECKPOINT_PATH):
+        return None
+    try:
+        with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print("警告: チェックポイントを読み込めません（全再生成します） - {}".format(e))
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION or not checkpoint.get("last_date"):
+        return None
+
+    state = new_state()
+    state["machine_history"] = checkpoint["machine_history"]
+    state["unit_history"] = checkpoint["unit_history"]
+    # スナップショットは文字列で保存してあるので ID を振り直す
+    # （prev_unit_to_machine に当たる対応もスナップショットから一意に決まる）
+    state["prev_snapshot"] = build_snapshot(
+        [(machine, unit) for machine, unit_list in checkpoint["prev_snapshot"].items()
+         for unit in unit_list],
+        state["machines"], state["units"])
+    state["last_date"] = checkpoint["last_date"]
+    return state, checkpoint["months"]
+
+
+def save_checkpoint(state, months):
+    """チェックポイントを保存（書き込み途中で落ちても前回分が残るよう置き換えで書く）"""
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "last_date": state["last_date"],
+        "months": months,
+        "prev_snapshot": {state["machines"].names[mid]: unit_names(mask, state["units"])
+                          for mid, mask in state["prev_snapshot"].items()},
+        "machine_history": state["machine_history"],
+        "unit_history": state["unit_history"],
+    }
+    tmp_path = CHECKPOINT_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+def build_full(month_files, workers=1, read_ahead=None):
+    """全月を古い順に処理する。戻り値: (state, チェックポイント用の月情報)"""
+    state = new_state()
+    months = {}
+    for year, month, _, stat, days in iter_month_days(month_files, workers, read_ahead):
+        for date_key, layout, _ in days:
+            process_day(state, date_key, layout)
+        if state["last_date"] is not None:
+            record_month(months, year, month, stat, days, state["last_date"])
+    return state, months
+
+
+def build_incremental(month_files, state, months, workers=1, read_ahead=None):
+    """
+    チェックポイントの続きから処理する。
+    全再生成が必要な変更を見つけたら None を返す（state は途中まで進んでいることがある）。
+    戻り値: (state, チェックポイント用の月情報, 新たに処理した日数)
+    """
+    present = {month_key(year, month) for (year, month, _) in month_files}
+    if any(key not in present for key in months):
+        print("処理済みの月ファイルが無くなっています")
+        return None
+
+    checkpoint_date = state["last_date"]
+    changed = []
+    for (year, month, filepath) in month_files:
+        key = month_key(year, month)
+        entry = months.get(key)
+        if entry is not None and entry["stat"] == file_stat(filepath):
             continue
-        last_machine = history[-1]["machine"]
-        if last_machine != machine:
-            # 機種が変わった節目 → 追記
-            history.append({
-                "date": date_key,
-                "machine": machine,
-            })
+        if entry is None and key < checkpoint_date[:7]:
+            print("処理済みの期間に月が追加されています: {}".format(key))
+            return None
+        changed.append((year, month, filepath))
+
+    added = 0
+    for year, month, _, stat, days in iter_month_days(changed, workers, read_ahead):
+        key = month_key(year, month)
+        entry = months.get(key)
+        if entry is not None and layout_hash(days, checkpoint_date) != entry["layout_sha256"]:
+            print("処理済みの日の台配置が変わっています: {}".format(key))
+            return None
+        if entry is None and any(date_key <= checkpoint_date for date_key, _, _ in days):
+            print("処理済みの期間に日が追加されています: {}".format(key))
+            return None
+
+        for date_key, layout, _ in days:
+            if date_key > checkpoint_date:
+                process_day(state, date_key, layout)
+                added += 1
+        if state["last_date"] is not None:
+            record_month(months, year, month, stat, days, state["last_date"])
+    return state, months, added
 
 
 def main():
+    parser = argparse.ArgumentParser(description="unit_history.json を生成")
+    parser.add_argument("--profile", choices=("pretty", "compact"), default="pretty",
+                        help="compact: 空白なし＋最大圧縮の .gz を併置（既定: pretty）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="チェックポイント以降の日だけ処理する（無ければ全再生成して作成）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="月別JSONを先読みするプロセス数（0 で CPU コア数。既定: 1＝直列）")
+    parser.add_argument("--read-ahead", type=int, default=None,
+                        help="先読みして保持する月数の上限（既定: ワーカー数の2倍）")
+    parser.add_argument("--sharded", action="store_true",
+                        help="unit_history/ に台番号範囲・機種ごとのシャードと index.json も書き出す")
+    parser.add_argument("--encoded", action="store_true",
+                        help="符号化版 unit_history.enc.json も書き出す")
+    parser.add_argument("--intervals", action="store_true",
+                        help="区間インデックス unit_history.intervals.json も書き出す"
+                             "（--sharded なら台番号シャードにも入れる）")
+    args = parser.parse_args()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
     month_files = list_month_files(DATA_DIR)
     if not month_files:
         print("data/ に YYYY_MM.json が見つかりません。")
         # 空の出力を書き出しておく（読み込み側が null 扱いしやすいよう最小構造）
         output = {"machine_history": {}, "unit_history": {}}
-        with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
+        write_output(output, args.profile)
+        write_feed_output(output, args.profile)
+        if args.sharded:
+            write_sharded_output(output, args.profile, args.intervals)
+        if args.encoded:
+            write_encoded_output(output, args.profile)
+        if args.intervals:
+            write_intervals_output(output, args.profile)
         return
 
-    machine_history = {}   # 蓄積中の出力（機種軸）
-    unit_history = {}      # 蓄積中の出力（台番号軸）
-
-    # 直前1日分のスナップショットのみ保持（メモリ効率のため）
-    prev_snapshot = None            # { 機種名: set(台番号) }
-    prev_unit_to_machine = None     # { 台番号: 機種名 }
-    seen_first_day = False
-
-    for (year, month, filepath) in month_files:
-        # 処理中の1か月分だけをメモリに載せる
-        with open(filepath, "r", encoding="utf-8") as f:
-            month_data = json.load(f)
-
-        for date_key in sorted_date_keys(month_data):
-            day_records = month_data[date_key]
-            cur_snapshot = build_snapshot(day_records)
-            cur_unit_to_machine = snapshot_all_units(cur_snapshot)
-
-            if not seen_first_day:
-                # 最初のデータ日: new を立てず、台番号軸に初期状態のみ記録
-                record_unit_axis(None, cur_unit_to_machine, date_key,
-                                 unit_history, is_first_day=True)
-                seen_first_day = True
+    result = None
+    if args.incremental:
+        loaded = load_checkpoint()
+        if loaded is not None:
+            since = loaded[0]["last_date"]
+            result = build_incremental(month_files, *loaded, workers=workers,
+                                       read_ahead=args.read_ahead)
+            if result is None:
+                print("全再生成します")
             else:
-                # 前日（＝直前スナップショット。月境界も同じ変数で接続される）と比較
-                diff_and_emit_events(prev_snapshot, cur_snapshot,
-                                     date_key, machine_history)
-                record_unit_axis(prev_unit_to_machine, cur_unit_to_machine,
-                                 date_key, unit_history, is_first_day=False)
+                print("増分ビルド: {} より後の {}日分を処理".format(since, result[2]))
 
-            # 当日を「次の前日」として保持（月境界の接続もここで担保される）
-            prev_snapshot = cur_snapshot
-            prev_unit_to_machine = cur_unit_to_machine
+    if result is None:
+        state, months = build_full(month_files, workers, args.read_ahead)
+    else:
+        state, months, _ = result
 
-        # 月ファイルの参照を解放（次月ロード前にメモリを空ける）
-        month_data = None
+    if args.incremental and state["last_date"] is not None:
+        save_checkpoint(state, months)
 
     output = {
-        "machine_history": machine_history,
-        "unit_history": unit_history,
+        "machine_history": state["machine_history"],
+        "unit_history": state["unit_history"],
     }
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    write_output(output, args.profile)
+    write_feed_output(output, args.profile)
+    if args.sharded:
+        write_sharded_output(output, args.profile, args.intervals)
+    if args.encoded:
+        write_encoded_output(output, args.profile)
+    if args.intervals:
+        write_intervals_output(output, args.profile)
 
     print("生成完了: {}".format(OUTPUT_PATH))
     print("  機種数: {}, 台番号数: {}".format(
-        len(machine_history), len(unit_history)))
+        len(state["machine_history"]), len(state["unit_history"])))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+unit_history.json から作る派生ファイル（unit_feed.py / unit_intervals.py / unit_history_codec.py）の共通部品
+
+- EVENT_TYPES … machine_history のイベント種別（各形式の "types" の先頭に並べる）
+- 日付キー（"YYYY_MM_DD"）と datetime.date の相互変換、epoch（日数 0 の日）の決め方
+- Dictionary … 機種名・台番号・種別を出現順の ID にする辞書
+標準ライブラリのみを使用。
+"""
+
+import datetime
+
+EVENT_TYPES = ("new", "add", "remove", "move", "withdraw")
+
+
+def parse_date(date_key):
+    return datetime.date(int(date_key[0:4]), int(date_key[5:7]), int(date_key[8:10]))
+
+
+def format_date(date):
+    return "{:04d}_{:02d}_{:02d}".format(date.year, date.month, date.day)
+
+
+def epoch_of(date_keys):
+    """日付キーのうち最も古い日（無ければ 1970-01-01）"""
+    date_keys = list(date_keys)
+    return parse_date(min(date_keys)) if date_keys else datetime.date(1970, 1, 1)
+
+
+class Dictionary:
+    """文字列 ⇔ 出現順の ID"""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def id(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = len(self.names)
+            self.ids[name] = i
+            self.names.append(name)
+        return i
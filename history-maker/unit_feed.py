@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日付順の変化フィード unit_history.feed.json の生成（build_unit_history.py が毎回書き出す）
+
+machine_history のイベント（new / add / remove / move / withdraw）を全機種分
+日付順に1本に並べ、日数ごとの開始位置を持たせたもの。「日付 D 以前の直近 N 件」は
+starts で終わりの位置を引いて切り出すだけで求まる（js/utils.js の getRecentChanges）。
+
+形式（format: "unit-change-feed-v1"）:
+    {
+      "format": "unit-change-feed-v1",
+      "epoch": "2025_01_01",                    … 日数 0 の日
+      "types": ["new", "add", "remove", "move", "withdraw"],
+      "machines": ["機種名", ...],
+      "starts": [0, 0, 3, ...],                 … starts[k] = 日数 k より前のイベント数
+      "events": [ [日数, 機種ID, 種別ID, [増えた台番号...], [減った台番号...]], ... ]
+    }
+
+- events は日付順。同じ日は machine_history の機種の並び・各機種のイベント順。
+- 台番号は前日からの増減（new は全台が増えた側、withdraw は全台が減った側）。
+- starts の長さは最後の日数 + 2（最後の要素がイベントの総数）。
+標準ライブラリのみを使用。
+"""
+
+from unit_common import EVENT_TYPES, Dictionary, epoch_of, format_date, parse_date
+
+FORMAT = "unit-change-feed-v1"
+
+
+def build_feed(output):
+    """unit_history.json の内容から変化フィードを作る"""
+    flat = [(ev, machine) for machine, history in output["machine_history"].items()
+            for ev in history["events"]]
+    # 同じ日の中は machine_history の並びのまま（sorted は安定）
+    flat.sort(key=lambda item: item[0]["date"])
+
+    dates = [entry["date"] for entries in output["unit_history"].values() for entry in entries]
+    dates += [ev["date"] for ev, _ in flat]
+    epoch = epoch_of(dates)
+
+    types = Dictionary(EVENT_TYPES)
+    machines = Dictionary()
+    events = []
+    for ev, machine in flat:
+        type_id = types.id(ev["type"])
+        machine_id = machines.id(machine)
+        units = set(ev["units"])
+        prev_units = set(ev["prev_units"])
+        events.append([
+            (parse_date(ev["date"]) - epoch).days,
+            machine_id,
+            type_id,
+            sorted(units - prev_units),
+            sorted(prev_units - units),
+        ])
+
+    last_day = events[-1][0] if events else -1
+    starts = []
+    i = 0
+    for day in range(last_day + 2):
+        while i < len(events) and events[i][0] < day:
+            i += 1
+        starts.append(i)
+
+    return {
+        "format": FORMAT,
+        "epoch": format_date(epoch),
+        "types": types.names,
+        "machines": machines.names,
+        "starts": starts,
+        "events": events,
+    }
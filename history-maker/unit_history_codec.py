@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+unit_history.json の符号化版 unit_history.enc.json の変換（build_unit_history.py --encoded で使う）
+
+unit_history.json は machine_history のイベントごとに日付文字列と、
+その日の台番号（units）・前日の台番号（prev_units）の全体を持つため、
+台数の多い機種の move 1件で数百の文字列が並ぶ。符号化版では
+
+- 日付は epoch からの日数（各機種・各台番号の中では直前との差分）
+- 機種名・台番号・イベント種別は辞書の添字
+- イベントは前回からの台番号の増減（added / removed）だけ
+- 台番号の集合は連続する ID の区間 [直前の区間の終わりからの差, 個数, ...] で持つ
+  （台番号の辞書は文字列順のため、島単位の入替は数個の区間になる）
+
+を持つ。decode_history で unit_history.json と完全に同じ構造（キーの並びも同じ）に
+戻る。js/data.js の decodeUnitHistory も同じ規則で戻す。
+
+形式（format: "unit-history-enc-v1"）:
+    {
+      "format": "unit-history-enc-v1",
+      "epoch": "2025_01_01",                    … 日数 0 の日
+      "types": ["new", "add", "remove", "move", "withdraw"],
+      "machines": ["機種名", ...],
+      "units": ["1001", ...],                   … 文字列順（ID の順＝台番号の文字列順）
+      "machine_history": [
+        [機種ID, 最初のイベントの前日の台番号（区間）,
+         [[日数の差分, [種別ID, ...], 増えた台番号（区間）, 減った台番号（区間）], ...]],
+        ...
+      ],
+      "unit_history": [ [台番号ID, [日数の差分, 機種ID, 日数の差分, 機種ID, ...]], ... ]
+    }
+
+- machine_history の各グループは「同じ日・同じ units / prev_units」の連続したイベント
+  （同じ日の add と move など）。prev_units は直前のグループの units
+  （最初のグループは2番目の要素）。そうでないグループだけ5番目の要素に
+  [直前の units から増えた ID, 減った ID] を持ち、prev_units を作り直す。
+- units / prev_units は ID 順に並べる（＝台番号の文字列順。unit_history.json と同じ）。
+- encode_history は decode_history で元に戻ることを確かめ、戻らなければ ValueError。
+
+標準ライブラリのみを使用。
+"""
+
+import datetime
+
+from unit_common import EVENT_TYPES, Dictionary, epoch_of, format_date, parse_date
+
+FORMAT = "unit-history-enc-v1"
+
+
+def _to_runs(ids):
+    """ソート済みの ID → 区間 [直前の区間の終わりからの差, 個数, ...]"""
+    runs = []
+    end = 0
+    i = 0
+    while i < len(ids):
+        j = i
+        while j + 1 < len(ids) and ids[j + 1] == ids[j] + 1:
+            j += 1
+        runs += [ids[i] - end, j - i + 1]
+        end = ids[j] + 1
+        i = j + 1
+    return runs
+
+
+def _from_runs(runs):
+    """区間 → ID のリスト（小さい順）"""
+    ids = []
+    end = 0
+    for i in range(0, len(runs), 2):
+        start = end + runs[i]
+        end = start + runs[i + 1]
+        ids.extend(range(start, end))
+    return ids
+
+
+def _all_units(output):
+    names = set(output["unit_history"])
+    for history in output["machine_history"].values():
+        for ev in history["events"]:
+            names.update(ev["units"])
+            names.update(ev["prev_units"])
+    return names
+
+
+def _all_dates(output):
+    for entries in output["unit_history"].values():
+        for entry in entries:
+            yield entry["date"]
+    for history in output["machine_history"].values():
+        for ev in history["events"]:
+            yield ev["date"]
+
+
+def _group_events(events):
+    """同じ日・同じ units / prev_units の連続したイベントをまとめる"""
+    groups = []
+    for ev in events:
+        last = groups[-1] if groups else None
+        if (last is not None and last["date"] == ev["date"]
+                and last["units"] == ev["units"] and last["prev_units"] == ev["prev_units"]):
+            last["types"].append(ev["type"])
+        else:
+            groups.append({"date": ev["date"], "types": [ev["type"]],
+                           "units": ev["units"], "prev_units": ev["prev_units"]})
+    return groups
+
+
+def encode_history(output):
+    """unit_history.json の内容（machine_history / unit_history）を符号化版にする"""
+    epoch = epoch_of(_all_dates(output))
+
+    def ordinal(date_key):
+        return (parse_date(date_key) - epoch).days
+
+    types = Dictionary(EVENT_TYPES)
+    machines = Dictionary()
+    units = Dictionary(sorted(_all_units(output)))
+
+    def unit_ids(names):
+        return _to_runs(sorted(units.ids[name] for name in names))
+
+    machine_history = []
+    for machine, history in output["machine_history"].items():
+        groups = _group_events(history["events"])
+        current = set(groups[0]["prev_units"]) if groups else set()
+        encoded_groups = []
+        last_day = 0
+        for group in groups:
+            day = ordinal(group["date"])
+            prev = set(group["prev_units"])
+            cur = set(group["units"])
+            encoded = [day - last_day, [types.id(t) for t in group["types"]],
+                       unit_ids(cur - prev), unit_ids(prev - cur)]
+            if prev != current:
+                encoded.append([unit_ids(prev - current), unit_ids(current - prev)])
+            encoded_groups.append(encoded)
+            current = cur
+            last_day = day
+        initial = unit_ids(groups[0]["prev_units"]) if groups else []
+        machine_history.append([machines.id(machine), initial, encoded_groups])
+
+    unit_history = []
+    for unit, entries in output["unit_history"].items():
+        flat = []
+        last_day = 0
+        for entry in entries:
+            day = ordinal(entry["date"])
+            flat += [day - last_day, machines.id(entry["machine"])]
+            last_day = day
+        unit_history.append([units.id(unit), flat])
+
+    doc = {
+        "format": FORMAT,
+        "epoch": format_date(epoch),
+        "types": types.names,
+        "machines": machines.names,
+        "units": units.names,
+        "machine_history": machine_history,
+        "unit_history": unit_history,
+    }
+    if decode_history(doc) != output:
+        raise ValueError("符号化版から unit_history を復元できません（イベントの並びが想定外です）")
+    return doc
+
+
+def decode_history(doc):
+    """符号化版を unit_history.json と同じ構造（machine_history / unit_history）に戻す"""
+    if doc.get("format") != FORMAT:
+        raise ValueError("未対応の形式です: {}".format(doc.get("format")))
+    epoch = parse_date(doc["epoch"])
+    types = doc["types"]
+    machines = doc["machines"]
+    units = doc["units"]
+    # 日数 → 日付文字列（同じ日は使い回す）
+    date_cache = {}
+
+    def date_of(day):
+        key = date_cache.get(day)
+        if key is None:
+            key = date_cache[day] = format_date(epoch + datetime.timedelta(days=day))
+        return key
+
+    def names(ids):
+        return [units[u] for u in sorted(ids)]
+
+    machine_history = {}
+    for machine_id, initial, groups in doc["machine_history"]:
+        events = []
+        current = set(_from_runs(initial))
+        day = 0
+        for group in groups:
+            day += group[0]
+            prev = current
+            if len(group) > 4:
+                prev = (current | set(_from_runs(group[4][0]))) - set(_from_runs(group[4][1]))
+            current = (prev | set(_from_runs(group[2]))) - set(_from_runs(group[3]))
+            date_key = date_of(day)
+            cur_names = names(current)
+            prev_names = names(prev)
+            for t in group[1]:
+                events.append({
+                    "date": date_key,
+                    "type": types[t],
+                    "units": list(cur_names),
+                    "prev_units": list(prev_names),
+                })
+        machine_history[machines[machine_id]] = {"events": events}
+
+    unit_history = {}
+    for unit_id, flat in doc["unit_history"]:
+        entries = []
+        day = 0
+        for i in range(0, len(flat), 2):
+            day += flat[i]
+            entries.append({"date": date_of(day), "machine": machines[flat[i + 1]]})
+        unit_history[units[unit_id]] = entries
+
+    return {"machine_history": machine_history, "unit_history": unit_history}
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+台番号ごとの区間インデックス（build_unit_history.py --intervals で使う）
+
+js/utils.js の getUnitStatus / getUnitAge / getMachineAge / getUnitDisplayStatuses は
+「台番号 X の日付 D 時点の状態」を unit_history / machine_history の走査で求める。
+その答えは、台番号の機種が変わった日と、その機種のイベント日でしか変わらないため、
+台番号ごとに区間の開始日で並べた表を前もって作っておけば、二分探索1回で引ける。
+
+形式（format: "unit-intervals-v1"）:
+    {
+      "format": "unit-intervals-v1",
+      "epoch": "2025_01_01",                    … 日数 0 の日
+      "latest_date": "2026_08_18",              … 日付省略時の対象日
+      "types": ["new", "add", "remove", "move", "withdraw"],
+      "machines": ["機種名", ...],
+      "fields": ["start", "machine", "since", "event", "type", "types", "install"],
+      "units": { "881": [区間1の7項目, 区間2の7項目, ...], ... }   … 開始日順に平坦に並べる
+    }
+
+各区間（日数はすべて epoch からの日数）:
+    start    … この区間が始まる日（次の区間の start の前日まで同じ答え）
+    machine  … その時点で有効な機種（machines の添字）
+    since    … 台番号がその機種になった日（getUnitAge の起点）
+    event    … 有効な機種の、since 以降で最も新しいイベント日（無ければ -1）
+    type     … その日の最後のイベントの種別（types の添字。無ければ -1）
+    types    … その日のイベントの種別のビット集合（1 << types の添字）
+    install  … 機種の設置日（getMachineAge の起点）
+
+最初の区間の start より前の日は「該当なし」（ヘルパーは null）。
+各区間の値は utils.js のヘルパーと同じ規則で求める（state_at）。
+標準ライブラリのみを使用。
+"""
+
+from unit_common import EVENT_TYPES, Dictionary, epoch_of, format_date, parse_date
+
+FORMAT = "unit-intervals-v1"
+FIELDS = ("start", "machine", "since", "event", "type", "types", "install")
+
+
+def latest_date(output):
+    """unit_history / machine_history の全エントリで最も新しい日付（無ければ None）"""
+    dates = [entries[-1]["date"] for entries in output["unit_history"].values() if entries]
+    dates += [h["events"][-1]["date"] for h in output["machine_history"].values() if h["events"]]
+    return max(dates) if dates else None
+
+
+def state_at(entries, machine_history, target):
+    """
+    台番号の target（"YYYY_MM_DD"）時点の状態を utils.js のヘルパーと同じ規則で求める。
+    戻り値: (機種名, since, event, type, types, install)。該当なしなら None
+    （event / type は無ければ None、types は種別の集合）
+    """
+    effective = None
+    for entry in entries:
+        if entry["date"] <= target and (effective is None or entry["date"] >= effective["date"]):
+            effective = entry
+    if effective is None:
+        return None
+    machine = effective["machine"]
+    since = effective["date"]
+    events = machine_history.get(machine, {}).get("events") or []
+
+    # getUnitStatus / getUnitDisplayStatuses: since 以降・target 以前で最も新しいイベント
+    latest = None
+    for ev in events:
+        if since <= ev["date"] <= target and (latest is None or ev["date"] >= latest["date"]):
+            latest = ev
+    event = latest["date"] if latest else None
+    ev_type = latest["type"] if latest else None
+    types = frozenset(ev["type"] for ev in events if event is not None and ev["date"] == event)
+
+    # getMachineAge: since 以前で最も新しい new → 無ければ target 以前の最古のイベント → since
+    install = None
+    for ev in events:
+        if ev["type"] == "new" and ev["date"] <= target and ev["date"] <= since:
+            if install is None or ev["date"] >= install:
+                install = ev["date"]
+    if install is None and events:
+        dates = [ev["date"] for ev in events if ev["date"] <= target]
+        install = min(dates) if dates else None
+    if install is None:
+        install = since
+
+    return machine, since, event, ev_type, types, install
+
+
+def build_intervals(output, unit_keys=None):
+    """
+    unit_history.json の内容から区間インデックスを作る。
+    unit_keys を渡すとその台番号だけ（シャード用）。machines はこのインデックス内の辞書
+    """
+    unit_history = output["unit_history"]
+    machine_history = output["machine_history"]
+    if unit_keys is None:
+        unit_keys = list(unit_history)
+
+    dates = [entry["date"] for unit in unit_keys for entry in unit_history[unit]]
+    epoch = epoch_of(dates)
+
+    def ordinal(date_key):
+        return -1 if date_key is None else (parse_date(date_key) - epoch).days
+
+    types = Dictionary(EVENT_TYPES)
+    machines = Dictionary()
+
+    def type_id(ev_type):
+        return -1 if ev_type is None else types.id(ev_type)
+
+    units = {}
+    for unit in unit_keys:
+        entries = unit_history[unit]
+        # 答えが変わりうる日: 機種が変わった日と、その台に付いたことのある機種のイベント日
+        breakpoints = {entry["date"] for entry in entries}
+        for machine in {entry["machine"] for entry in entries}:
+            for ev in machine_history.get(machine, {}).get("events") or []:
+                breakpoints.add(ev["date"])
+
+        flat = []
+        last = None
+        for date_key in sorted(breakpoints):
+            state = state_at(entries, machine_history, date_key)
+            if state is None or state == last:
+                continue
+            machine, since, event, ev_type, ev_types, install = state
+            mask = 0
+            for t in sorted(ev_types, key=type_id):
+                mask |= 1 << type_id(t)
+            flat += [ordinal(date_key), machines.id(machine), ordinal(since), ordinal(event),
+                     type_id(ev_type), mask, ordinal(install)]
+            last = state
+        units[unit] = flat
+
+    return {
+        "format": FORMAT,
+        "epoch": format_date(epoch),
+        "latest_date": latest_date(output),
+        "types": types.names,
+        "machines": machines.names,
+        "fields": list(FIELDS),
+        "units": units,
+    }
@@ -124,6 +124,8 @@ var TREND_COLUMN_CONFIG = {
 };
 
 function parseProbability(probStr) {
+    // 型付きスキーマ・列指向形式の行は x の数値（回数 0 は 0）
+    if (typeof probStr === 'number') return (probStr > 0 && isFinite(probStr)) ? probStr : null;
     if (!probStr || probStr === '-' || probStr === '') return null;
     var match = String(probStr).trim().match(/1\/([\d.]+)/);
     if (match) { var val = parseFloat(match[1]); return (val > 0 && isFinite(val)) ? val : null; }
@@ -526,10 +528,14 @@ function loadTrendData() {
     var positionState = getPositionFilterState('trend');
 
     // === Stage 1: 生データ収集 ===
-    var rawParams = makeCacheKey({ files: targetFiles, machines: selectedMachines, position: positionState, viewMode: trendViewMode });
+    // 累積和インデックスで期間を引けるときは最新日の行だけを読む（集計列が合計できない列に
+    // 変わったら全日の行を読み直す）
+    var prefix = getTrendPrefixContext(targetFiles, config);
+    var indexed = !!(prefix && prefix.contiguous);
+    var rawParams = makeCacheKey({ files: targetFiles, machines: selectedMachines, position: positionState, viewMode: trendViewMode, indexed: indexed });
     
     if (trendCache.rawParams !== rawParams) {
-        trendCache.rawData = collectRawData(targetFiles, selectedMachines, positionState, latestFile);
+        trendCache.rawData = collectRawData(targetFiles, selectedMachines, positionState, latestFile, prefix);
         trendCache.rawParams = rawParams;
         invalidateCache(1);
     }
@@ -559,7 +565,11 @@ function loadTrendData() {
 
     // 機種内バッジ付与（台別モードのみ・レンダリング時に再計算）
     if (trendViewMode === 'unit' && typeof MachineBadge !== 'undefined' && MachineBadge.isEnabled()) {
-        results = MachineBadge.assignBadgesForTrend(results, 'total');
+        // 選択期間が1日なら事前計算の機種内順位（その日の日別シャード）を使う。
+        // 未読み込みならその日の分だけ裏で読む（読み終える前は行から順位付け。結果は同じ）
+        var badgeOpts = targetFiles.length === 1 ? { dateKey: targetFiles[0], column: trendDataColumn } : {};
+        if (badgeOpts.dateKey && typeof loadMachineRanks === 'function') loadMachineRanks(badgeOpts.dateKey);
+        results = MachineBadge.assignBadgesForTrend(results, 'total', badgeOpts);
     }
     
     renderTrendSummary(results, targetFiles, selectedMachines, totalFilterType, totalFilterValue, prevTotalFilterType, prevTotalFilterValue, trendViewMode === 'machine', config);
@@ -577,7 +587,18 @@ function loadTrendData() {
 // Stage 1: 生データ収集
 // ===================
 
-function collectRawData(targetFiles, selectedMachines, positionState, latestFile) {
+function matchesTrendPosition(num, positionState) {
+    if (positionState.selected.length === 0) return true;
+    var tags = getPositionTags(num);
+    return positionState.logic === 'and'
+        ? positionState.selected.every(function(t) { return tags.indexOf(t) !== -1; })
+        : positionState.selected.some(function(t) { return tags.indexOf(t) !== -1; });
+}
+
+function collectRawData(targetFiles, selectedMachines, positionState, latestFile, prefix) {
+    var indexed = collectIndexedRawData(targetFiles, selectedMachines, positionState, latestFile, prefix);
+    if (indexed) return indexed;
+
     var collected = {};
 
     if (trendViewMode === 'unit') {
@@ -587,13 +608,7 @@ function collectRawData(targetFiles, selectedMachines, positionState, latestFile
             data.forEach(function(row) {
                 var machine = row['機種名'], num = row['台番号'];
                 if (selectedMachines.length > 0 && selectedMachines.indexOf(machine) === -1) return;
-                if (positionState.selected.length > 0) {
-                    var tags = getPositionTags(num);
-                    var match = positionState.logic === 'and'
-                        ? positionState.selected.every(function(t) { return tags.indexOf(t) !== -1; })
-                        : positionState.selected.some(function(t) { return tags.indexOf(t) !== -1; });
-                    if (!match) return;
-                }
+                if (!matchesTrendPosition(num, positionState)) return;
                 var key = machine + '_' + num;
                 if (!collected[key]) collected[key] = { machine: machine, num: num, rows: {} };
                 collected[key].rows[file] = row;
@@ -610,13 +625,7 @@ function collectRawData(targetFiles, selectedMachines, positionState, latestFile
             data.forEach(function(row) {
                 var machine = row['機種名'], num = row['台番号'];
                 if (selectedMachines.length > 0 && selectedMachines.indexOf(machine) === -1) return;
-                if (positionState.selected.length > 0) {
-                    var tags = getPositionTags(num);
-                    var match = positionState.logic === 'and'
-                        ? positionState.selected.every(function(t) { return tags.indexOf(t) !== -1; })
-                        : positionState.selected.some(function(t) { return tags.indexOf(t) !== -1; });
-                    if (!match) return;
-                }
+                if (!matchesTrendPosition(num, positionState)) return;
                 if (!collected[machine]) collected[machine] = { machine: machine, fileRows: {} };
                 if (!collected[machine].fileRows[file]) collected[machine].fileRows[file] = [];
                 collected[machine].fileRows[file].push(row);
@@ -631,36 +640,138 @@ function collectRawData(targetFiles, selectedMachines, positionState, latestFile
     return collected;
 }
 
+/**
+ * 期間の全日が累積和インデックスの連続した日番号なら（getTrendPrefixContext の contiguous）、
+ * 最新日の行だけを読んで Stage 1 の結果を作る。ほかの日の有無と値は集計時にインデックスから
+ * 引く（item.indexed）。並びを全日の行を読んだ場合と同じ（最初に現れた順）にするため、
+ * 各台・機種が最初に現れる日の行だけは読む（ふつうは期間の初日だけ）。
+ * 台別で期間内に同じ日に同じ台番号が複数行ある台、インデックスに無い台・機種があれば null
+ * （全日の行を読む）
+ */
+function collectIndexedRawData(targetFiles, selectedMachines, positionState, latestFile, prefix) {
+    if (!prefix || !prefix.contiguous || !dataCache[latestFile]) return null;
+    var machineIds = HallData.store.prefixSums.machineIds;
+    var collected = {};
+    var firstOrds = {}; // 日番号 → その日に最初に現れる台・機種がある
+
+    var complete = dataCache[latestFile].every(function(row) {
+        var machine = row['機種名'], num = row['台番号'];
+        if (selectedMachines.length > 0 && selectedMachines.indexOf(machine) === -1) return true;
+        if (!matchesTrendPosition(num, positionState)) return true;
+
+        if (trendViewMode === 'unit') {
+            var series = getPrefixSeries('unit', num);
+            if (!series || machineIds[machine] === undefined || series.machine[prefix.hi] !== machineIds[machine]) return false;
+            for (var ord = prefix.lo; ord < prefix.hi; ord++) {
+                if (series.machine[ord] === -1) return false;
+            }
+            var first = prefix.lo;
+            while (series.machine[first] !== machineIds[machine]) first++;
+            firstOrds[first] = true;
+            var rows = {};
+            rows[latestFile] = row;
+            collected[machine + '_' + num] = { machine: machine, num: num, rows: rows, indexed: true };
+        } else {
+            var machineSeries = getPrefixSeries('machine', machine);
+            if (!machineSeries) return false;
+            if (!collected[machine]) {
+                var firstDay = prefix.lo;
+                while (machineSeries.count[firstDay + 1] === machineSeries.count[firstDay]) firstDay++;
+                firstOrds[firstDay] = true;
+                var fileRows = {};
+                fileRows[latestFile] = [];
+                collected[machine] = { machine: machine, fileRows: fileRows, indexed: true };
+            }
+            collected[machine].fileRows[latestFile].push(row);
+        }
+        return true;
+    });
+    if (!complete) return null;
+
+    var ordered = {};
+    for (var i = 0; i < targetFiles.length; i++) {
+        if (!firstOrds[prefix.ords[i]]) continue;
+        var data = dataCache[targetFiles[i]];
+        if (!data) return null;
+        data.forEach(function(row) {
+            var key = trendViewMode === 'unit' ? row['機種名'] + '_' + row['台番号'] : row['機種名'];
+            if (collected[key] && !ordered[key]) ordered[key] = collected[key];
+        });
+    }
+    return Object.keys(ordered).length === Object.keys(collected).length ? ordered : null;
+}
+
 // ===================
 // Stage 2: 集計
 // ===================
 
 function aggregateData(rawData, targetFiles, latestFile, config) {
+    var prefix = getTrendPrefixContext(targetFiles, config);
     if (trendViewMode === 'unit') {
-        return aggregateUnitData(rawData, targetFiles, latestFile, config);
+        return aggregateUnitData(rawData, targetFiles, latestFile, config, prefix);
     } else {
-        return aggregateMachineData(rawData, targetFiles, latestFile, config);
+        return aggregateMachineData(rawData, targetFiles, latestFile, config, prefix);
     }
 }
 
-function aggregateUnitData(rawData, targetFiles, latestFile, config) {
+/**
+ * 累積和インデックス（prefix_sums.json）で集計できるときの日番号。使えなければ null。
+ * 合計できる列で、インデックスが読み込み済みのときだけ使う。機種別は位置フィルターで
+ * 一部の台だけになるため使わない。ords はインデックスに無い日（仮想日など）が -1、
+ * contiguous は全日がインデックスの連続した日番号のとき true（期間の合計を2回の参照で求める）
+ */
+function getTrendPrefixContext(targetFiles, config) {
+    var ps = HallData.store.prefixSums;
+    if (!ps || !config.canSum || ps.columns[trendDataColumn] === undefined) return null;
+    if (trendViewMode === 'machine' && getPositionFilterState('trend').selected.length > 0) return null;
+
+    var ords = targetFiles.map(function(file) {
+        var ord = ps.ordinals[normalizeDateKey(file)];
+        return ord === undefined ? -1 : ord;
+    });
+    var contiguous = ords.every(function(ord, i) { return ord >= 0 && (i === 0 || ord === ords[i - 1] + 1); });
+    return { ords: ords, contiguous: contiguous, lo: ords[0], hi: ords[ords.length - 1], column: trendDataColumn };
+}
+
+function aggregateUnitData(rawData, targetFiles, latestFile, config, prefix) {
     var results = [];
+    var machineIds = prefix ? HallData.store.prefixSums.machineIds : null;
     
     Object.values(rawData).forEach(function(item) {
         var entry = { machine: item.machine, num: item.num, dates: {} };
         var validValues = [];
+        // その日の台番号の機種が一致する日は、行を読まずにインデックスの差分で値を出す
+        var series = prefix ? getPrefixSeries('unit', item.num) : null;
+        var cum = series ? getPrefixCumulative(series, prefix.column) : null;
+        var machineId = machineIds && machineIds[item.machine];
+        var fromIndex = 0;
 
-        targetFiles.forEach(function(file) {
+        targetFiles.forEach(function(file, i) {
             var row = item.rows[file];
-            if (row) {
-                var val = config.parseRow(row);
-                entry.dates[file] = val;
-                if (val !== null) validValues.push(val);
+            var ord = cum ? prefix.ords[i] : -1;
+            var fromSeries = ord >= 0 && series.machine[ord] === machineId;
+            // 最新日の行だけを集めた台（item.indexed）は、インデックスにこの機種で載っている日がデータのある日
+            if (!row && !(item.indexed && fromSeries)) return;
+            var val;
+            if (fromSeries) {
+                val = cum[ord + 1] - cum[ord];
+                fromIndex++;
+            } else {
+                val = config.parseRow(row);
             }
+            entry.dates[file] = val;
+            if (val !== null) validValues.push(val);
         });
 
+        // 期間内のデータのある日がすべてこの機種なら、合計は累積和の2回の参照
+        var rangeTotal = null;
+        if (cum && prefix.contiguous && fromIndex === validValues.length
+                && series.count[prefix.hi + 1] - series.count[prefix.lo] === fromIndex) {
+            rangeTotal = cum[prefix.hi + 1] - cum[prefix.lo];
+        }
+
         if (config.canSum) {
-            entry.total = validValues.reduce(function(a, b) { return a + b; }, 0);
+            entry.total = rangeTotal !== null ? rangeTotal : validValues.reduce(function(a, b) { return a + b; }, 0);
             entry.avg = validValues.length > 0 ? Math.round(entry.total / validValues.length) : 0;
         } else {
             entry.avg = validValues.length > 0 ? validValues.reduce(function(a, b) { return a + b; }, 0) / validValues.length : null;
@@ -683,24 +794,39 @@ function aggregateUnitData(rawData, targetFiles, latestFile, config) {
     return results;
 }
 
-function aggregateMachineData(rawData, targetFiles, latestFile, config) {
+function aggregateMachineData(rawData, targetFiles, latestFile, config, prefix) {
     var results = [];
     var useAvg = trendMachineAggType === 'avg' || !config.canSum;
 
     Object.values(rawData).forEach(function(item) {
         var entry = { machine: item.machine, dates: {} };
         var totalUnits = 0;
+        // 台数がインデックスと一致する日は、行を読まずにインデックスの差分で合計を出す
+        var series = prefix ? getPrefixSeries('machine', item.machine) : null;
+        var cum = series ? getPrefixCumulative(series, prefix.column) : null;
+        var fromIndex = 0;
+        var daysWithRows = 0;
 
-        targetFiles.forEach(function(file) {
+        targetFiles.forEach(function(file, i) {
             var rows = item.fileRows[file] || [];
-            var unitCount = rows.length;
+            // 最新日の行だけを集めた機種（item.indexed）は、台数もインデックスから引く
+            var unitCount = item.indexed
+                ? series.count[prefix.ords[i] + 1] - series.count[prefix.ords[i]]
+                : rows.length;
             totalUnits += unitCount;
 
             if (unitCount === 0) { entry.dates[file] = null; return; }
+            daysWithRows++;
 
             if (config.canSum) {
                 var sum = 0;
-                rows.forEach(function(r) { sum += config.parseRow(r) || 0; });
+                var ord = cum ? prefix.ords[i] : -1;
+                if (ord >= 0 && series.count[ord + 1] - series.count[ord] === unitCount) {
+                    sum = cum[ord + 1] - cum[ord];
+                    fromIndex++;
+                } else {
+                    rows.forEach(function(r) { sum += config.parseRow(r) || 0; });
+                }
                 entry.dates[file] = useAvg ? Math.round(sum / unitCount) : sum;
             } else {
                 var vals = [];
@@ -715,7 +841,11 @@ function aggregateMachineData(rawData, targetFiles, latestFile, config) {
         targetFiles.forEach(function(f) { if (entry.dates[f] !== null && entry.dates[f] !== undefined) allValidValues.push(entry.dates[f]); });
 
         if (config.canSum && !useAvg) {
-            entry.total = allValidValues.reduce(function(a, b) { return a + b; }, 0);
+            // 期間内の全日をインデックスから出せたなら、合計は累積和の2回の参照
+            entry.total = (cum && prefix.contiguous && fromIndex === daysWithRows
+                    && series.count[prefix.hi + 1] - series.count[prefix.lo] === totalUnits)
+                ? cum[prefix.hi + 1] - cum[prefix.lo]
+                : allValidValues.reduce(function(a, b) { return a + b; }, 0);
             entry.avg = totalUnits > 0 ? Math.round(entry.total / totalUnits) : 0;
         } else {
             entry.avg = allValidValues.length > 0 ? allValidValues.reduce(function(a, b) { return a + b; }, 0) / allValidValues.length : null;
@@ -1542,14 +1672,17 @@ function setupAnalysisSubtabs() {
             btn.classList.add('active');
             var agg = document.getElementById('analysisTabAggregate');
             var kubi = document.getElementById('analysisTabKubi');
+            var digit = document.getElementById('analysisTabDigit');
             if (agg) agg.classList.toggle('active', target === 'aggregate');
             if (kubi) kubi.classList.toggle('active', target === 'kubi');
+            if (digit) digit.classList.toggle('active', target === 'digit');
             if (target === 'kubi') {
                 initKubiMachineFilter();
                 updateKubiPeriodLabel();
                 updateKubiBadgeSummaryLabel();
                 loadKubiData();
             }
+            if (target === 'digit') loadDigitData();
         });
     });
 }
@@ -1949,7 +2082,7 @@ function setupScatterEventListeners(){
             // パネル表示は setupAnalysisSubtabs 側で行われないため、ここで担保
             document.querySelectorAll('.analysis-subtab').forEach(function(b){b.classList.remove('active');});
             btn.classList.add('active');
-            ['analysisTabAggregate','analysisTabKubi','analysisTabScatter'].forEach(function(id){
+            ['analysisTabAggregate','analysisTabKubi','analysisTabDigit','analysisTabScatter'].forEach(function(id){
                 var p=document.getElementById(id); if(p) p.classList.toggle('active', id==='analysisTabScatter');
             });
             initScatterMachineFilter();
@@ -2048,3 +2181,240 @@ function initScatterRankButtons(){
         box.appendChild(b);
     });
 }
+
+// ===================
+// 末尾集計タブ
+// ===================
+//
+// 台番号末尾（0〜9）・ゾロ目ごとの期間集計。末尾別集計 digit_stats.json（data.js の loadDigitStats）が
+// あれば日ごとの合計を足すだけで求め、載っていない日は読み込み済みの行から同じ値を出す。
+// 「イベント日のみ」では events.json の日に絞り、クラス内の機種ごとの内訳も出す。
+
+var digitEventOnly = false;
+var digitSelectedClass = null;
+
+function isDigitTabActive() {
+    var el = document.getElementById('analysisTabDigit');
+    return !!(el && el.classList.contains('active'));
+}
+
+function getDigitClassLabel(cls) {
+    return cls === 'zorome' ? 'ゾロ目' : '末尾' + cls;
+}
+
+function isDigitEventFile(file) {
+    if (!eventData) return false;
+    var dateKey = normalizeDateKey(file);
+    return (eventData.events || []).some(function(e) { return e.date === dateKey; });
+}
+
+// 期間（未選択なら直近7日。イベント日のみなら全期間のイベント日）
+function getDigitTargetFiles() {
+    var files;
+    if (selectedTrendDates && selectedTrendDates.length > 0) {
+        files = selectedTrendDates;
+    } else if (digitEventOnly) {
+        files = CSV_FILES;
+    } else {
+        files = sortFilesByDate(CSV_FILES, true).slice(0, 7);
+    }
+    files = files.filter(function(file) {
+        if (typeof isVirtualFile === 'function' && isVirtualFile(file)) return false;
+        return !digitEventOnly || isDigitEventFile(file);
+    });
+    return sortFilesByDate(files, false);
+}
+
+function emptyDigitTotals() {
+    return [0, 0, 0, 0, 0, 0];
+}
+
+function addDigitTotals(target, values) {
+    for (var i = 0; i < target.length; i++) target[i] += values[i];
+}
+
+/**
+ * 期間のクラスごとの合計と（イベント日のみなら）クラス内の機種ごとの合計を集める。
+ * 集計済みの日は digit_stats.json、無い日は dataCache の行から。どちらも無い日は missing
+ */
+function collectDigitStats(files) {
+    var totals = {};
+    DIGIT_CLASSES.forEach(function(cls) { totals[cls] = emptyDigitTotals(); });
+    var machines = digitEventOnly ? {} : null;
+    var used = [];
+    var missing = [];
+
+    files.forEach(function(file) {
+        var dayTotals = HallData.utils.getDigitTotals(file);
+        var dayMachines = machines ? HallData.utils.getDigitEventMachines(file) : null;
+
+        if (!dayTotals || (machines && !dayMachines)) {
+            var rows = dataCache[file];
+            if (!rows) {
+                missing.push(file);
+                return;
+            }
+            dayTotals = {};
+            DIGIT_CLASSES.forEach(function(cls) { dayTotals[cls] = emptyDigitTotals(); });
+            dayMachines = machines ? {} : null;
+            rows.forEach(function(row) {
+                getUnitDigitClasses(row['台番号']).forEach(function(cls) {
+                    addDigitRowTotals(dayTotals[cls], row);
+                    if (!dayMachines) return;
+                    var byMachine = dayMachines[cls] || (dayMachines[cls] = {});
+                    var machine = row['機種名'] || '';
+                    addDigitRowTotals(byMachine[machine] || (byMachine[machine] = emptyDigitTotals()), row);
+                });
+            });
+        }
+
+        used.push(file);
+        DIGIT_CLASSES.forEach(function(cls) { addDigitTotals(totals[cls], dayTotals[cls]); });
+        if (!dayMachines) return;
+        Object.keys(dayMachines).forEach(function(cls) {
+            var target = machines[cls] || (machines[cls] = {});
+            Object.keys(dayMachines[cls]).forEach(function(machine) {
+                addDigitTotals(target[machine] || (target[machine] = emptyDigitTotals()), dayMachines[cls][machine]);
+            });
+        });
+    });
+
+    return { totals: totals, machines: machines, used: used, missing: missing };
+}
+
+function formatDigitRate(rate) {
+    return rate ? '1/' + rate.toFixed(1) : '-';
+}
+
+function formatDigitSigned(value) {
+    return (value >= 0 ? '+' : '') + value.toLocaleString();
+}
+
+function renderDigitStatsCells(st) {
+    var hasData = st.count > 0;
+    var saClass = st.totalSa > 0 ? 'plus' : st.totalSa < 0 ? 'minus' : 'zero';
+    var avgSaClass = st.avgSa > 0 ? 'plus' : st.avgSa < 0 ? 'minus' : 'zero';
+    return '<td style="text-align:center;">' + st.count.toLocaleString() + '</td>' +
+        '<td class="' + saClass + '">' + (hasData ? formatDigitSigned(st.totalSa) : '-') + '</td>' +
+        '<td class="' + avgSaClass + '">' + (hasData ? formatDigitSigned(st.avgSa) : '-') + '</td>' +
+        '<td>' + (hasData ? st.avgGames.toLocaleString() : '-') + '</td>' +
+        '<td class="' + getMechanicalRateClass(st.mechRate) + '">' + formatMechanicalRate(st.mechRate) + '</td>' +
+        '<td>' + (hasData ? st.winRate.toFixed(1) + '%' : '-') + '</td>' +
+        '<td>' + formatDigitRate(st.bbRate) + '</td>' +
+        '<td>' + formatDigitRate(st.rbRate) + '</td>';
+}
+
+var DIGIT_STATS_HEADER = '<th>延べ台数</th><th>合計差枚</th><th>平均差枚</th><th>平均G数</th>' +
+    '<th>機械割</th><th>勝率</th><th>BB確率</th><th>RB確率</th>';
+
+function renderDigitTable(result) {
+    var table = document.getElementById('digit-stats-table');
+    if (!table) return;
+
+    var grand = emptyDigitTotals();
+    var rows = '';
+    DIGIT_CLASSES.forEach(function(cls) {
+        var st = HallData.utils.summarizeDigitTotals(result.totals[cls]);
+        if (cls !== 'zorome') addDigitTotals(grand, result.totals[cls]);
+        var classes = [];
+        if (st.count === 0) classes.push('no-data');
+        if (result.machines) classes.push('digit-row-selectable');
+        if (cls === digitSelectedClass) classes.push('selected');
+        rows += '<tr data-digit-class="' + cls + '"' + (classes.length ? ' class="' + classes.join(' ') + '"' : '') + '>';
+        rows += '<td style="text-align:center; font-weight:bold;">' + getDigitClassLabel(cls) + '</td>';
+        rows += renderDigitStatsCells(st) + '</tr>';
+    });
+    // ゾロ目は末尾と重複するため合計に含めない
+    rows += '<tr style="font-weight:bold; border-top: 2px solid var(--border-light);">';
+    rows += '<td style="text-align:center;">合計</td>' + renderDigitStatsCells(HallData.utils.summarizeDigitTotals(grand)) + '</tr>';
+
+    table.querySelector('thead').innerHTML = '<tr><th>末尾</th>' + DIGIT_STATS_HEADER + '</tr>';
+    table.querySelector('tbody').innerHTML = rows;
+
+    if (!result.machines) return;
+    table.querySelectorAll('tbody tr[data-digit-class]').forEach(function(tr) {
+        tr.addEventListener('click', function() {
+            digitSelectedClass = tr.dataset.digitClass === digitSelectedClass ? null : tr.dataset.digitClass;
+            renderDigitTable(result);
+            renderDigitMachineTable(result);
+        });
+    });
+}
+
+function renderDigitMachineTable(result) {
+    var card = document.getElementById('digitMachineCard');
+    var container = document.getElementById('digitMachineTable');
+    if (!card || !container) return;
+
+    var byMachine = result.machines && digitSelectedClass ? result.machines[digitSelectedClass] : null;
+    if (!byMachine) {
+        card.style.display = 'none';
+        return;
+    }
+
+    var entries = Object.keys(byMachine).map(function(machine) {
+        return { machine: machine, stats: HallData.utils.summarizeDigitTotals(byMachine[machine]) };
+    }).sort(function(a, b) { return b.stats.avgSa - a.stats.avgSa; });
+
+    var html = '<table><thead><tr><th class="l">機種</th>' + DIGIT_STATS_HEADER + '</tr></thead><tbody>';
+    entries.forEach(function(entry) {
+        html += '<tr><td class="l">' + escapeHtml(entry.machine) + '</td>' + renderDigitStatsCells(entry.stats) + '</tr>';
+    });
+    html += '</tbody></table>';
+
+    document.getElementById('digitMachineTitle').textContent =
+        getDigitClassLabel(digitSelectedClass) + ' の機種別（イベント日 ' + result.used.length + '日）';
+    container.innerHTML = html;
+    card.style.display = '';
+}
+
+function updateDigitPeriodLabel(files) {
+    var label = document.getElementById('digitPeriodLabel');
+    if (!label) return;
+    var prefix = digitEventOnly ? 'イベント日 ' : '';
+    if (files.length === 0) {
+        label.textContent = prefix + '0日';
+    } else if (files.length === 1) {
+        label.textContent = prefix + formatDate(files[0]);
+    } else {
+        label.textContent = prefix + files.length + '日間 (' + formatDateShort(files[0]) + '〜' +
+            formatDateShort(files[files.length - 1]) + ')';
+    }
+}
+
+async function loadDigitData() {
+    var summary = document.getElementById('digitSummary');
+    if (!summary) return;
+
+    await Promise.all([loadDigitStats(), loadEventData()]);
+
+    var files = getDigitTargetFiles();
+    updateDigitPeriodLabel(files);
+    var result = collectDigitStats(files);
+    if (result.machines && digitSelectedClass && !result.machines[digitSelectedClass]) digitSelectedClass = null;
+
+    var text = result.used.length + '日分を集計';
+    if (result.missing.length > 0) text += '（未読み込みの ' + result.missing.length + '日は除外）';
+    if (digitEventOnly && files.length === 0) text = '期間内にイベント日がありません';
+    else if (digitEventOnly) text += '。行をタップすると機種別の内訳を表示';
+    summary.textContent = text;
+
+    renderDigitTable(result);
+    renderDigitMachineTable(result);
+}
+
+function setupDigitEventListeners() {
+    var openBtn = document.getElementById('openDigitCalendar');
+    if (openBtn) openBtn.addEventListener('click', openTrendCalendarModal);
+
+    var eventOnly = document.getElementById('digitEventOnly');
+    if (eventOnly) eventOnly.addEventListener('change', function() {
+        digitEventOnly = this.checked;
+        loadDigitData();
+    });
+
+    var applyBtn = document.getElementById('applyTrendDates');
+    if (applyBtn) applyBtn.addEventListener('click', function() {
+        if (isDigitTabActive()) setTimeout(loadDigitData, 0);
+    });
+}
@@ -12,8 +12,14 @@ let calendarEventFilter = null;
  * カレンダーの日付クリックで日別データタブに遷移
  * @param {string} dateKey - 日付キー（YYYY_MM_DD形式）
  */
-function navigateToDailyData(dateKey) {
+async function navigateToDailyData(dateKey) {
     const filename = `data/${dateKey}.csv`;
+
+    // 日別統計で表示している未読み込みの月は、その日のシャードだけ先に読む
+    if (!CSV_FILES.includes(filename) && dataManifest && dataManifest.days && dataManifest.days[dateKey]) {
+        await loadDayShard(dateKey);
+    }
+
     const sortedFiles = sortFilesByDate(CSV_FILES, true);
     const fileIndex = sortedFiles.indexOf(filename);
 
@@ -457,7 +463,8 @@ async function renderCalendar() {
     const startDayOfWeek = firstDay.getDay();
     const daysInMonth = lastDay.getDate();
 
-    const dateStats = {};
+    await loadDailyStats();
+    const dateStats = await getCalendarDateStats(year, month);
     
     let monthTotalSa = 0;
     let firstHalfSa = 0;
@@ -467,35 +474,17 @@ async function renderCalendar() {
     let monthPlusCount = 0;
     let daysWithData = 0;
     
-    for (const file of CSV_FILES) {
-        const parsed = parseDateFromFilename(file);
-        if (parsed && parsed.year === year && parsed.month === month) {
-            const data = await loadCSV(file);
-            if (data) {
-                const totalGames = data.reduce((sum, r) => sum + (parseInt(String(r['G数']).replace(/,/g, '')) || 0), 0);
-                const totalSa = data.reduce((sum, r) => sum + (parseInt(String(r['差枚']).replace(/,/g, '')) || 0), 0);
-                const plusCount = data.filter(r => (parseInt(String(r['差枚']).replace(/,/g, '')) || 0) > 0).length;
-
-                dateStats[parsed.day] = {
-                    count: data.length,
-                    avgSa: Math.round(totalSa / data.length),
-                    avgGame: Math.round(totalGames / data.length),
-                    winRate: ((plusCount / data.length) * 100).toFixed(1),
-                    totalSa: totalSa
-                };
-                
-                monthTotalSa += totalSa;
-                monthTotalGames += totalGames;
-                monthTotalCount += data.length;
-                monthPlusCount += plusCount;
-                daysWithData++;
-                
-                if (parsed.day <= 15) {
-                    firstHalfSa += totalSa;
-                } else {
-                    secondHalfSa += totalSa;
-                }
-            }
+    for (const [day, stats] of Object.entries(dateStats)) {
+        monthTotalSa += stats.totalSa;
+        monthTotalGames += stats.totalGames;
+        monthTotalCount += stats.count;
+        monthPlusCount += stats.plusCount;
+        daysWithData++;
+        
+        if (Number(day) <= 15) {
+            firstHalfSa += stats.totalSa;
+        } else {
+            secondHalfSa += stats.totalSa;
         }
     }
     
@@ -524,7 +513,7 @@ async function renderCalendar() {
         if (!matchesFilter) dayClass += ' filtered-out';
 
         const clickHandler = stats ? `onclick="navigateToDailyData('${dateKey}')"` : '';
-        const titleAttr = stats ? `title="クリックで日別データを表示"` : '';
+        const titleAttr = stats ? `title="${calendarDayTitle(stats)}"` : '';
 
         html += `<div class="${dayClass}" ${clickHandler} ${titleAttr}>`;
         html += `<div class="day-number">${day}</div>`;
@@ -594,6 +583,77 @@ async function renderCalendar() {
     renderCalendarTrendChart(year, month);
 }
 
+/**
+ * 1日分の統計。日別統計（daily_stats.json）があればそれを、無ければ読み込み済みの行から集計する
+ * @param {string} dateKey - 日付キー（YYYY_MM_DD形式）
+ * @returns {Promise<Object|null>} {count, avgSa, avgGame, winRate, totalSa, totalGames, plusCount, top, bottom}
+ */
+async function getCalendarDayStats(dateKey) {
+    const precomputed = HallData.store.dailyStats && HallData.store.dailyStats[dateKey];
+    if (precomputed) {
+        return {
+            count: precomputed.count,
+            avgSa: precomputed.avg_sa,
+            avgGame: precomputed.avg_games,
+            winRate: ((precomputed.plus / precomputed.count) * 100).toFixed(1),
+            totalSa: precomputed.sa,
+            totalGames: precomputed.games,
+            plusCount: precomputed.plus,
+            top: precomputed.top,
+            bottom: precomputed.bottom
+        };
+    }
+
+    const filename = `data/${dateKey}.csv`;
+    if (!CSV_FILES.includes(filename)) return null;
+    const data = await loadCSV(filename);
+    if (!data) return null;
+
+    const totalGames = data.reduce((sum, r) => sum + (parseInt(String(r['G数']).replace(/,/g, '')) || 0), 0);
+    const totalSa = data.reduce((sum, r) => sum + (parseInt(String(r['差枚']).replace(/,/g, '')) || 0), 0);
+    const plusCount = data.filter(r => (parseInt(String(r['差枚']).replace(/,/g, '')) || 0) > 0).length;
+
+    return {
+        count: data.length,
+        avgSa: Math.round(totalSa / data.length),
+        avgGame: Math.round(totalGames / data.length),
+        winRate: ((plusCount / data.length) * 100).toFixed(1),
+        totalSa: totalSa,
+        totalGames: totalGames,
+        plusCount: plusCount,
+        top: null,
+        bottom: null
+    };
+}
+
+/**
+ * 指定した年月の日別統計 { day: 統計 }（データのある日だけ）
+ * @param {number} year
+ * @param {number} month
+ */
+async function getCalendarDateStats(year, month) {
+    const dateStats = {};
+    const daysInMonth = new Date(year, month, 0).getDate();
+    for (let day = 1; day <= daysInMonth; day++) {
+        const dateKey = `${year}_${String(month).padStart(2, '0')}_${String(day).padStart(2, '0')}`;
+        const stats = await getCalendarDayStats(dateKey);
+        if (stats) dateStats[day] = stats;
+    }
+    return dateStats;
+}
+
+/**
+ * カレンダーの日のツールチップ（日別統計があれば差枚合計が最大・最小の機種も出す）
+ */
+function calendarDayTitle(stats) {
+    const escape = text => String(text).replace(/&/g, '&amp;').replace(/"/g, '&quot;').replace(/</g, '&lt;');
+    const formatSa = sa => `${sa >= 0 ? '+' : ''}${sa.toLocaleString()}`;
+    let title = 'クリックで日別データを表示';
+    if (stats.top) title += `&#10;最大: ${escape(stats.top.machine)} (${formatSa(stats.top.sa)})`;
+    if (stats.bottom) title += `&#10;最小: ${escape(stats.bottom.machine)} (${formatSa(stats.bottom.sa)})`;
+    return title;
+}
+
 // ===================
 // スマホ用リスト表示
 // ===================
@@ -602,7 +662,7 @@ async function renderCalendar() {
  * カレンダーのリスト表示を描画（スマホ幅で表示。CSSで出し分け）
  * @param {number} year
  * @param {number} month
- * @param {Object} dateStats - renderCalendar で算出済みの日別統計 { day: {count, avgSa, avgGame, winRate, totalSa} }
+ * @param {Object} dateStats - getCalendarDateStats の日別統計 { day: {count, avgSa, avgGame, winRate, totalSa, ...} }
  */
 function renderCalendarList(year, month, dateStats) {
     const listContainer = document.getElementById('calendarList');
@@ -800,6 +860,13 @@ async function getMonthlyDailyCumulative(year, month) {
 
     for (let day = 1; day <= daysInMonth; day++) {
         const dateKey = `${year}_${String(month).padStart(2, '0')}_${String(day).padStart(2, '0')}`;
+        const precomputed = HallData.store.dailyStats && HallData.store.dailyStats[dateKey];
+        if (precomputed) {
+            cumulative += precomputed.sa;
+            result.push({ day, cumulative });
+            continue;
+        }
+
         const filename = `data/${dateKey}.csv`;
         const data = await loadCSV(filename);
 
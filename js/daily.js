@@ -678,6 +678,17 @@ function recalcBadgeCache(fileOverride) {
         }
     });
     dailyBadgeCache[targetFile] = cache;
+
+    // 1日分の窓でその日の機種内順位が未読み込みなら、その日の分だけ読んで描き直す
+    // （順位は行から付けた今と同じ。機種内の分位点がツールチップに加わる）
+    var rankDateKey = MachineBadge.getLastWindowInfo().rankDateKey;
+    if (rankDateKey && typeof loadMachineRanks === 'function' && !hasMachineRanks(rankDateKey)) {
+        loadMachineRanks(rankDateKey).then(function(ranks) {
+            if (!ranks || dailyBadgeCache[targetFile] !== cache) return;
+            delete dailyBadgeCache[targetFile];
+            if (dailyCurrentFile === targetFile) filterAndRender();
+        });
+    }
     return targetFile;
 }
 
@@ -1225,6 +1236,12 @@ async function filterAndRender() {
 
     dailyCurrentFilteredData = data;
 
+    // 状態・設置日数の列には unit_history が要る（シャード版なら表示する台の分だけ読む）
+    if (typeof ensureUnitHistoryFor === 'function'
+        && (visibleColumns.indexOf('状態') !== -1 || visibleColumns.indexOf('設置日数') !== -1)) {
+        await ensureUnitHistoryFor(data.map(function(row) { return row['台番号']; }));
+    }
+
     renderTableWithColumns(data, 'data-table', 'summary', visibleColumns);
     await updateDateNavWithEvents();
     updateDailyTagCountDisplay(data);
@@ -1233,6 +1250,9 @@ async function filterAndRender() {
     renderSuffixStatsTable(isVirtual ? [] : data);
 
     // ★追記: 撤去台一覧（表示中の日付以前の撤去を新しい順に）
+    if (typeof ensureUnitHistoryFeed === 'function') {
+        await ensureUnitHistoryFeed();
+    }
     renderWithdrawnTable(dailyCurrentMemoDateKey);
 
     updateNumFilterPreview();
@@ -1535,6 +1555,8 @@ function renderDailyCell(row, h, memoForDate, fixed) {
         return '<td' + (fx ? ' class="' + fixed + '"' : '') + '>' + gVal.toLocaleString() + '</td>';
     }
 
+    if (PROBABILITY_COLUMNS.indexOf(h) !== -1) val = formatProbability(val);
+
     var strVal = (val === null || val === undefined) ? '' : val;
     if (strVal === '') return '<td' + (fx ? ' class="' + fixed + '"' : '') + '>-</td>';
     if (/^-?\d+$/.test(strVal)) return '<td' + (fx ? ' class="' + fixed + '"' : '') + '>' + parseInt(strVal).toLocaleString() + '</td>';
@@ -2216,8 +2238,10 @@ function renderSuffixStatsTable(data) {
 var WITHDRAWN_MAX_ROWS = 50; // 表示上限（新しい順）
 
 /**
- * unit_history.json の machine_history から withdraw イベントを新しい順に集め、
- * テーブル下部に「最近撤去された台」を描画する。
+ * withdraw イベントを新しい順に集め、テーブル下部に「最近撤去された台」を描画する。
+ * 変化フィード（unit_history.feed.json）があれば getRecentChanges で直近分だけを切り出し、
+ * 無ければ unit_history.json の machine_history を全機種走査する
+ * （シャード版は machine_history が一部しか無いため、フィード未読なら出さない）。
  * targetDate を渡すと、その日以前の撤去のみ対象にする（省略時は全期間）。
  */
 function renderWithdrawnTable(targetDate) {
@@ -2236,22 +2260,38 @@ function renderWithdrawnTable(targetDate) {
 
     var base = (typeof normalizeDateKey === 'function') ? normalizeDateKey(targetDate || '') : (targetDate || '');
 
-    var rows = [];
-    var mh = uh.machine_history;
-    for (var machine in mh) {
-        if (!Object.prototype.hasOwnProperty.call(mh, machine)) continue;
-        var evs = mh[machine].events || [];
-        evs.forEach(function(ev) {
-            if (ev.type !== 'withdraw') return;
-            if (base && ev.date > base) return; // 表示日以前の撤去のみ
-            // prev_units（撤去直前に存在した台番号）を台ごとに展開
-            var units = (ev.prev_units && ev.prev_units.length) ? ev.prev_units : [''];
-            units.forEach(function(u) {
-                rows.push({ date: ev.date, machine: machine, unit: u });
+    // 1件の撤去は1台以上の行になるため、直近 WITHDRAWN_MAX_ROWS 件（境目の日は丸ごと）で足りる
+    var recent = HallData.utils.getRecentChanges(base, WITHDRAWN_MAX_ROWS, 'withdraw');
+    var withdrawals = recent && recent.map(function(ch) {
+        return { date: ch.date, machine: ch.machine, prev_units: ch.removed };
+    });
+    if (!withdrawals) {
+        if (uh.latest_date !== undefined) {
+            // シャード版で変化フィードが未読
+            if (block) block.style.display = 'none';
+            return;
+        }
+        withdrawals = [];
+        var mh = uh.machine_history;
+        for (var machine in mh) {
+            if (!Object.prototype.hasOwnProperty.call(mh, machine)) continue;
+            (mh[machine].events || []).forEach(function(ev) {
+                if (ev.type !== 'withdraw') return;
+                withdrawals.push({ date: ev.date, machine: machine, prev_units: ev.prev_units });
             });
-        });
+        }
     }
 
+    var rows = [];
+    withdrawals.forEach(function(ev) {
+        if (base && ev.date > base) return; // 表示日以前の撤去のみ
+        // prev_units（撤去直前に存在した台番号）を台ごとに展開
+        var units = (ev.prev_units && ev.prev_units.length) ? ev.prev_units : [''];
+        units.forEach(function(u) {
+            rows.push({ date: ev.date, machine: ev.machine, unit: u });
+        });
+    });
+
     if (rows.length === 0) {
         if (block) block.style.display = 'none';
         return;
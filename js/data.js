@@ -201,92 +201,935 @@ function hideBackgroundLoadingIndicator() {
 // データ読み込み
 // ===================
 
+var filesListPromise = null;
+
 /**
- * files.jsonを読み込み
+ * files.jsonを読み込み（初期読み込みとバックグラウンド読み込みで共用するため一度だけ取得する。
+ * 失敗したときは次の呼び出しで取得し直す）
  */
 function loadFilesList() {
-    return fetch('files.json')
+    if (filesListPromise) return filesListPromise;
+    filesListPromise = fetch('files.json')
         .then(function(response) {
             return response.json();
         })
         .then(function(filesData) {
+            useColumnarMonths = filesData.columnar === true;
+            dataManifest = filesData.version === DATA_MANIFEST_VERSION ? filesData : null;
             return filesData.monthly || [];
         })
         .catch(function(e) {
             console.error('files.json の読み込みに失敗:', e);
+            filesListPromise = null;
             return [];
         });
+    return filesListPromise;
 }
 
 /**
- * unit_history.json を読み込み HallData.store.unitHistory に格納する。
+ * unit_history を読み込み HallData.store.unitHistory に格納する。
+ * シャード版（unit_history/index.json）があれば index だけを読み、各シャードは
+ * ensureUnitHistoryFor / ensureUnitHistoryWithdrawals で必要になった時点で読む。
+ * 無ければ符号化版 unit_history.enc.json を、それも無ければ unit_history.json 全体を読む。
+ * シャード版以外では区間インデックス unit_history.intervals.json と
+ * 変化フィード unit_history.feed.json も（あれば）並行して読む。
  * 失敗・不在時は unitHistory = null のまま解決し、既存フローを一切妨げない。
  * （常に resolve する。reject しないので初期ロードのチェーンを壊さない）
  * @returns {Promise<void>}
  */
 function loadUnitHistory() {
-    return fetch('unit_history.json')
+    HallData.store.unitIntervals = null;
+    HallData.store.unitFeed = null;
+    return loadUnitHistoryIndex().then(function(loaded) {
+        if (loaded) return true;
+        return loadEncodedUnitHistory();
+    }).then(function(loaded) {
+        if (loaded) return;
+        return Promise.all([fetch('unit_history.json'), loadUnitIntervals(), loadUnitFeed()])
+            .then(function(results) { return results[0]; })
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error('unit_history.json not ok: ' + response.status);
+                }
+                return response.json();
+            })
+            .then(function(json) {
+                HallData.store.unitHistory = json;
+                console.log('unit_history.json 読み込み完了');
+            })
+            .catch(function(e) {
+                // ファイル不在・パース失敗・ネットワークエラーをすべて握りつぶす
+                HallData.store.unitHistory = null;
+                console.log('unit_history.json は読み込めませんでした（既存機能には影響しません）:', e.message);
+            });
+    });
+}
+
+// ===================
+// unit_history の符号化版（unit_history.enc.json）
+// ===================
+//
+// history-maker/build_unit_history.py --encoded が生成する（形式は
+// history-maker/unit_history_codec.py）。日付は epoch からの日数の差分、
+// 機種名・台番号・種別は辞書の添字、イベントは台番号の増減だけを持ち、
+// 台番号の集合は連続する ID の区間で表す。decodeUnitHistory で
+// unit_history.json と同じ構造に戻してから HallData.store.unitHistory に入れる。
+
+var UNIT_HISTORY_ENCODED_FORMAT = 'unit-history-enc-v1';
+
+/**
+ * unit_history.enc.json を読んで展開する。使えれば true で解決（失敗は false）
+ */
+function loadEncodedUnitHistory() {
+    return fetch('unit_history.enc.json')
+        .then(function(response) {
+            if (!response.ok) return null;
+            return response.json();
+        })
+        .then(function(doc) {
+            if (!doc || doc.format !== UNIT_HISTORY_ENCODED_FORMAT) return false;
+            HallData.store.unitHistory = decodeUnitHistory(doc);
+            console.log('unit_history.enc.json 読み込み完了');
+            return Promise.all([loadUnitIntervals(), loadUnitFeed()]).then(function() { return true; });
+        })
+        .catch(function() {
+            return false;
+        });
+}
+
+/**
+ * 区間 [直前の区間の終わりからの差, 個数, ...] → 台番号IDの配列（小さい順）
+ */
+function unitIdsFromRuns(runs) {
+    var ids = [];
+    var end = 0;
+    for (var i = 0; i < runs.length; i += 2) {
+        var start = end + runs[i];
+        end = start + runs[i + 1];
+        for (var id = start; id < end; id++) ids.push(id);
+    }
+    return ids;
+}
+
+/**
+ * 符号化版を unit_history.json と同じ構造（キーの並びも同じ）に戻す
+ * （unit_history_codec.py の decode_history と同じ規則）
+ */
+function decodeUnitHistory(doc) {
+    var dateOf = createUnitHistoryCalendar(doc.epoch).key;
+    var units = doc.units;
+
+    // 台番号IDの集合（ID → true）を台番号の配列に（ID 順＝台番号の文字列順）
+    function names(set) {
+        return Object.keys(set).map(Number).sort(function(a, b) { return a - b; })
+            .map(function(id) { return units[id]; });
+    }
+
+    function applyRuns(set, addRuns, removeRuns) {
+        var next = Object.assign({}, set);
+        unitIdsFromRuns(addRuns).forEach(function(id) { next[id] = true; });
+        unitIdsFromRuns(removeRuns).forEach(function(id) { delete next[id]; });
+        return next;
+    }
+
+    var machineHistory = {};
+    doc.machine_history.forEach(function(item) {
+        var events = [];
+        var current = applyRuns({}, item[1], []);
+        var day = 0;
+        item[2].forEach(function(group) {
+            day += group[0];
+            var prev = group.length > 4 ? applyRuns(current, group[4][0], group[4][1]) : current;
+            current = applyRuns(prev, group[2], group[3]);
+            var dateKey = dateOf(day);
+            var curNames = names(current);
+            var prevNames = names(prev);
+            group[1].forEach(function(t) {
+                events.push({
+                    date: dateKey,
+                    type: doc.types[t],
+                    units: curNames.slice(),
+                    prev_units: prevNames.slice()
+                });
+            });
+        });
+        machineHistory[doc.machines[item[0]]] = { events: events };
+    });
+
+    var unitHistory = {};
+    doc.unit_history.forEach(function(item) {
+        var flat = item[1];
+        var entries = [];
+        var day = 0;
+        for (var i = 0; i < flat.length; i += 2) {
+            day += flat[i];
+            entries.push({ date: dateOf(day), machine: doc.machines[flat[i + 1]] });
+        }
+        unitHistory[units[item[0]]] = entries;
+    });
+
+    return { machine_history: machineHistory, unit_history: unitHistory };
+}
+
+// ===================
+// 台番号ごとの区間インデックス（unit_history.intervals.json）
+// ===================
+//
+// history-maker/build_unit_history.py --intervals が生成する（形式は
+// history-maker/unit_intervals.py）。台番号ごとに「この日からこの状態」の区間を
+// 開始日順に平坦な配列で持ち、utils.js のヘルパーは lookupUnitInterval の
+// 二分探索1回で答える。シャード版では各台番号シャードの intervals に入っている。
+// インデックスに無い台番号は、ヘルパーが従来どおりイベント列を走査する。
+
+var UNIT_INTERVALS_FORMAT = 'unit-intervals-v1';
+
+/**
+ * 区間インデックスの内容を HallData.store.unitIntervals（台番号 → 区間）に登録する
+ */
+function registerUnitIntervals(doc) {
+    if (!doc || doc.format !== UNIT_INTERVALS_FORMAT) return false;
+    var meta = {
+        doc: doc,
+        calendar: createUnitHistoryCalendar(doc.epoch),
+        stride: doc.fields.length
+    };
+    var map = HallData.store.unitIntervals || (HallData.store.unitIntervals = {});
+    Object.keys(doc.units).forEach(function(unitNo) {
+        map[unitNo] = { meta: meta, flat: doc.units[unitNo] };
+    });
+    return true;
+}
+
+/**
+ * unit_history.intervals.json を（あれば）読んで登録する。常に resolve する
+ */
+function loadUnitIntervals() {
+    return fetch('unit_history.intervals.json')
+        .then(function(response) {
+            if (!response.ok) return null;
+            return response.json();
+        })
+        .then(function(doc) {
+            if (registerUnitIntervals(doc)) console.log('unit_history.intervals.json 読み込み完了');
+        })
+        .catch(function() {});
+}
+
+// ===================
+// 日付順の変化フィード（unit_history.feed.json）
+// ===================
+//
+// build_unit_history.py が unit_history.json と同時に書き出す（形式は
+// history-maker/unit_feed.py）。全機種のイベントを日付順に並べ、日数ごとの開始位置
+// starts を持つため、utils.js の getRecentChanges は「日付 D 以前の直近 N 件」を
+// 全機種のイベント列を走査せずに切り出せる。シャード版では index.json の feed。
+
+var UNIT_FEED_FORMAT = 'unit-change-feed-v1';
+
+/**
+ * 変化フィードの内容を HallData.store.unitFeed に登録する
+ */
+function registerUnitFeed(doc) {
+    if (!doc || doc.format !== UNIT_FEED_FORMAT) return false;
+    HallData.store.unitFeed = { doc: doc, calendar: createUnitHistoryCalendar(doc.epoch) };
+    return true;
+}
+
+/**
+ * unit_history.feed.json を（あれば）読んで登録する。常に resolve する
+ */
+function loadUnitFeed() {
+    return fetch('unit_history.feed.json')
+        .then(function(response) {
+            if (!response.ok) return null;
+            return response.json();
+        })
+        .then(function(doc) {
+            if (registerUnitFeed(doc)) console.log('unit_history.feed.json 読み込み完了');
+        })
+        .catch(function() {});
+}
+
+// ===================
+// unit_history のシャード（unit_history/index.json）
+// ===================
+//
+// history-maker/build_unit_history.py --sharded が生成する。台番号の範囲ごと
+// （unit_range 台ずつ）と機種名のバケットごと（machine_buckets 個）にシャードを持ち、
+// 読み込んだ分だけを HallData.store.unitHistory の unit_history / machine_history に
+// 足していく。台番号シャードは台番号だけで、機種シャードは機種名だけで決まるため、
+// 表示する台の分だけを読めばよい。ヘルパー（getUnitStatus など）は同期のまま、
+// 読み込み済みの範囲で答える（未読の台は null）。
+
+var UNIT_HISTORY_INDEX_VERSION = 2;
+var unitHistoryIndex = null;
+var unitHistoryShardRequests = {}; // シャードのパス → 読み込みの Promise（重複取得しない）
+
+/**
+ * unit_history/index.json を読む。使えれば空の unitHistory を用意して true で解決
+ */
+function loadUnitHistoryIndex() {
+    return fetch('unit_history/index.json')
+        .then(function(response) {
+            if (!response.ok) return null;
+            return response.json();
+        })
+        .then(function(index) {
+            if (!index || index.version !== UNIT_HISTORY_INDEX_VERSION) return false;
+            unitHistoryIndex = index;
+            unitHistoryShardRequests = {};
+            HallData.store.unitHistory = {
+                machine_history: {},
+                unit_history: {},
+                latest_date: index.latest_date || null
+            };
+            console.log('unit_history/index.json 読み込み完了（シャードは必要時に読み込み）');
+            return true;
+        })
+        .catch(function() {
+            return false;
+        });
+}
+
+/**
+ * 台番号 → 台番号シャードのキー（881 → "8"。数字でなければ "x"）
+ */
+function unitHistoryUnitShardKey(unitNo) {
+    var s = String(unitNo);
+    if (!/^\d+$/.test(s)) return 'x';
+    return String(Math.floor(parseInt(s, 10) / unitHistoryIndex.unit_range));
+}
+
+/**
+ * 機種名 → 機種シャードの番号（UTF-16 のコード単位に対する 32bit FNV-1a。
+ * build_unit_history.py の machine_bucket と同じ値）
+ */
+function unitHistoryMachineBucket(machine) {
+    var h = 0x811c9dc5;
+    for (var i = 0; i < machine.length; i++) {
+        h ^= machine.charCodeAt(i);
+        h = Math.imul(h, 0x01000193) >>> 0;
+    }
+    return String(h % unitHistoryIndex.machine_buckets);
+}
+
+/**
+ * シャードを1つ読み、merge で unitHistory に足す（同じパスは1回だけ読む）。
+ * 失敗しても resolve する（その範囲のヘルパーが null を返すだけ）
+ */
+function loadUnitHistoryShard(path, merge) {
+    if (!unitHistoryShardRequests[path]) {
+        unitHistoryShardRequests[path] = fetch(path)
+            .then(function(response) {
+                if (!response.ok) throw new Error(path + ' not ok: ' + response.status);
+                return response.json();
+            })
+            .then(function(json) {
+                var uh = HallData.store.unitHistory;
+                if (uh) merge(uh, json);
+            })
+            .catch(function(e) {
+                console.log('unit_history のシャードを読み込めませんでした:', e.message);
+            });
+    }
+    return unitHistoryShardRequests[path];
+}
+
+function mergeUnitShard(uh, json) {
+    Object.assign(uh.unit_history, json.unit_history || {});
+    if (json.intervals) registerUnitIntervals(json.intervals);
+}
+
+function mergeMachineShard(uh, json) {
+    Object.assign(uh.machine_history, json.machine_history || {});
+}
+
+/**
+ * 台番号の一覧について、台番号シャードと、その台に設置されたことのある機種の
+ * 機種シャードを読み込む。台番号シャードに区間インデックスがある台は、ヘルパーが
+ * それだけで答えられるため機種シャードを読まない。
+ * シャード版でなければ（全体を読み込み済み）何もしない。
+ * @param {Array<string|number>} unitNos
+ * @returns {Promise<void>}
+ */
+function ensureUnitHistoryFor(unitNos) {
+    if (!unitHistoryIndex || !HallData.store.unitHistory) return Promise.resolve();
+
+    var unitPaths = {};
+    unitNos.forEach(function(unitNo) {
+        var path = unitHistoryIndex.units[unitHistoryUnitShardKey(unitNo)];
+        if (path) unitPaths[path] = true;
+    });
+
+    return Promise.all(Object.keys(unitPaths).map(function(path) {
+        return loadUnitHistoryShard(path, mergeUnitShard);
+    })).then(function() {
+        var unitMap = HallData.store.unitHistory ? HallData.store.unitHistory.unit_history : {};
+        var intervals = HallData.store.unitIntervals || {};
+        var machinePaths = {};
+        unitNos.forEach(function(unitNo) {
+            if (Object.prototype.hasOwnProperty.call(intervals, String(unitNo))) return;
+            (unitMap[String(unitNo)] || []).forEach(function(entry) {
+                var path = unitHistoryIndex.machines[unitHistoryMachineBucket(entry.machine)];
+                if (path) machinePaths[path] = true;
+            });
+        });
+        return Promise.all(Object.keys(machinePaths).map(function(path) {
+            return loadUnitHistoryShard(path, mergeMachineShard);
+        }));
+    }).then(function() {});
+}
+
+/**
+ * 変化フィードのシャードを読み込んで登録する（撤去台一覧などの「直近の変化」用）。
+ * シャード版でなければ何もしない（loadUnitHistory で読み込み済み）
+ * @returns {Promise<void>}
+ */
+function ensureUnitHistoryFeed() {
+    if (!unitHistoryIndex || !unitHistoryIndex.feed || !HallData.store.unitHistory) {
+        return Promise.resolve();
+    }
+    return loadUnitHistoryShard(unitHistoryIndex.feed, function(uh, json) {
+        registerUnitFeed(json);
+    });
+}
+
+// ===================
+// 列指向の月別JSON（data/YYYY_MM.columnar.json）
+// ===================
+//
+// converter/columnar.py が生成する軽量版。機種名は辞書の添字、数値列は
+// 日ごとの整数配列で持ち、確率列は G数 と回数から復元する。
+// 台配置（機種名・台番号の並び）は変わった日ごとのエポック layouts に持ち、
+// 各日は layout でその添字を指す（旧形式 columnar-v1 は日ごとに持つ）。
+// files.json に "columnar": true があるときだけ使い、読めなければ通常の
+// 月別JSONにフォールバックする。展開後の行は月別JSON（v2）を読んだときと同じになる
+// （回数列は整数、確率列は "1/x" の x の数値）。
+
+var COLUMNAR_FORMATS = ['columnar-v1', 'columnar-v2'];
+var useColumnarMonths = false;
+
+/**
+ * 読める列指向形式か
+ */
+function isColumnarData(content) {
+    return !!content && COLUMNAR_FORMATS.indexOf(content.format) !== -1;
+}
+
+/**
+ * data/YYYY_MM.json → data/YYYY_MM.columnar.json
+ */
+function toColumnarPath(filepath) {
+    return filepath.replace(/\.json$/, '.columnar.json');
+}
+
+/**
+ * 確率列の値（"1/123.9" の 123.9。回数 0 は 0）。
+ * 変換側（Python の '%.1f'）は偶数丸めなので、toFixed が切り上げてしまう
+ * ちょうど中間の値（x.25 / x.75。4×G数÷回数 が奇数の整数）だけ補正する。
+ * 0.05 刻みのそれ以外の値は2進数で正確に表せず、どちらも同じ結果になる。
+ */
+function columnarProbability(games, count) {
+    if (count === 0) return 0;
+    var value = games / count;
+    if (games >= 0 && count > 0 && (4 * games) % count === 0 && ((4 * games) / count) % 2 === 1) {
+        var lower = Math.floor(value * 10);
+        return (lower % 2 === 0 ? lower : lower + 1) / 10;
+    }
+    return parseFloat(value.toFixed(1));
+}
+
+/**
+ * 列指向形式の1日分を、月別JSONと同じレコード配列（列順。回数列・確率列は数値）に展開
+ */
+function expandColumnarDay(doc, day) {
+    var columns = doc.columns;
+    var derived = doc.derived || {};
+    var raw = day.raw || {};
+    var layout = day.layout !== undefined ? doc.layouts[day.layout] : null;
+    // 保存されている列（台配置の列はエポックから引く）
+    function stored(col) {
+        return layout && layout[col] !== undefined ? layout[col] : day[col];
+    }
+    var first = columns.filter(function(col) { return !derived[col]; })[0];
+    var count = first !== undefined ? stored(first).length : 0;
+
+    // 列ごとに値の配列へ復元してから行に組み立てる
+    var values = columns.map(function(col) {
+        var out = new Array(count);
+        var i;
+        if (col === '機種名') {
+            var ids = stored(col);
+            for (i = 0; i < count; i++) out[i] = doc.machines[ids[i]];
+        } else if (derived[col]) {
+            var games = stored(derived[col][0]);
+            var counters = derived[col].slice(1).map(stored);
+            for (i = 0; i < count; i++) {
+                var total = 0;
+                var missing = games[i] === null;
+                for (var s = 0; s < counters.length; s++) {
+                    if (counters[s][i] === null) missing = true;
+                    total += counters[s][i];
+                }
+                out[i] = missing ? '' : columnarProbability(games[i], total);
+            }
+        } else if (COUNT_COLUMNS.indexOf(col) !== -1) {
+            // 回数列は v2 と同じく数値のまま（空欄は ''）
+            var nums = stored(col);
+            for (i = 0; i < count; i++) out[i] = nums[i] === null ? '' : nums[i];
+        } else {
+            var cells = stored(col);
+            for (i = 0; i < count; i++) out[i] = cells[i] === null ? '' : String(cells[i]);
+        }
+        var overrides = raw[col];
+        if (overrides) {
+            Object.keys(overrides).forEach(function(index) {
+                out[Number(index)] = overrides[index];
+            });
+        }
+        return out;
+    });
+
+    var records = new Array(count);
+    for (var i = 0; i < count; i++) {
+        var row = {};
+        for (var c = 0; c < columns.length; c++) {
+            row[columns[c]] = values[c][i];
+        }
+        records[i] = row;
+    }
+    return records;
+}
+
+// ===================
+// 型付きスキーマ（v2）の月別JSON
+// ===================
+//
+// converter/month_schema.py 参照。{ "schema": 2, "days": {...} } の形で、
+// 回数列は整数（空欄は null）、確率列は "1/x" の x を実数（"1/0.0" は null）で持つ。
+// 回数列は数値のままキャッシュする（各タブの parseInt(String(...)) はそのまま通る）。
+// 確率列も x の数値のままキャッシュし（"1/0.0" は 0）、表示するときに formatProbability で
+// "1/x" にする。解析タブの parseProbability は数値をそのまま使う。
+
+var TYPED_SCHEMA_VERSION = 2;
+var COUNT_COLUMNS = ['G数', '差枚', 'BB', 'RB', 'ART'];
+
+/**
+ * 型付きスキーマの1日分をキャッシュ用の行にする（配列をその場で書き換える）
+ */
+function normalizeTypedDay(records) {
+    records.forEach(function(row) {
+        COUNT_COLUMNS.forEach(function(col) {
+            if (row[col] === null) row[col] = '';
+        });
+        PROBABILITY_COLUMNS.forEach(function(col) {
+            if (row[col] === null) row[col] = 0;
+        });
+    });
+    return records;
+}
+
+/**
+ * 列指向形式・型付きスキーマなら { 日付: [レコード, ...] } に展開（従来形式はそのまま返す）
+ */
+function expandMonthlyData(monthlyData) {
+    if (!monthlyData) return monthlyData;
+    var expanded = {};
+    if (isColumnarData(monthlyData)) {
+        Object.keys(monthlyData.days).forEach(function(dateKey) {
+            expanded[dateKey] = expandColumnarDay(monthlyData, monthlyData.days[dateKey]);
+        });
+        return expanded;
+    }
+    if (monthlyData.schema === TYPED_SCHEMA_VERSION) {
+        Object.keys(monthlyData.days).forEach(function(dateKey) {
+            expanded[dateKey] = normalizeTypedDay(monthlyData.days[dateKey]);
+        });
+        return expanded;
+    }
+    if (typeof monthlyData.schema === 'number') {
+        throw new Error('未対応の月別JSONスキーマです: ' + monthlyData.schema);
+    }
+    return monthlyData;
+}
+
+// ===================
+// 日別シャード（data/days/YYYY_MM_DD.<ハッシュ>.json）
+// ===================
+//
+// converter/day_shards.py 参照。files.json が version 2 のとき、
+// months / days に月別JSON・日別シャードのハッシュ・サイズ・行数・日付範囲が載る。
+// シャードは1日分の列指向形式で、名前に内容ハッシュを含むため中身は変わらない。
+// シャードにはその日の機種内順位も入っている（registerDayRanks で登録する）。
+// 初回表示は最新日（と URL・保存状態で指定された日）のシャードだけで行い、
+// 月別JSONはすべてバックグラウンドで読み込む。
+// 月別JSONは ?v=<ハッシュ> 付きで取得し、内容が変わるまでブラウザキャッシュを使う。
+
+var DATA_MANIFEST_VERSION = 2;
+var dataManifest = null;
+
+/**
+ * 月別JSONのパスに内容ハッシュのクエリを付ける（マニフェストに無ければそのまま）
+ */
+function toVersionedPath(filepath, path) {
+    var months = dataManifest && dataManifest.months;
+    var key = filepath.split('/').pop().replace(/\.json$/, '');
+    var entry = months && months[key];
+    return entry && entry.sha256 ? path + '?v=' + entry.sha256.slice(0, 16) : path;
+}
+
+/**
+ * 初回表示で読み込む日別シャードの日付キー（最新日と、指定されていればその日）
+ */
+function getInitialShardDates() {
+    if (!dataManifest || !dataManifest.days || !dataManifest.max_date) return [];
+    var dates = [dataManifest.max_date];
+    if (typeof DailyState !== 'undefined') {
+        var requested = DailyState.get().dateFile;
+        var match = requested && String(requested).match(/(\d{4}_\d{2}_\d{2})/);
+        if (match && match[1] !== dates[0] && dataManifest.days[match[1]]) {
+            dates.push(match[1]);
+        }
+    }
+    return dates.filter(function(dateKey) { return !!dataManifest.days[dateKey]; });
+}
+
+/**
+ * 日別シャードを読み込んでキャッシュに展開（月別JSONと同じ行になる）
+ */
+function loadDayShard(dateKey) {
+    var entry = dataManifest.days[dateKey];
+    return fetch(entry.path)
         .then(function(response) {
-            if (!response.ok) {
-                throw new Error('unit_history.json not ok: ' + response.status);
+            if (!response.ok) return null;
+            return response.json();
+        })
+        .then(function(content) {
+            if (!isColumnarData(content) || !content.days[dateKey]) {
+                console.warn('日別シャード読み込み失敗: ' + entry.path);
+                return { success: false, days: 0 };
             }
+            var expanded = expandMonthlyData(content);
+            registerDayRanks(dateKey, content.ranks, expanded[dateKey]);
+            var daysLoaded = cacheMonthlyData(expanded);
+            console.log('日別シャード読み込み完了: ' + entry.path);
+            return { success: true, days: daysLoaded };
+        })
+        .catch(function(e) {
+            console.error('日別シャード読み込みエラー: ' + entry.path, e);
+            return { success: false, days: 0 };
+        });
+}
+
+// ===================
+// files.json から参照する集計ファイル
+// ===================
+//
+// converter/convert_csv_to_json.py の PUBLIC_ARTIFACTS。files.json（version 2）に
+// パスと内容ハッシュが載っていれば、各タブが必要になったときに一度だけ読む。
+
+var artifactPromises = {};
+
+/**
+ * files.json の key の集計ファイルを（あれば）一度だけ読み、format が合えば register(doc) の
+ * 戻り値で resolve する。常に resolve する（無い・形式が違う・読めなければ null）
+ */
+function fetchArtifact(key, format, register) {
+    var entry = dataManifest && dataManifest[key];
+    if (!entry || !entry.path) return Promise.resolve(null);
+    if (artifactPromises[key]) return artifactPromises[key];
+
+    var path = entry.sha256 ? entry.path + '?v=' + entry.sha256.slice(0, 16) : entry.path;
+    artifactPromises[key] = fetch(path)
+        .then(function(response) {
+            if (!response.ok) return null;
             return response.json();
         })
-        .then(function(json) {
-            HallData.store.unitHistory = json;
-            console.log('unit_history.json 読み込み完了');
+        .then(function(doc) {
+            if (!doc || doc.format !== format) return null;
+            return register(doc);
         })
         .catch(function(e) {
-            // ファイル不在・パース失敗・ネットワークエラーをすべて握りつぶす
-            HallData.store.unitHistory = null;
-            console.log('unit_history.json は読み込めませんでした（既存機能には影響しません）:', e.message);
+            console.warn(entry.path + ' の読み込みに失敗:', e);
+            return null;
         });
+    return artifactPromises[key];
+}
+
+// ===================
+// 日別統計（daily_stats.json）
+// ===================
+//
+// converter/daily_stats.py 参照。カレンダーが月別JSONを読まずに使う日ごとの合計。
+
+var DAILY_STATS_FORMAT = 'daily-stats-v1';
+
+/**
+ * 日別統計を読み込み HallData.store.dailyStats（日付 → 統計）に格納する。
+ * 一度だけ取得し、無い・読めなければ null で resolve する
+ */
+function loadDailyStats() {
+    return fetchArtifact('daily_stats', DAILY_STATS_FORMAT, function(doc) {
+        var stats = {};
+        Object.keys(doc.months || {}).forEach(function(yearMonth) {
+            Object.assign(stats, doc.months[yearMonth].days);
+        });
+        HallData.store.dailyStats = stats;
+        return stats;
+    });
+}
+
+// ===================
+// 累積和インデックス（prefix_sums.json）
+// ===================
+//
+// converter/prefix_sums.py 参照。データのある日を古い順に並べた日番号で、台番号・機種ごとの
+// 差枚 / G数 / BB / RB / ART を持つ。累積配列は utils.js の getPrefixSeries が系列ごとに
+// 初回だけ作り、期間の合計は2回の参照で求まる（解析タブの集計で使う）。
+
+var PREFIX_SUMS_FORMAT = 'prefix-sums-v1';
+
+/**
+ * 累積和インデックスの内容を HallData.store.prefixSums に登録する
+ */
+function registerPrefixSums(doc) {
+    var ordinals = {};
+    doc.dates.forEach(function(dateKey, i) { ordinals[dateKey] = i; });
+    var machineIds = {};
+    doc.machines.forEach(function(machine, i) { machineIds[machine] = i; });
+    var columns = {};
+    doc.columns.forEach(function(col, i) { columns[col] = i; });
+    HallData.store.prefixSums = {
+        doc: doc,
+        ordinals: ordinals,     // 日付キー → 日番号
+        machineIds: machineIds, // 機種名 → by_unit の機種ID
+        columns: columns,       // 列名 → values の添字
+        series: { unit: {}, machine: {} }
+    };
+    console.log('累積和インデックス読み込み完了: ' + doc.dates.length + '日分');
+    return HallData.store.prefixSums;
+}
+
+/**
+ * files.json の prefix_sums を（あれば）一度だけ読んで登録する。常に resolve する
+ */
+function loadPrefixSums() {
+    return fetchArtifact('prefix_sums', PREFIX_SUMS_FORMAT, registerPrefixSums);
+}
+
+// ===================
+// 島・列・位置ごとの日別集計（spatial_stats.json）
+// ===================
+//
+// converter/spatial_stats.py 参照。island-config.json の島・列と position.csv の位置ごとに
+// 日ごとの 台数 / 差枚 / G数 / BB / RB の合計を持つ。平均・確率は utils.js の getSpatialStats が求める。
+
+var SPATIAL_STATS_FORMAT = 'spatial-stats-v1';
+
+/**
+ * files.json の spatial_stats を（あれば）一度だけ読み、HallData.store.spatialStats に登録する。
+ * 常に resolve する（無い・読めなければ null）
+ */
+function loadSpatialStats() {
+    return fetchArtifact('spatial_stats', SPATIAL_STATS_FORMAT, function(doc) {
+        var index = {};
+        doc.groups.forEach(function(group, i) { index[group.kind + ':' + group.id] = i; });
+        var days = {};
+        Object.keys(doc.months || {}).forEach(function(yearMonth) {
+            Object.assign(days, doc.months[yearMonth].days);
+        });
+        HallData.store.spatialStats = {
+            groups: doc.groups,
+            index: index,       // 'island:counter-1' など → groups の添字
+            width: doc.columns.length,
+            days: days          // 日付 → [台数, 差枚, G数, BB, RB, ...]（groups の順）
+        };
+        return HallData.store.spatialStats;
+    });
+}
+
+// ===================
+// 台番号末尾・ゾロ目ごとの日別集計（digit_stats.json）
+// ===================
+//
+// converter/digit_stats.py 参照。末尾 0〜9 とゾロ目ごとに日ごとの 台数 / 差枚 / G数 / BB / RB / 勝ち
+// の合計を持ち、events.json のイベント日は機種ごとの内訳も持つ（解析タブの末尾集計で使う）。
+
+var DIGIT_STATS_FORMAT = 'digit-stats-v1';
+
+/**
+ * files.json の digit_stats を（あれば）一度だけ読み、HallData.store.digitStats に登録する。
+ * 常に resolve する（無い・読めなければ null）
+ */
+function loadDigitStats() {
+    return fetchArtifact('digit_stats', DIGIT_STATS_FORMAT, function(doc) {
+        var days = {};
+        var events = {};
+        Object.keys(doc.months || {}).forEach(function(yearMonth) {
+            Object.assign(days, doc.months[yearMonth].days);
+            Object.assign(events, doc.months[yearMonth].events);
+        });
+        HallData.store.digitStats = {
+            classes: doc.classes,   // ['0', ..., '9', 'zorome']
+            width: doc.columns.length,
+            days: days,             // 日付 → [台数, 差枚, G数, BB, RB, 勝ち, ...]（classes の順）
+            events: events          // イベント日 → { クラス: { 機種名: [台数, 差枚, G数, BB, RB, 勝ち] } }
+        };
+        return HallData.store.digitStats;
+    });
+}
+
+// ===================
+// 日ごと・機種ごとの機種内順位と分位点（日別シャードの ranks）
+// ===================
+//
+// converter/machine_ranks.py 参照。日別シャードにその日の機種ごとの各台の 差枚 / G数 / 合成確率 の
+// 機種内順位と p10 / p50 / p90 が入っている（機種内バッジを1日分の窓で付けるときに使う。machinebadge.js）。
+// 日別シャードで読んだ日はそのまま登録し、月別JSONで読んだ日はバッジを付けるときにその日のシャードだけ読む。
+
+var MACHINE_RANKS_FORMAT = 'machine-ranks-v2';
+var machineRanksPromises = {};
+
+/**
+ * シャードの ranks（doc）と展開済みのその日の行 rows から、dateKey の機種内順位を
+ * HallData.store.machineRanks に登録する。台番号の並びはその機種の行の順。
+ * 登録した { 機種名: {...} } を返す（形式が違えば null）
+ */
+function registerDayRanks(dateKey, doc, rows) {
+    if (!doc || doc.format !== MACHINE_RANKS_FORMAT || !rows) return null;
+    var units = {};
+    rows.forEach(function(row) {
+        var machine = row['機種名'] || '';
+        (units[machine] || (units[machine] = [])).push(String(row['台番号'] || ''));
+    });
+    var machines = {};
+    Object.keys(doc.machines).forEach(function(machine) {
+        var entry = doc.machines[machine];
+        if (!units[machine] || units[machine].length !== entry.ranks[0].length) return;
+        machines[machine] = { units: units[machine], ranks: entry.ranks, q: entry.q };
+    });
+    if (!HallData.store.machineRanks) {
+        HallData.store.machineRanks = {
+            metrics: doc.metrics,     // ['差枚', 'G数', '合成確率']
+            quantiles: doc.quantiles, // [0.1, 0.5, 0.9]
+            days: {}                  // 日付 → { 機種名: { units: [台番号...], ranks: [[...], ...], q: [[p10, p50, p90], ...] } }
+        };
+    }
+    HallData.store.machineRanks.days[dateKey] = machines;
+    return machines;
+}
+
+/**
+ * dateKey（'YYYY_MM_DD' や 'data/YYYY_MM_DD.csv'）の機種内順位を読み込み済みか
+ */
+function hasMachineRanks(dateKey) {
+    var mr = HallData.store.machineRanks;
+    return !!(mr && mr.days[normalizeDateKey(dateKey)]);
+}
+
+/**
+ * dateKey の機種内順位が未登録なら、その日の日別シャードだけを（一度だけ）読んで登録する。
+ * 行のキャッシュ（dataCache）には触れない。常に resolve する（その日の { 機種名: {...} }。無ければ null）
+ */
+function loadMachineRanks(dateKey) {
+    var key = normalizeDateKey(dateKey);
+    if (hasMachineRanks(key)) return Promise.resolve(HallData.store.machineRanks.days[key]);
+    var entry = key && dataManifest && dataManifest.days && dataManifest.days[key];
+    if (!entry || entry.ranks !== MACHINE_RANKS_FORMAT) return Promise.resolve(null);
+    if (machineRanksPromises[key]) return machineRanksPromises[key];
+
+    machineRanksPromises[key] = fetch(entry.path)
+        .then(function(response) {
+            if (!response.ok) throw new Error('HTTP ' + response.status);
+            return response.json();
+        })
+        .then(function(content) {
+            if (!isColumnarData(content) || !content.days[key]) return null;
+            return registerDayRanks(key, content.ranks, expandColumnarDay(content, content.days[key]));
+        })
+        .catch(function(e) {
+            console.warn(entry.path + ' の機種内順位の読み込みに失敗:', e);
+            return null;
+        });
+    return machineRanksPromises[key];
+}
+
+/**
+ * 月別JSONの中身を取得（列指向版が使えればそちらを優先）。失敗時は null
+ */
+function fetchMonthlyData(filepath) {
+    function fetchJSON(path) {
+        return fetch(toVersionedPath(filepath, path)).then(function(response) {
+            if (!response.ok) return null;
+            return response.json();
+        });
+    }
+
+    if (!useColumnarMonths) {
+        return fetchJSON(filepath);
+    }
+    return fetchJSON(toColumnarPath(filepath))
+        .catch(function() { return null; })
+        .then(function(columnarData) {
+            if (isColumnarData(columnarData)) {
+                return columnarData;
+            }
+            console.warn('列指向JSONが使えないため通常の月別JSONを読み込みます: ' + filepath);
+            return fetchJSON(filepath);
+        });
+}
+
+/**
+ * 展開済みの { 日付: [レコード, ...] } をキャッシュに入れ、入れた日数を返す
+ */
+function cacheMonthlyData(monthlyData) {
+    var daysLoaded = 0;
+    
+    // 各日付のデータをキャッシュに展開
+    Object.entries(monthlyData).forEach(function(entry) {
+        var dateKey = entry[0];
+        var records = entry[1];
+        var filename = 'data/' + dateKey + '.csv';
+        
+        if (headers.length === 0 && records.length > 0) {
+            headers = Object.keys(records[0]);
+        }
+        
+        dataCache[filename] = records;
+        
+        if (CSV_FILES.indexOf(filename) === -1) {
+            CSV_FILES.push(filename);
+        }
+        
+        records.forEach(function(row) {
+            if (row['機種名']) {
+                allMachines.add(row['機種名']);
+            }
+        });
+        
+        daysLoaded++;
+    });
+    
+    // ストアと同期
+    syncToStore();
+    return daysLoaded;
 }
 
 /**
  * 月別JSONファイルを読み込んでキャッシュに展開
  */
 function loadMonthlyJSON(filepath) {
-    return fetch(filepath)
-        .then(function(response) {
-            if (!response.ok) {
+    return fetchMonthlyData(filepath)
+        .then(function(content) {
+            var monthlyData = expandMonthlyData(content);
+            if (!monthlyData) {
                 console.warn('月別JSON読み込み失敗: ' + filepath);
                 return { success: false, days: 0 };
             }
-            return response.json().then(function(monthlyData) {
-                var daysLoaded = 0;
-                
-                // 各日付のデータをキャッシュに展開
-                Object.entries(monthlyData).forEach(function(entry) {
-                    var dateKey = entry[0];
-                    var records = entry[1];
-                    var filename = 'data/' + dateKey + '.csv';
-                    
-                    if (headers.length === 0 && records.length > 0) {
-                        headers = Object.keys(records[0]);
-                    }
-                    
-                    dataCache[filename] = records;
-                    
-                    if (CSV_FILES.indexOf(filename) === -1) {
-                        CSV_FILES.push(filename);
-                    }
-                    
-                    records.forEach(function(row) {
-                        if (row['機種名']) {
-                            allMachines.add(row['機種名']);
-                        }
-                    });
-                    
-                    daysLoaded++;
-                });
-                
-                // ストアと同期
-                syncToStore();
-                
-                console.log('月別JSON読み込み完了: ' + filepath + ' (' + daysLoaded + '日分)');
-                return { success: true, days: daysLoaded };
-            });
+            var daysLoaded = cacheMonthlyData(monthlyData);
+            
+            console.log('月別JSON読み込み完了: ' + filepath + ' (' + daysLoaded + '日分)');
+            return { success: true, days: daysLoaded };
         })
         .catch(function(e) {
             console.error('月別JSON読み込みエラー: ' + filepath, e);
@@ -364,12 +1207,18 @@ function loadInitialData() {
         
         // ★変更: 位置データと unit_history を並行読み込み。
         //   loadUnitHistory は必ず resolve するため、既存の位置データ読込フローを妨げない。
+        //   日別シャードがあれば最新日だけ同時に読み込み、月別JSONは後回しにする。
+        var shardDates = getInitialShardDates();
         return Promise.all([
             loadPositionData(),
-            loadUnitHistory()
-        ]).then(function() {
-            // 最新月（最大2ヶ月分）を読み込み
-            var initialFiles = monthlyFiles.slice(0, 2);
+            loadUnitHistory(),
+            Promise.all(shardDates.map(loadDayShard))
+        ]).then(function(results) {
+            var shardsLoaded = results[2].length > 0 && results[2].every(function(r) { return r.success; });
+            loadingState.loadedFromShards = shardsLoaded;
+            
+            // 最新月（最大2ヶ月分）を読み込み（日別シャードで表示できる場合は読まない）
+            var initialFiles = shardsLoaded ? [] : monthlyFiles.slice(0, 2);
             var loaded = 0;
             
             function loadNext(index) {
@@ -410,8 +1259,9 @@ function loadInitialData() {
  */
 function loadRemainingDataInBackground() {
     return loadFilesList().then(function(monthlyFiles) {
-        // 最初の2ファイルは既に読み込み済み
-        var remainingFiles = monthlyFiles.slice(2);
+        // 初期読み込み済みの月（日別シャードで表示した場合は無し）を除く
+        var initialCount = loadingState.loadedFiles;
+        var remainingFiles = monthlyFiles.slice(initialCount);
         
         if (remainingFiles.length === 0) {
             loadingState.fullLoadComplete = true;
@@ -427,7 +1277,7 @@ function loadRemainingDataInBackground() {
         
         // 並列で読み込み
         return loadMultipleJSONParallel(remainingFiles, function(loaded, total) {
-            loadingState.loadedFiles = 2 + loaded;
+            loadingState.loadedFiles = initialCount + loaded;
             showBackgroundLoadingIndicator(loaded, total);
         }).then(function() {
             // 日付順にソート
@@ -459,6 +1309,15 @@ function refreshUIAfterBackgroundLoad() {
     // 機種フィルターを更新
     populateMachineFilters();
     
+    // 日別シャードだけで表示していた日別データは、過去日を使うバッジを計算し直す
+    if (loadingState.loadedFromShards && typeof dailyBadgeCache !== 'undefined') {
+        dailyBadgeCache = {};
+        var dailyContent = document.getElementById('daily');
+        if (dailyContent && dailyContent.classList.contains('active') && typeof filterAndRender === 'function') {
+            filterAndRender();
+        }
+    }
+    
     // 現在のタブに応じて更新
     var activeTab = document.querySelector('.tab-btn.active');
     if (activeTab) {
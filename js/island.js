@@ -9,6 +9,7 @@ var IslandMap = (function() {
     var state = {
         config: null,
         unitDataMap: {},
+        spatialSummary: null,
         machineShortNames: {},
         currentDateIndex: 0,
         viewMode: 'machine',
@@ -175,6 +176,154 @@ var IslandMap = (function() {
         });
     }
     
+    // ===================
+    // 島・列・位置ごとの集計
+    // ===================
+    
+    function countLayoutUnits(units) {
+        return units.filter(function(unitNum) { return unitNum !== null && unitNum !== 0; }).length;
+    }
+    
+    // 集計のレイアウトが今の island-config.json / position.csv と台数まで一致するか
+    function spatialStatsMatchLayout(stats, positions) {
+        var matched = state.config.islands.every(function(island) {
+            var entry = stats['island:' + island.id];
+            if (!entry) return false;
+            var total = 0;
+            var rowsMatched = island.rows.every(function(row, i) {
+                var rowEntry = stats['row:' + island.id + '/' + i];
+                var units = countLayoutUnits(row.units);
+                total += units;
+                return rowEntry && rowEntry.group.units === units;
+            });
+            return rowsMatched && entry.group.units === total;
+        });
+        if (!matched) return false;
+        return Object.keys(POSITION_TAGS).every(function(tag) {
+            var entry = stats['position:' + tag];
+            if (!entry) return true;
+            var units = Object.keys(positions).filter(function(unitNum) {
+                return positions[unitNum].tags.indexOf(tag) !== -1;
+            });
+            return entry.group.units === units.length;
+        });
+    }
+    
+    // 読み込んだ日の行から集計する（spatial_stats.json が無い・レイアウトが違う場合）
+    function computeSpatialSummary(positions) {
+        var summary = {};
+        
+        function add(kind, id, group, unitNums) {
+            var totals = [0, 0, 0, 0, 0];
+            unitNums.forEach(function(unitNum) {
+                var data = state.unitDataMap[String(unitNum).replace(/\D/g, '')];
+                if (!data) return;
+                totals[0] += 1;
+                totals[1] += parseInt(String(data['差枚']).replace(/,/g, '')) || 0;
+                totals[2] += parseInt(String(data['G数']).replace(/,/g, '')) || 0;
+                totals[3] += parseInt(String(data['BB']).replace(/,/g, '')) || 0;
+                totals[4] += parseInt(String(data['RB']).replace(/,/g, '')) || 0;
+            });
+            group.kind = kind;
+            group.id = id;
+            group.units = unitNums.length;
+            summary[kind + ':' + id] = HallData.utils.summarizeSpatialTotals(group, totals);
+        }
+        
+        function islandUnits(island) {
+            return island.rows.reduce(function(units, row) {
+                return units.concat(row.units.filter(function(unitNum) { return unitNum !== null && unitNum !== 0; }));
+            }, []);
+        }
+        
+        (state.config.areas || []).forEach(function(area) {
+            var units = [];
+            state.config.islands.forEach(function(island) {
+                if (island.area === area.id) units = units.concat(islandUnits(island));
+            });
+            add('area', area.id, { name: area.name }, units);
+        });
+        state.config.islands.forEach(function(island) {
+            add('island', island.id, { area: island.area }, islandUnits(island));
+            island.rows.forEach(function(row, i) {
+                add('row', island.id + '/' + i, { island: island.id }, row.units.filter(function(unitNum) {
+                    return unitNum !== null && unitNum !== 0;
+                }));
+            });
+        });
+        Object.keys(POSITION_TAGS).forEach(function(tag) {
+            add('position', tag, {}, Object.keys(positions).filter(function(unitNum) {
+                return positions[unitNum].tags.indexOf(tag) !== -1;
+            }));
+        });
+        return summary;
+    }
+    
+    async function loadSpatialSummary() {
+        var sortedFiles = sortFilesByDate(CSV_FILES, true);
+        var currentFile = sortedFiles[state.currentDateIndex];
+        state.spatialSummary = null;
+        if (!currentFile || !state.config) return;
+        
+        var positions = await loadPositionData();
+        await loadSpatialStats();
+        var stats = HallData.utils.getSpatialStats(currentFile);
+        state.spatialSummary = stats && spatialStatsMatchLayout(stats, positions)
+            ? stats
+            : computeSpatialSummary(positions);
+    }
+    
+    function formatSigned(value) {
+        return (value >= 0 ? '+' : '') + value.toLocaleString();
+    }
+    
+    function formatSpatialRate(rate) {
+        return rate ? '1/' + rate.toFixed(1) : '-';
+    }
+    
+    function getSpatialTitle(entry) {
+        if (!entry || !entry.count) return '';
+        return entry.count + '台 / 合計 ' + formatSigned(entry.totalSa) + '枚 / 平均 ' +
+               formatSigned(entry.avgSa) + '枚 / 平均 ' + entry.avgGames.toLocaleString() + 'G / BB ' +
+               formatSpatialRate(entry.bbRate) + ' / RB ' + formatSpatialRate(entry.rbRate);
+    }
+    
+    function renderSpatialBadge(entry) {
+        if (!entry || !entry.count) return '';
+        var saClass = entry.avgSa > 0 ? 'plus' : entry.avgSa < 0 ? 'minus' : '';
+        return '<span class="island-summary-badge" title="' + getSpatialTitle(entry) + '">' +
+               '平均 <span class="' + saClass + '">' + formatSigned(entry.avgSa) + '</span>枚' +
+               '（' + entry.count + '台 / 合計 ' + formatSigned(entry.totalSa) + '枚）</span>';
+    }
+    
+    function renderPositionSummary() {
+        var container = document.getElementById('islandPositionSummary');
+        if (!container) return;
+        
+        var summary = state.spatialSummary;
+        var tags = Object.keys(POSITION_TAGS).filter(function(tag) {
+            return summary && summary['position:' + tag] && summary['position:' + tag].count > 0;
+        });
+        if (tags.length === 0) {
+            container.innerHTML = '';
+            return;
+        }
+        
+        var html = '<div class="legend-title">位置別</div><div class="island-position-items">';
+        tags.forEach(function(tag) {
+            var entry = summary['position:' + tag];
+            var saClass = entry.avgSa > 0 ? 'plus' : entry.avgSa < 0 ? 'minus' : '';
+            html += '<div class="island-position-item" title="' + getSpatialTitle(entry) + '">';
+            html += '<span class="island-position-label" style="border-color:' + POSITION_TAGS[tag].color + ';">' + POSITION_TAGS[tag].label + '</span>';
+            html += '<span class="' + saClass + '">' + formatSigned(entry.avgSa) + '枚</span>';
+            html += '<span class="island-position-sub">' + entry.avgGames.toLocaleString() + 'G / BB ' +
+                    formatSpatialRate(entry.bbRate) + ' / RB ' + formatSpatialRate(entry.rbRate) + '</span>';
+            html += '</div>';
+        });
+        html += '</div>';
+        container.innerHTML = html;
+    }
+    
     // ===================
     // 機種名の省略
     // ===================
@@ -193,9 +342,11 @@ var IslandMap = (function() {
     
     async function render() {
         await loadUnitData();
+        await loadSpatialSummary();
         updateDateNav();
         updateDateSelect();
         renderLegend();
+        renderPositionSummary();
         renderIslandMap();
     }
     
@@ -297,7 +448,8 @@ var IslandMap = (function() {
                 if (areaIslands.length === 0) return;
                 
                 html += '<div class="island-area" data-area="' + area.id + '">';
-                html += '<div class="island-area-title">' + area.name + '</div>';
+                html += '<div class="island-area-title">' + area.name +
+                        renderSpatialBadge(state.spatialSummary && state.spatialSummary['area:' + area.id]) + '</div>';
                 html += '<div class="island-list">';
                 
                 areaIslands.forEach(function(island) {
@@ -332,11 +484,14 @@ var IslandMap = (function() {
         var typeClass = island.type === 'vertical' ? 'island-vertical' : '';
         var sizeClass = rowCount === 1 ? 'island-single' : 'island-double';
         
+        var summary = state.spatialSummary;
+        
         var html = '<div class="island-block ' + typeClass + ' ' + sizeClass + '" data-island="' + island.id + '">';
+        html += '<div class="island-block-summary">' + renderSpatialBadge(summary && summary['island:' + island.id]) + '</div>';
         html += '<div class="island-rows">';
         
-        island.rows.forEach(function(row) {
-            html += renderIslandRow(row);
+        island.rows.forEach(function(row, i) {
+            html += renderIslandRow(row, summary && summary['row:' + island.id + '/' + i]);
         });
         
         html += '</div></div>';
@@ -344,8 +499,9 @@ var IslandMap = (function() {
         return html;
     }
     
-    function renderIslandRow(row) {
-        var html = '<div class="island-row">';
+    function renderIslandRow(row, summary) {
+        var title = getSpatialTitle(summary);
+        var html = '<div class="island-row"' + (title ? ' title="列: ' + title + '"' : '') + '>';
         
         row.units.forEach(function(unitNum) {
             html += renderUnit(unitNum);
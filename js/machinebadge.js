@@ -10,6 +10,12 @@
 //             - 仮想日（最新+1日）では基準設定にかかわらず常に前日基準で計算
 //   トレンドタブ: 選択期間の合計値（既存の動作と同じ）
 //
+// 【事前計算の順位】
+//   集計期間が1日分（欠落なし）のときは、その日の日別シャードの機種内順位（data.js の
+//   loadMachineRanks）を引く（台の顔ぶれが一致する機種だけ。結果は行から計算した場合と同じ）。
+//   未読み込みの日は行から計算し、その日の分の読み込みは呼び出し側が始める（rankDateKey）。
+//   トレンドタブも選択期間が1日なら同じ順位を使う。
+//
 // 【変更点】
 //   バッジ表示・🐙タコだし・💀死に台 のチェックボックスは廃止。
 //   これらは常にオン（true）固定。非表示にしたい場合は表示列で
@@ -164,7 +170,8 @@ var MachineBadge = (function() {
         excludedFiles: [], // 除外設定で窓から外した日
         baseFile: null,
         baseMode: 'current',
-        targetCol: '差枚'
+        targetCol: '差枚',
+        rankDateKey: null  // 窓が欠落のない1日分のときその日（事前計算の順位を引く日）
     };
 
     function calcCumulativeValues(baseFile, dataCacheRef, targetCol, opts) {
@@ -271,6 +278,118 @@ var MachineBadge = (function() {
         return result;
     }
 
+    // ========== 事前計算の機種内順位（日別シャードの ranks） ==========
+
+    /**
+     * 大きい順の順位（同値は同順位・次を飛ばす）→ 小さい順の順位。
+     * 同じ順位の台数を t として 台数 - 順位 - t + 2。順位の無い台があれば null
+     */
+    function reverseRanks(ranks) {
+        if (ranks.some(function(r) { return r === null; })) return null;
+        var ties = {};
+        ranks.forEach(function(r) { ties[r] = (ties[r] || 0) + 1; });
+        return ranks.map(function(r) { return ranks.length - r - ties[r] + 2; });
+    }
+
+    // 列 → 日付 → 機種 → { units, index, desc, asc, quantiles }（読み込み直したら作り直す）。
+    // 日はあとから登録されるので、見つからなかった結果は覚えない
+    var _precomputedStore = null;
+    var _precomputedCache = {};
+
+    function getPrecomputed(dateKey, machine, col) {
+        if (typeof HallData === 'undefined' || !HallData.utils.getMachineRanks) return null;
+        if (_precomputedStore !== HallData.store.machineRanks) {
+            _precomputedStore = HallData.store.machineRanks;
+            _precomputedCache = {};
+        }
+        if (!_precomputedStore) return null;
+
+        var byDate = _precomputedCache[col] || (_precomputedCache[col] = {});
+        var byMachine = byDate[dateKey] || (byDate[dateKey] = {});
+        if (byMachine[machine] !== undefined) return byMachine[machine];
+
+        var result = null;
+        var entry = HallData.utils.getMachineRanks(dateKey, machine);
+        if (entry && entry.ranks[col]) {
+            // 保存されている順位は良い方から。合成確率（分母の小さい順）は値の大きい順に直す
+            var desc = col === '合成確率' ? reverseRanks(entry.ranks[col]) : entry.ranks[col];
+            result = {
+                units: entry.units,
+                index: null,        // 台番号 → 位置（行の順が違うときに作る）
+                desc: desc,
+                asc: desc && reverseRanks(desc),
+                quantiles: entry.quantiles[col] || null
+            };
+        }
+        if (result) byMachine[machine] = result;
+        return result;
+    }
+
+    /**
+     * items の各台の units での位置。顔ぶれが一致しなければ null
+     */
+    function matchUnits(pre, items) {
+        if (!pre.index) {
+            pre.index = {};
+            pre.units.forEach(function(unit, i) { pre.index[unit] = i; });
+        }
+        var positions = new Array(items.length);
+        var used = new Array(pre.units.length);
+        for (var k = 0; k < items.length; k++) {
+            var i = pre.index[items[k].unit];
+            if (i === undefined || used[i]) return null;
+            used[i] = true;
+            positions[k] = i;
+        }
+        return positions;
+    }
+
+    /**
+     * items（{ key, unit }）を dateKey のその機種の事前計算順位で順位付けする。
+     * calcRanksFromItems に同じ日の値を渡した場合と同じ結果を返す。
+     * 未ロード・列が無い・台の顔ぶれが一致しなければ null（呼び出し側で行から計算する）
+     */
+    function calcRanksFromPrecomputed(items, dateKey, machine, col) {
+        var pre = getPrecomputed(dateKey, machine, col);
+        if (!pre || !pre.asc || pre.units.length !== items.length) return null;
+        var desc = pre.desc;
+        var asc = pre.asc;
+
+        // 全台が保存時と同じ行の順なら位置は添字どおり。違えば台番号で突き合わせる
+        var positions = null;
+        for (var k = 0; k < items.length; k++) {
+            if (String(items[k].unit) !== pre.units[k]) {
+                positions = matchUnits(pre, items);
+                if (!positions) return null;
+                break;
+            }
+        }
+
+        var result = {};
+        items.forEach(function(p) { result[p.key] = { tako: null, kubi: null }; });
+        if (items.length < 2) return result;
+
+        // 全台同じ値なら全台が1位
+        var allSame = true;
+        for (var j = 0; j < desc.length && allSame; j++) allSame = desc[j] === 1;
+        if (allSame) return result;
+
+        items.forEach(function(item, k) {
+            var i = positions ? positions[k] : k;
+            if (showTako && desc[i] <= topN) result[item.key].tako = desc[i];
+            if (showKubi && asc[i] <= topN) result[item.key].kubi = asc[i];
+        });
+        return result;
+    }
+
+    /**
+     * dateKey のその機種の col の分位点 [p10, p50, p90]（無ければ null）
+     */
+    function getPrecomputedQuantiles(dateKey, machine, col) {
+        var pre = getPrecomputed(dateKey, machine, col);
+        return pre ? pre.quantiles : null;
+    }
+
     // ========== 日別タブ用: 累積でバッジ付与 ==========
 
     /**
@@ -299,6 +418,10 @@ var MachineBadge = (function() {
         // 実際に使われた基準モード（仮想日は前日基準固定）
         var effectiveBase = (forcePrev || badgeBase === 'prev') ? 'prev' : 'current';
 
+        // 窓が欠落のない1日分なら、その日の事前計算の順位を使える
+        var rankDateKey = (windowFiles.length === 1 && (cumResult.missingFiles || []).length === 0)
+            ? fileToDateKey(windowFiles[0]) : null;
+
         // 可視化用に窓情報を保持
         _lastWindowInfo = {
             windowFiles:   windowFiles.slice(),
@@ -306,7 +429,8 @@ var MachineBadge = (function() {
             excludedFiles: (cumResult.excludedFiles || []).slice(),
             baseFile:      baseFile,
             baseMode:      effectiveBase,
-            targetCol:     col
+            targetCol:     col,
+            rankDateKey:   rankDateKey
         };
 
         // --- フィルター後の表示台のみで機種ごとにグループ化 ---
@@ -317,6 +441,7 @@ var MachineBadge = (function() {
             var key = machine + '_' + (row['台番号'] || '');
             machineGroups[machine].push({
                 key: key,
+                unit: row['台番号'] || '',
                 num: cumValues[key] !== undefined ? cumValues[key] : 0,
                 row: row
             });
@@ -327,16 +452,23 @@ var MachineBadge = (function() {
         //   2台      : 💀（死に台）1位のみ付与（🐙 は付けない）
         //   1台      : バッジを付けない（比較不能のため）
         var allRanks = {};
+        var allQuantiles = {};
+
+        function rankItems(items, machine) {
+            return (rankDateKey && calcRanksFromPrecomputed(items, rankDateKey, machine, col))
+                || calcRanksFromItems(items);
+        }
 
         Object.keys(machineGroups).forEach(function(machine) {
             var items = machineGroups[machine];
+            if (rankDateKey) allQuantiles[machine] = getPrecomputedQuantiles(rankDateKey, machine, col);
 
             if (items.length >= 3) {
                 // 通常: 機種内ランク
-                Object.assign(allRanks, calcRanksFromItems(items));
+                Object.assign(allRanks, rankItems(items, machine));
             } else if (items.length === 2) {
                 // 2台: 💀のみ。calcRanksFromItems の結果から tako を除去
-                var ranks2 = calcRanksFromItems(items);
+                var ranks2 = rankItems(items, machine);
                 Object.keys(ranks2).forEach(function(k) {
                     ranks2[k].tako = null;
                 });
@@ -355,7 +487,8 @@ var MachineBadge = (function() {
                     cumVal:      cumValues[key] !== undefined ? cumValues[key] : null,
                     windowDays:  windowFiles.length,
                     missingDays: (cumResult.missingFiles || []).length,
-                    baseMode:    effectiveBase
+                    baseMode:    effectiveBase,
+                    quantiles:   allQuantiles[row['機種名'] || ''] || null
                 }
             );
             return Object.assign({}, row, { _machineBadge: badge });
@@ -367,10 +500,12 @@ var MachineBadge = (function() {
     /**
      * results    : trend集計結果 [{machine, num, total, avg, ...}]
      * targetProp : 'total' など
+     * opts       : { dateKey, column }  選択期間が1日のときの日付と集計列（事前計算の順位を使う）
      */
-    function assignBadgesForTrend(results, targetProp) {
+    function assignBadgesForTrend(results, targetProp, opts) {
         if (!enabled || !results || results.length === 0) return results;
         var prop = targetProp || 'total';
+        opts = opts || {};
 
         var machineGroups = {};
         results.forEach(function(row) {
@@ -378,6 +513,7 @@ var MachineBadge = (function() {
             if (!machineGroups[machine]) machineGroups[machine] = [];
             machineGroups[machine].push({
                 key: machine + '_' + row.num,
+                unit: row.num,
                 num: (typeof row[prop] === 'number' && !isNaN(row[prop])) ? row[prop] : 0
             });
         });
@@ -385,7 +521,8 @@ var MachineBadge = (function() {
         var allRanks = {};
         Object.keys(machineGroups).forEach(function(machine) {
             var items = machineGroups[machine];
-            var ranks = calcRanksFromItems(items);
+            var ranks = (opts.dateKey && calcRanksFromPrecomputed(items, opts.dateKey, machine, opts.column))
+                || calcRanksFromItems(items);
             Object.assign(allRanks, ranks);
         });
 
@@ -424,7 +561,10 @@ var MachineBadge = (function() {
         var missTip = (badge.missingDays)
             ? '⚠未ロード' + badge.missingDays + '日ぶん欠落'
             : '';
-        var baseTip = [daysTip, cumTip, missTip].filter(Boolean).join(' / ');
+        var quantTip = badge.quantiles
+            ? '機種内 p10/p50/p90: ' + badge.quantiles.map(function(v) { return v.toLocaleString(); }).join(' / ')
+            : '';
+        var baseTip = [daysTip, cumTip, missTip, quantTip].filter(Boolean).join(' / ');
 
         if (badge.tako !== null && showTako && takoRanks.indexOf(badge.tako) !== -1) {
             var tip = '🐙タコだし ' + badge.tako + '位（機種内）' + (baseTip ? ' | ' + baseTip : '');
@@ -527,7 +667,8 @@ var MachineBadge = (function() {
             excludedFiles: _lastWindowInfo.excludedFiles.slice(),
             baseFile:      _lastWindowInfo.baseFile,
             baseMode:      _lastWindowInfo.baseMode,
-            targetCol:     _lastWindowInfo.targetCol
+            targetCol:     _lastWindowInfo.targetCol,
+            rankDateKey:   _lastWindowInfo.rankDateKey
         };
     }
 
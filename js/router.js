@@ -57,6 +57,9 @@ var Router = (function() {
                     setupFilterPanelToggle('trendFilterToggle', 'trendFilterContent');
                 }
                 if (typeof setupScatterEventListeners === 'function') setupScatterEventListeners();
+                if (typeof setupDigitEventListeners === 'function') setupDigitEventListeners();
+                // 累積和インデックスは裏で読む（読み終える前の集計は行から。結果は同じ）
+                if (typeof loadPrefixSums === 'function') loadPrefixSums();
 
             },
             onShow: function() {
@@ -12,11 +12,19 @@ const HallData = window.HallData || {
         events: null,
         positions: null,
         unitHistory: null,   // ★追記: unit_history.json の格納先（未ロード時は null）
+        unitIntervals: null, // 台番号 → 区間インデックス（data.js の registerUnitIntervals。無ければ null）
+        unitFeed: null,      // 日付順の変化フィード（data.js の registerUnitFeed。無ければ null）
+        dailyStats: null,    // 日付 → 日別統計（data.js の loadDailyStats。無ければ null）
+        prefixSums: null,    // 台番号・機種ごとの累積和インデックス（data.js の registerPrefixSums。無ければ null）
+        spatialStats: null,  // 島・列・位置ごとの日別集計（data.js の loadSpatialStats。無ければ null）
+        digitStats: null,    // 台番号末尾・ゾロ目ごとの日別集計（data.js の loadDigitStats。無ければ null）
+        machineRanks: null,  // 日ごと・機種ごとの機種内順位と分位点（data.js の registerDayRanks。読み込んだ日の分だけ）
         loadingState: {
             initialLoadComplete: false,
             fullLoadComplete: false,
             totalFiles: 0,
-            loadedFiles: 0
+            loadedFiles: 0,
+            loadedFromShards: false
         }
     },
     
@@ -380,6 +388,17 @@ function formatDate(filename) {
     return filename.replace('.csv', '').replace('data/', '');
 }
 
+var PROBABILITY_COLUMNS = ['合成確率', 'BB確率', 'RB確率', 'ART確率'];
+
+/**
+ * 確率列（PROBABILITY_COLUMNS）の表示文字列。
+ * キャッシュの確率列は "1/x" の x（数値。回数 0 は 0）か、月別JSON v1 の文字列のまま。
+ */
+function formatProbability(value) {
+    if (typeof value === 'number') return '1/' + value.toFixed(1);
+    return value === null || value === undefined ? '' : value;
+}
+
 function formatDateShort(filename) {
     var match = filename.match(/(\d{4})_(\d{2})_(\d{2})/);
     if (match) {
@@ -456,7 +475,8 @@ function renderTable(data, tableId, summaryId) {
 
     tbody.innerHTML = data.map(function(row) {
         return '<tr>' + headers.map(function(h) {
-            var val = row[h] || '';
+            var val = row[h];
+            if (val === null || val === undefined) val = '';
             if (h === '差枚') {
                 var numVal = parseInt(val) || 0;
                 var cls = numVal > 0 ? 'plus' : numVal < 0 ? 'minus' : '';
@@ -466,6 +486,7 @@ function renderTable(data, tableId, summaryId) {
                 var gVal = parseInt(val) || 0;
                 return '<td>' + gVal.toLocaleString() + '</td>';
             }
+            if (PROBABILITY_COLUMNS.indexOf(h) !== -1) return '<td>' + formatProbability(val) + '</td>';
             return '<td>' + val + '</td>';
         }).join('') + '</tr>';
     }).join('');
@@ -2210,6 +2231,9 @@ function getPositionFilterDisplayText(tabName) {
 // ===================
 // 台番号ステータス／経過日数ヘルパー（unit_history.json 連携）
 // HallData.store.unitHistory を参照。null の場合は例外を投げず null を返す。
+// シャード版では読み込み済みの台だけに答える（先に data.js の ensureUnitHistoryFor を待つ）。
+// 区間インデックス（unit_history.intervals.json）に載っている台は、イベント列を走査せず
+// lookupUnitInterval の二分探索1回で答える（結果は走査と同じ）。
 // ===================
 
 /**
@@ -2236,13 +2260,52 @@ function unitHistoryDateToObj(dateKey) {
     return new Date(parseInt(parts[0], 10), parseInt(parts[1], 10) - 1, parseInt(parts[2], 10));
 }
 
+/**
+ * unit_history の派生ファイル（符号化版・区間インデックス・変化フィード）は日付を
+ * epoch（"YYYY_MM_DD"）からの日数で持つ。その日付キー ⇔ 日数の変換を返す内部ヘルパー
+ * （変換結果はキャッシュする）。
+ * @returns {{day: function(string): number, key: function(number): string}}
+ */
+function createUnitHistoryCalendar(epochKey) {
+    var MS_PER_DAY = 24 * 60 * 60 * 1000;
+    function toUtc(dateKey) {
+        var p = dateKey.split('_');
+        return Date.UTC(parseInt(p[0], 10), parseInt(p[1], 10) - 1, parseInt(p[2], 10));
+    }
+    var epoch = toUtc(epochKey);
+    var days = {};
+    var keys = {};
+    return {
+        day: function(dateKey) {
+            var day = days[dateKey];
+            if (day === undefined) {
+                day = days[dateKey] = Math.round((toUtc(dateKey) - epoch) / MS_PER_DAY);
+            }
+            return day;
+        },
+        key: function(day) {
+            var key = keys[day];
+            if (key === undefined) {
+                var d = new Date(epoch + day * MS_PER_DAY);
+                var mm = String(d.getUTCMonth() + 1);
+                var dd = String(d.getUTCDate());
+                key = keys[day] = d.getUTCFullYear() + '_' + (mm.length < 2 ? '0' + mm : mm)
+                    + '_' + (dd.length < 2 ? '0' + dd : dd);
+            }
+            return key;
+        }
+    };
+}
+
 /**
  * unitHistory 全体から、全期間の末尾日付（最新の date）を求める内部ヘルパー。
  * targetDate 省略時のデフォルト対象日として使う。見つからなければ null。
+ * シャード版（一部だけ読み込み済み）では index.json の latest_date を使う。
  */
 function getLatestDateInUnitHistory() {
     var uh = HallData.store && HallData.store.unitHistory;
     if (!uh || !uh.unit_history) return null;
+    if (uh.latest_date !== undefined) return uh.latest_date;
     var latest = null;
 
     var unitMap = uh.unit_history;
@@ -2266,6 +2329,52 @@ function getLatestDateInUnitHistory() {
     return latest;
 }
 
+/**
+ * 区間インデックス（HallData.store.unitIntervals）から、台番号の targetDate 時点の
+ * 区間を二分探索で引く内部ヘルパー。targetDate は正規化済みの "YYYY_MM_DD"。
+ * 戻り値: { machine, since, event, type, types, install, target, dateOf }
+ *         （since / event / install / target は日数。event は無ければ -1。dateOf は日数 → 日付キー）
+ *         targetDate が最初の区間より前なら null、インデックスに無い台番号なら undefined
+ */
+function lookupUnitInterval(unitNo, targetDate) {
+    var map = HallData.store && HallData.store.unitIntervals;
+    if (!map || !Object.prototype.hasOwnProperty.call(map, unitNo)) return undefined;
+    var item = map[unitNo];
+    var meta = item.meta;
+    var flat = item.flat;
+    var stride = meta.stride;
+    var target = meta.calendar.day(targetDate);
+
+    // start <= target となる最後の区間
+    var lo = 0;
+    var hi = flat.length / stride;
+    while (lo < hi) {
+        var mid = (lo + hi) >> 1;
+        if (flat[mid * stride] <= target) lo = mid + 1;
+        else hi = mid;
+    }
+    if (lo === 0) return null;
+    var base = (lo - 1) * stride;
+
+    var typeId = flat[base + 4];
+    var mask = flat[base + 5];
+    var types = [];
+    meta.doc.types.forEach(function(t, i) {
+        if (mask & (1 << i)) types.push(t);
+    });
+
+    return {
+        machine: meta.doc.machines[flat[base + 1]],
+        since: flat[base + 2],
+        event: flat[base + 3],
+        type: typeId >= 0 ? meta.doc.types[typeId] : null,
+        types: types,
+        install: flat[base + 6],
+        target: target,
+        dateOf: meta.calendar.key
+    };
+}
+
 /**
  * 台番号の、targetDate 時点における最新ステータスを返す。
  *
@@ -2297,6 +2406,12 @@ HallData.utils.getUnitStatus = function(unitNo, targetDate) {
         if (targetDate === null) return null;
     }
 
+    var iv = lookupUnitInterval(unitNo, targetDate);
+    if (iv !== undefined) {
+        if (iv === null) return null;
+        return { type: iv.type, machine: iv.machine, date: iv.dateOf(iv.event >= 0 ? iv.event : iv.since) };
+    }
+
     var entries = uh.unit_history[unitNo];
     if (!entries || !entries.length) return null;
 
@@ -2363,6 +2478,11 @@ HallData.utils.getUnitAge = function(unitNo, targetDate) {
         if (targetDate === null) return null;
     }
 
+    var iv = lookupUnitInterval(unitNo, targetDate);
+    if (iv !== undefined) {
+        return iv === null ? null : iv.target - iv.since;
+    }
+
     var entries = uh.unit_history[unitNo];
     if (!entries || !entries.length) return null;
 
@@ -2418,6 +2538,12 @@ HallData.utils.getMachineAge = function(unitNo, targetDate) {
         if (targetDate === null) return null;
     }
 
+    // 区間インデックスがあれば設置日（install）をそのまま使う
+    var iv = lookupUnitInterval(unitNo, targetDate);
+    if (iv !== undefined) {
+        return iv === null ? null : iv.target - iv.install;
+    }
+
     // 1) targetDate 時点で有効な機種を特定（台番号軸から）
     var entries = uh.unit_history[unitNo];
     if (!entries || !entries.length) return null;
@@ -2476,6 +2602,55 @@ HallData.utils.getMachineAge = function(unitNo, targetDate) {
     return Math.round((endDate.getTime() - startDate.getTime()) / MS_PER_DAY);
 };
 
+/**
+ * 変化フィード（unit_history.feed.json）から、targetDate 以前の直近 count 件の変化を
+ * 新しい順に返す。type を渡すとその種別（'withdraw' など）だけを数える。
+ * 件数の境目の日は丸ごと返す（count 件目と同じ日の変化は count を超えても含める）ため、
+ * 呼び出し側で同じ日の中を並べ替えてから切り詰めてよい。
+ *
+ * targetDate 以前の位置は starts で引くため、全機種のイベント列は走査しない。
+ *
+ * @param {string} [targetDate] "YYYY_MM_DD" 等。省略時は全期間。
+ * @param {number} count
+ * @param {string} [type]
+ * @returns {Array<{date:string, machine:string, type:string, added:string[], removed:string[]}>|null}
+ *          フィード未ロードなら null
+ */
+HallData.utils.getRecentChanges = function(targetDate, count, type) {
+    var feed = HallData.store && HallData.store.unitFeed;
+    if (!feed) return null;
+    var doc = feed.doc;
+    var events = doc.events;
+
+    var end = events.length;
+    var base = targetDate ? normalizeDateKey(targetDate) : null;
+    if (base) {
+        var day = feed.calendar.day(base);
+        if (day < 0) end = 0;
+        else if (day + 1 < doc.starts.length) end = doc.starts[day + 1];
+    }
+
+    var typeId = type ? doc.types.indexOf(type) : -1;
+    if (type && typeId === -1) return [];
+
+    var result = [];
+    var lastDay = null;
+    for (var i = end - 1; i >= 0; i--) {
+        var ev = events[i];
+        if (result.length >= count && ev[0] !== lastDay) break;
+        if (typeId !== -1 && ev[2] !== typeId) continue;
+        result.push({
+            date: feed.calendar.key(ev[0]),
+            machine: doc.machines[ev[1]],
+            type: doc.types[ev[2]],
+            added: ev[3],
+            removed: ev[4]
+        });
+        lastDay = ev[0];
+    }
+    return result;
+};
+
 // 新台バッジを出す期間（日数）。localStorage で調整可能。デフォルト90日（約3か月）。
 var UNIT_NEW_PERIOD_KEY = 'unitNewPeriodDays';
 var UNIT_NEW_PERIOD_DEFAULT = 90;
@@ -2552,62 +2727,77 @@ HallData.utils.getUnitDisplayStatuses = function(unitNo, targetDate) {
         if (targetDate === null) return null;
     }
 
-    // targetDate 時点で有効な機種を特定（台番号軸から）
-    var entries = uh.unit_history[unitNo];
-    if (!entries || !entries.length) return null;
-
-    var effective = null;
-    for (var i = 0; i < entries.length; i++) {
-        if (entries[i].date <= targetDate) {
-            if (effective === null || entries[i].date >= effective.date) {
-                effective = entries[i];
+    var machine, latestDate, types, machineAge, eventAge;
+    var iv = lookupUnitInterval(unitNo, targetDate);
+    if (iv !== undefined) {
+        // 区間インデックス: 最新イベント日・その日の種別・設置日を引くだけ
+        if (iv === null) return null;
+        machine = iv.machine;
+        if (iv.event < 0) {
+            return { types: [], machine: machine, date: iv.dateOf(iv.since) };
+        }
+        latestDate = iv.dateOf(iv.event);
+        types = iv.types;
+        machineAge = iv.target - iv.install;
+        eventAge = iv.target - iv.event;
+    } else {
+        // targetDate 時点で有効な機種を特定（台番号軸から）
+        var entries = uh.unit_history[unitNo];
+        if (!entries || !entries.length) return null;
+
+        var effective = null;
+        for (var i = 0; i < entries.length; i++) {
+            if (entries[i].date <= targetDate) {
+                if (effective === null || entries[i].date >= effective.date) {
+                    effective = entries[i];
+                }
             }
         }
-    }
-    if (effective === null) return null;
-    var machine = effective.machine;
+        if (effective === null) return null;
+        machine = effective.machine;
 
-    var mh = uh.machine_history && uh.machine_history[machine];
-    if (!mh || !mh.events || !mh.events.length) {
-        return { types: [], machine: machine, date: effective.date };
-    }
+        var mh = uh.machine_history && uh.machine_history[machine];
+        if (!mh || !mh.events || !mh.events.length) {
+            return { types: [], machine: machine, date: effective.date };
+        }
 
-    // 有効機種の開始日以降・targetDate 以前で最も新しいイベント日を特定
-    var latestDate = null;
-    for (var j = 0; j < mh.events.length; j++) {
-        var ev = mh.events[j];
-        if (ev.date >= effective.date && ev.date <= targetDate) {
-            if (latestDate === null || ev.date > latestDate) latestDate = ev.date;
+        // 有効機種の開始日以降・targetDate 以前で最も新しいイベント日を特定
+        latestDate = null;
+        for (var j = 0; j < mh.events.length; j++) {
+            var ev = mh.events[j];
+            if (ev.date >= effective.date && ev.date <= targetDate) {
+                if (latestDate === null || ev.date > latestDate) latestDate = ev.date;
+            }
+        }
+        if (latestDate === null) {
+            return { types: [], machine: machine, date: effective.date };
         }
-    }
-    if (latestDate === null) {
-        return { types: [], machine: machine, date: effective.date };
-    }
 
-    // その最新日に発生した全 type を集める（重複除去）
-    var types = [];
-    for (var k = 0; k < mh.events.length; k++) {
-        if (mh.events[k].date === latestDate) {
-            var t = mh.events[k].type;
-            if (types.indexOf(t) === -1) types.push(t);
+        // その最新日に発生した全 type を集める（重複除去）
+        types = [];
+        for (var k = 0; k < mh.events.length; k++) {
+            if (mh.events[k].date === latestDate) {
+                var t = mh.events[k].type;
+                if (types.indexOf(t) === -1) types.push(t);
+            }
+        }
+
+        // new 用: 機種設置日（new イベント日）からの経過日数
+        machineAge = HallData.utils.getMachineAge(unitNo, targetDate);
+
+        // add/move/remove 用: そのイベント発生日（latestDate）からの経過日数
+        eventAge = null;
+        var endObj = unitHistoryDateToObj(targetDate);
+        var evObj = unitHistoryDateToObj(latestDate);
+        if (endObj && evObj) {
+            var MS_PER_DAY = 24 * 60 * 60 * 1000;
+            eventAge = Math.round((endObj.getTime() - evObj.getTime()) / MS_PER_DAY);
         }
     }
 
     // ── 期間フィルタ（type ごとに基準を変える）──
     var period = HallData.utils.getNewPeriodDays();
 
-    // new 用: 機種設置日（new イベント日）からの経過日数
-    var machineAge = HallData.utils.getMachineAge(unitNo, targetDate);
-
-    // add/move/remove 用: そのイベント発生日（latestDate）からの経過日数
-    var eventAge = null;
-    var endObj = unitHistoryDateToObj(targetDate);
-    var evObj = unitHistoryDateToObj(latestDate);
-    if (endObj && evObj) {
-        var MS_PER_DAY = 24 * 60 * 60 * 1000;
-        eventAge = Math.round((endObj.getTime() - evObj.getTime()) / MS_PER_DAY);
-    }
-
     types = types.filter(function(ty) {
         if (ty === 'withdraw') return false; // 状態列には出さない
         if (ty === 'new') {
@@ -2628,3 +2818,253 @@ HallData.utils.getUnitDisplayStatuses = function(unitNo, targetDate) {
 
     return { types: types, machine: machine, date: latestDate };
 };
+
+
+// ===================
+// 累積和インデックス（prefix_sums.json）
+// HallData.store.prefixSums を参照（data.js の loadPrefixSums）。未ロードなら null を返す。
+// 日番号はインデックスの dates の添字（データのある日だけを古い順に数える）。
+// ===================
+
+/**
+ * 台番号（kind 'unit'）・機種（kind 'machine'）の系列を累積配列にして返す（初回だけ作る）。
+ * 戻り値: {
+ *   count:   Float64Array(日数 + 1) … 日番号 i より前のデータのある日数（機種は延べ台数）
+ *   machine: Int32Array(日数)       … 台番号のみ。その日の機種ID（データなし -2、同じ日に複数行 -1）
+ *   cum:     { 列名: Float64Array(日数 + 1) } … 日番号 i より前の合計（列は初回参照時に作る）
+ * }  インデックスに無ければ null
+ */
+function getPrefixSeries(kind, key) {
+    var ps = HallData.store && HallData.store.prefixSums;
+    if (!ps) return null;
+    var cache = ps.series[kind];
+    if (Object.prototype.hasOwnProperty.call(cache, key)) return cache[key];
+
+    var entries = kind === 'unit' ? ps.doc.by_unit : ps.doc.by_machine;
+    if (!Object.prototype.hasOwnProperty.call(entries, key)) return (cache[key] = null);
+    var entry = entries[key];
+    var n = ps.doc.dates.length;
+
+    // 区間 [差, 個数, ...] → データのある日番号
+    var days = [];
+    var end = 0;
+    for (var i = 0; i < entry.days.length; i += 2) {
+        var start = end + entry.days[i];
+        end = start + entry.days[i + 1];
+        for (var d = start; d < end; d++) days.push(d);
+    }
+
+    var count = new Float64Array(n + 1);
+    var perDay = new Float64Array(n);
+    days.forEach(function(d, j) { perDay[d] = kind === 'unit' ? 1 : entry.units[j]; });
+    for (var k = 0; k < n; k++) count[k + 1] = count[k] + perDay[k];
+
+    var machine = null;
+    if (kind === 'unit') {
+        machine = new Int32Array(n).fill(-2);
+        var changes = entry.machine;
+        var c = 0;
+        var current = -2;
+        days.forEach(function(d) {
+            while (c < changes.length && changes[c] <= d) {
+                current = changes[c + 1];
+                c += 2;
+            }
+            machine[d] = current;
+        });
+    }
+
+    return (cache[key] = { days: days, entry: entry, count: count, machine: machine, cum: {} });
+}
+
+/**
+ * 系列の列 column の累積配列（Float64Array(日数 + 1)）。インデックスに無い列なら null
+ */
+function getPrefixCumulative(series, column) {
+    if (series.cum[column]) return series.cum[column];
+    var ps = HallData.store.prefixSums;
+    var colIndex = ps.columns[column];
+    if (colIndex === undefined) return null;
+    var n = ps.doc.dates.length;
+    var perDay = new Float64Array(n);
+    var values = series.entry.values[colIndex];
+    series.days.forEach(function(d, j) { perDay[d] = values[j]; });
+    var cum = new Float64Array(n + 1);
+    for (var k = 0; k < n; k++) cum[k + 1] = cum[k] + perDay[k];
+    return (series.cum[column] = cum);
+}
+
+/**
+ * 台番号・機種の、日付 fromDate〜toDate（両端を含む）の列 column の合計。
+ * 戻り値: { total, days }（days はデータのある日数。機種は延べ台数）。
+ * インデックス未ロード・どちらかの日付がインデックスに無い・列が無い場合は null
+ * （データのない台番号・機種は { total: 0, days: 0 }）
+ */
+HallData.utils.getRangeTotal = function(kind, key, column, fromDate, toDate) {
+    var ps = HallData.store && HallData.store.prefixSums;
+    if (!ps || ps.columns[column] === undefined) return null;
+    var lo = ps.ordinals[normalizeDateKey(fromDate)];
+    var hi = ps.ordinals[normalizeDateKey(toDate)];
+    if (lo === undefined || hi === undefined) return null;
+    if (lo > hi) return { total: 0, days: 0 };
+    var series = getPrefixSeries(kind, String(key));
+    if (!series) return { total: 0, days: 0 };
+    var cum = getPrefixCumulative(series, column);
+    return { total: cum[hi + 1] - cum[lo], days: series.count[hi + 1] - series.count[lo] };
+};
+
+
+// ===================
+// 島・列・位置ごとの日別集計（spatial_stats.json）
+// HallData.store.spatialStats を参照（data.js の loadSpatialStats）。
+// ===================
+
+/**
+ * グループの合計 [台数, 差枚, G数, BB, RB] から表示用の統計を作る。
+ * bbRate / rbRate は 1/x の x（回数 0 なら null）
+ */
+HallData.utils.summarizeSpatialTotals = function(group, totals) {
+    var count = totals[0];
+    return {
+        kind: group.kind,
+        id: group.id,
+        group: group,
+        count: count,
+        totalSa: totals[1],
+        totalGames: totals[2],
+        bb: totals[3],
+        rb: totals[4],
+        avgSa: count ? Math.round(totals[1] / count) : 0,
+        avgGames: count ? Math.round(totals[2] / count) : 0,
+        bbRate: totals[3] ? totals[2] / totals[3] : null,
+        rbRate: totals[4] ? totals[2] / totals[4] : null
+    };
+};
+
+/**
+ * 日付 dateKey の島・列・位置ごとの統計（kind を渡すとその種類だけ）。
+ * 戻り値: { 'island:counter-1': 統計, ... }。未ロード・その日が無ければ null
+ */
+HallData.utils.getSpatialStats = function(dateKey, kind) {
+    var ss = HallData.store && HallData.store.spatialStats;
+    if (!ss) return null;
+    var flat = ss.days[normalizeDateKey(dateKey)];
+    if (!flat) return null;
+    var result = {};
+    ss.groups.forEach(function(group, i) {
+        if (kind && group.kind !== kind) return;
+        var base = i * ss.width;
+        result[group.kind + ':' + group.id] =
+            HallData.utils.summarizeSpatialTotals(group, flat.slice(base, base + ss.width));
+    });
+    return result;
+};
+
+
+// ===================
+// 台番号末尾・ゾロ目ごとの日別集計（digit_stats.json）
+// HallData.store.digitStats を参照（data.js の loadDigitStats）。
+// クラスは末尾 '0'〜'9' と 'zorome'（2桁以上で全桁が同じ台番号）。
+// ===================
+
+var DIGIT_CLASSES = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'zorome'];
+
+/**
+ * 台番号が入るクラス（末尾、ゾロ目なら 'zorome' も）。数字が無ければ []
+ */
+function getUnitDigitClasses(unitNum) {
+    var digits = String(unitNum || '').replace(/\D/g, '');
+    if (!digits) return [];
+    var classes = [digits.slice(-1)];
+    if (digits.length >= 2 && /^(\d)\1+$/.test(digits)) classes.push('zorome');
+    return classes;
+}
+
+/**
+ * 1行を合計 [台数, 差枚, G数, BB, RB, 勝ち] に足す（digit_stats.py の row_values と同じ値）
+ */
+function addDigitRowTotals(totals, row) {
+    var sa = parseInt(String(row['差枚']).replace(/,/g, '')) || 0;
+    totals[0] += 1;
+    totals[1] += sa;
+    totals[2] += parseInt(String(row['G数']).replace(/,/g, '')) || 0;
+    totals[3] += parseInt(String(row['BB']).replace(/,/g, '')) || 0;
+    totals[4] += parseInt(String(row['RB']).replace(/,/g, '')) || 0;
+    if (sa > 0) totals[5] += 1;
+    return totals;
+}
+
+/**
+ * 日付 dateKey のクラスごとの合計 { '0': [台数, 差枚, G数, BB, RB, 勝ち], ... }。
+ * 未ロード・その日が無ければ null
+ */
+HallData.utils.getDigitTotals = function(dateKey) {
+    var ds = HallData.store && HallData.store.digitStats;
+    if (!ds) return null;
+    var flat = ds.days[normalizeDateKey(dateKey)];
+    if (!flat) return null;
+    var result = {};
+    ds.classes.forEach(function(cls, i) {
+        result[cls] = flat.slice(i * ds.width, (i + 1) * ds.width);
+    });
+    return result;
+};
+
+/**
+ * イベント日 dateKey の、クラス内の機種ごとの合計 { クラス: { 機種名: [...] } }。無ければ null
+ */
+HallData.utils.getDigitEventMachines = function(dateKey) {
+    var ds = HallData.store && HallData.store.digitStats;
+    if (!ds) return null;
+    return ds.events[normalizeDateKey(dateKey)] || null;
+};
+
+/**
+ * 合計 [台数, 差枚, G数, BB, RB, 勝ち] から表示用の統計を作る。
+ * 機械割・BB / RB 確率は G数 で重み付けした値（bbRate / rbRate は 1/x の x。回数 0 なら null）
+ */
+HallData.utils.summarizeDigitTotals = function(totals) {
+    var count = totals[0];
+    var games = totals[2];
+    return {
+        count: count,
+        totalSa: totals[1],
+        totalGames: games,
+        bb: totals[3],
+        rb: totals[4],
+        winCount: totals[5],
+        avgSa: count ? Math.round(totals[1] / count) : 0,
+        avgGames: count ? Math.round(games / count) : 0,
+        winRate: count ? totals[5] / count * 100 : null,
+        mechRate: games > 0 ? (games * 3 + totals[1]) / (games * 3) * 100 : null,
+        bbRate: totals[3] ? games / totals[3] : null,
+        rbRate: totals[4] ? games / totals[4] : null
+    };
+};
+
+
+// ===================
+// 日ごと・機種ごとの機種内順位と分位点（日別シャードの ranks）
+// HallData.store.machineRanks を参照（data.js の loadDayShard / loadMachineRanks で日ごとに登録）。
+// 順位は良い方から（差枚・G数は大きい順、合成確率は分母の小さい順）で、同じ値は同順位。
+// ===================
+
+/**
+ * 日付 dateKey の機種 machine の機種内順位と分位点。未ロード・その日やその機種が無ければ null。
+ * 戻り値: { units: [台番号...], ranks: { 差枚: [順位...], ... }, quantiles: { 差枚: [p10, p50, p90], ... } }
+ * （ranks は units の順。合成確率が読めない台の順位・値の無い分位点は null）
+ */
+HallData.utils.getMachineRanks = function(dateKey, machine) {
+    var mr = HallData.store && HallData.store.machineRanks;
+    if (!mr) return null;
+    var machines = mr.days[normalizeDateKey(dateKey)];
+    var entry = machines && machines[machine];
+    if (!entry) return null;
+    var ranks = {};
+    var quantiles = {};
+    mr.metrics.forEach(function(metric, i) {
+        ranks[metric] = entry.ranks[i];
+        quantiles[metric] = entry.q[i];
+    });
+    return { units: entry.units, ranks: ranks, quantiles: quantiles };
+};
@@ -16,6 +16,10 @@
 #   tools/peek.sh files                     データファイル一覧とサイズ
 #   tools/peek.sh history  881              unit_history.json から台番号を引く
 #   tools/peek.sh jq       2026_08 '<expr>' 任意の jq 式
+#
+# 月別JSONは v2（{"schema":2,"days":{日付:[...]}}。回数は整数・確率は 1/x の x）
+# と v1（トップレベルが日付キー・全フィールド文字列）のどちらも読める。
+# jq サブコマンドの式はファイル全体に対して評価される（v2 の日付は .days の下）。
 # ---------------------------------------------------------------------------
 set -uo pipefail
 
@@ -42,51 +46,62 @@ resolve() {
 }
 
 usage() {
-  sed -n '2,25p' "${BASH_SOURCE[0]}" | sed 's|^# \{0,1\}||'
+  sed -n '2,23p' "${BASH_SOURCE[0]}" | sed 's|^# \{0,1\}||'
 }
 
+# v1 / v2 共通の jq 定義
+#   days : 日付 → レコード配列（v2 は .days、v1 はトップレベル）
+#   num  : 回数列の数値（v2 の整数・null、v1 の文字列 "1,234" / "" のどちらも読む）
+JQ_DEFS='
+  def days: (if type == "object" and (.schema | type) == "number" then .days else . end);
+  def num: if type == "number" then .
+           elif type == "string" then (gsub(","; "") | tonumber? // 0)
+           else 0 end;
+'
+
+
 case "$CMD" in
   dates)
     F=$(resolve "${2:?YYYY_MM を指定}") || exit 1
-    jq -r 'keys_unsorted[]' "$F"
+    jq -r "$JQ_DEFS"'days | keys_unsorted[]' "$F"
     ;;
 
   sample)
     F=$(resolve "${2:?YYYY_MM を指定}") || exit 1
-    jq 'to_entries[0].value[0]' "$F"
+    jq "$JQ_DEFS"'days | to_entries[0].value[0]' "$F"
     ;;
 
   fields)
     F=$(resolve "${2:?YYYY_MM を指定}") || exit 1
-    jq -r 'to_entries[0].value[0] | keys_unsorted[]' "$F"
+    jq -r "$JQ_DEFS"'days | to_entries[0].value[0] | keys_unsorted[]' "$F"
     ;;
 
   machines)
     F=$(resolve "${2:?YYYY_MM を指定}") || exit 1
-    jq -r '[.[][]["機種名"]] | unique | .[]' "$F"
+    jq -r "$JQ_DEFS"'[days[][]["機種名"]] | unique | .[]' "$F"
     ;;
 
   count)
     KEY="${2:?YYYY_MM_DD を指定}"
     F=$(resolve "$KEY") || exit 1
-    jq --arg k "$KEY" '.[$k] | length' "$F"
+    jq --arg k "$KEY" "$JQ_DEFS"'days[$k] | length' "$F"
     ;;
 
   unit)
     KEY="${2:?YYYY_MM_DD を指定}"
     NO="${3:?台番号を指定}"
     F=$(resolve "$KEY") || exit 1
-    jq --arg k "$KEY" --arg n "$NO" '.[$k][] | select(.["台番号"] == $n)' "$F"
+    jq --arg k "$KEY" --arg n "$NO" "$JQ_DEFS"'days[$k][] | select((.["台番号"] | tostring) == $n)' "$F"
     ;;
 
   top)
     KEY="${2:?YYYY_MM_DD を指定}"
     N="${3:-10}"
     F=$(resolve "$KEY") || exit 1
-    jq -r --arg k "$KEY" --argjson n "$N" '
-      .[$k]
+    jq -r --arg k "$KEY" --argjson n "$N" "$JQ_DEFS"'
+      days[$k]
       | map({no: .["台番号"], name: .["機種名"],
-             diff: ((.["差枚"] | tonumber?) // 0), g: .["G数"]})
+             diff: (.["差枚"] | num), g: (.["G数"] | num)})
       | sort_by(-.diff) | .[0:$n]
       | .[] | "\(.no)\t\(.diff)\t\(.g)\t\(.name)"
     ' "$F"